@@ -29,18 +29,19 @@ def sign_extend(val, from_w, to_w):
 # -------------------------------------------------------------------------
 #  Booth‑radix‑4 partial‑product generator
 # -------------------------------------------------------------------------
-def booth_radix4_pp_unsigned(a, b, w):
-    """Generate Unsigned Booth Radix-4 partial products for a * b"""
-    b_bits = [(b >> i) & 1 for i in range(w)]
+def booth_radix4_pp_unsigned(a, b, w, wb=None):
+    """Generate Unsigned Booth Radix-4 partial products for a * b (b is wb bits)"""
+    wb = wb or w
+    b_bits = [(b >> i) & 1 for i in range(wb)]
     b_ext =  [0] + b_bits + [0] + [0]  # zero-extend for unsigned
-    mask = (1 << (w + 1)) - 1  # keep w+1 bits for sign-extended PPs
+    mask = (1 << (w + 2)) - 1  # keep w+2 bits: signed multiples of the zero-extended a
     print(f"a: {a}, b: {b}, w: {w}")
-    print(f"a(bin): {uint_to_binary_str(a, w)}, b(bin): {uint_to_binary_str(b, w)}")
+    print(f"a(bin): {uint_to_binary_str(a, w)}, b(bin): {uint_to_binary_str(b, wb)}")
     print(f"b_ext: {b_ext[::-1]}, mask: {mask:#0{w}b}")
     partial_products = []
     cpl_bits = []
 
-    num_pp = (w) // 2 + 1
+    num_pp = (wb) // 2 + 1
 
     for i in range(1, num_pp + 1):
         idx = i * 2 - 1
@@ -58,7 +59,7 @@ def booth_radix4_pp_unsigned(a, b, w):
             # +1
             encoding_str = "+1"
             cpl = 0
-            pp = sign_extend(a, w, w+1) & mask
+            pp = a & mask
         elif encoding == 3:
             # +2
             encoding_str = "+2"
@@ -73,7 +74,7 @@ def booth_radix4_pp_unsigned(a, b, w):
             # -1
             encoding_str = "-1"
             cpl = 1
-            pp = (~sign_extend(a, w, w+1)) & mask
+            pp = (~a) & mask
         else:  # encoding == 7
             # 0
             encoding_str = "-0"
@@ -89,18 +90,19 @@ def booth_radix4_pp_unsigned(a, b, w):
     return partial_products, cpl_bits
 
 
-def booth_radix4_pp_signed(a, b, w):
-    """Generate Signed Booth Radix-4 partial products for a * b"""
-    b_bits = [(b >> i) & 1 for i in range(w)]
-    b_ext =  [0] + b_bits + [b_bits[w-1]]
+def booth_radix4_pp_signed(a, b, w, wb=None):
+    """Generate Signed Booth Radix-4 partial products for a * b (b is wb bits)"""
+    wb = wb or w
+    b_bits = [(b >> i) & 1 for i in range(wb)]
+    b_ext =  [0] + b_bits + [b_bits[wb-1]]
     mask = (1 << (w + 1)) - 1  # keep w+1 bits for sign-extended PPs
-    print(f"a: {uint_to_signed(a, w)}, b: {uint_to_signed(b, w)}, w: {w}")
-    print(f"a(bin): {uint_to_binary_str(a, w)}, b(bin): {uint_to_binary_str(b, w)}")
+    print(f"a: {uint_to_signed(a, w)}, b: {uint_to_signed(b, wb)}, w: {w}")
+    print(f"a(bin): {uint_to_binary_str(a, w)}, b(bin): {uint_to_binary_str(b, wb)}")
     print(f"b_ext: {b_ext[::-1]}, mask: {mask:#0{w}b}")
     partial_products = []
     cpl_bits = []
 
-    num_pp = (w + 1) // 2
+    num_pp = (wb + 1) // 2
 
     for i in range(1, num_pp + 1):
         idx = i * 2 - 1
@@ -146,16 +148,58 @@ def booth_radix4_pp_signed(a, b, w):
     return partial_products, cpl_bits
 
 
+# -------------------------------------------------------------------------
+#  Booth‑radix‑8/16 partial‑product generator
+# -------------------------------------------------------------------------
+def booth_high_radix_pp(a, b, w, radix, unsigned, wb=None):
+    """Generate Booth Radix-8/16 partial products for a * b
+
+    Digit i recodes b[k*i+k-1 : k*i-1] into [-2^(k-1), 2^(k-1)] and selects
+    that multiple of a, as booth_pp_radix.sv does from the hard multiples.
+    Unsigned is Booth of the zero-extended (w+1)-bit a; its top row is never
+    negative and has no cpl. b is wb bits wide.
+    """
+    wb = wb or w
+    k = radix.bit_length() - 1
+    pp_width = (w + 1 if unsigned else w) + k - 1
+    mask = (1 << pp_width) - 1
+    y = a if unsigned else uint_to_signed(a, w)
+    num_pp = wb // k + 1 if unsigned else (wb + k - 1) // k
+    fill = 0 if unsigned else (b >> (wb - 1)) & 1
+    b_ext = [0] + [(b >> i) & 1 for i in range(wb)] + [fill] * (k * num_pp + 1 - wb)
+    print(f"a: {y}, b: {b if unsigned else uint_to_signed(b, wb)}, w: {w}, radix: {radix}")
+    partial_products = []
+    cpl_bits = []
+
+    for i in range(num_pp):
+        bits = b_ext[k * i : k * i + k + 1]  # bits[0] is b[k*i-1]
+        digit = bits[0] - (bits[k] << (k - 1))
+        digit += sum(bits[j] << (j - 1) for j in range(1, k))
+        sign = bits[k]
+        pp = (abs(digit) * y) & mask
+        if sign:
+            pp = ~pp & mask  # -0 for the all-ones digit, like radix-4 111
+        partial_products.append(pp)
+        if unsigned and i == num_pp - 1:
+            print(f"    PP {i + 1}: digit {digit:+d}, pp: {pp:#0{pp_width + 2}b} (no cpl)")
+        else:
+            print(f"    PP {i + 1}: digit {digit:+d}, pp: {pp:#0{pp_width + 2}b}, cpl: {sign}")
+            cpl_bits.append(sign)
+
+    return partial_products, cpl_bits
+
+
 # -------------------------------------------------------------------------
 #  Binary radix‑2 unsigned partial‑product generator
 # -------------------------------------------------------------------------
-def binary_radix2_unsigned_pp(a, b, w):
-    """Generate binary radix-2 unsigned partial products for a * b"""
+def binary_radix2_unsigned_pp(a, b, w, wb=None):
+    """Generate binary radix-2 unsigned partial products for a * b (b is wb bits)"""
+    wb = wb or w
     partial_products = []
-    prod_width = 2 * w
+    prod_width = w + wb
     mask = (1 << prod_width) - 1               # keep only prod_width bits
 
-    for i in range(w):
+    for i in range(wb):
         b_bit = (b >> i) & 1
         pp = (a & mask) if b_bit else 0
         #remove shift!
@@ -168,8 +212,8 @@ def binary_radix2_unsigned_pp(a, b, w):
 # -------------------------------------------------------------------------
 #  Binary radix‑2 signed partial‑product generator (Baugh‑Wooley)
 # -------------------------------------------------------------------------
-def binary_radix2_signed_pp(a, b, w):
-    return binary_radix2_unsigned_pp(a, b, w)
+def binary_radix2_signed_pp(a, b, w, wb=None):
+    return binary_radix2_unsigned_pp(a, b, w, wb)
     # """Generate binary radix-2 signed partial products using Baugh-Wooley"""
     # partial_products = []
     # prod_width = 2 * w
@@ -185,6 +229,25 @@ def binary_radix2_signed_pp(a, b, w):
     # return partial_products, None
 
 
+# -------------------------------------------------------------------------
+#  Runtime signed/unsigned (signed_mode) partial‑product generator
+# -------------------------------------------------------------------------
+def signed_mode_pp(a, b, w, wb, mode, encoding, radix=4):
+    """Generate the partial products of a signed_mode tree for a * b
+
+    Booth recodes both operands extended by one bit, their sign bit ANDed
+    with mode, as signed operands; binary rows are plain ANDs and the tree
+    switches the Baugh-Wooley inversions with signed_mode itself.
+    """
+    if encoding == 'binary':
+        return binary_radix2_unsigned_pp(a, b, w, wb)
+    a_ext = a | (mode & (a >> (w - 1))) << w
+    b_ext = b | (mode & (b >> (wb - 1))) << wb
+    if radix != 4:
+        return booth_high_radix_pp(a_ext, b_ext, w + 1, radix, False, wb + 1)
+    return booth_radix4_pp_signed(a_ext, b_ext, w + 1, wb + 1)
+
+
 # -------------------------------------------------------------------------
 #  Main vector‑generation routine
 # -------------------------------------------------------------------------
@@ -195,8 +258,16 @@ def generate_test_vectors(
     output_dir,
     num_tests=8,
     exhaustive=False,
+    radix=4,
+    wb=None,
+    signed_mode=False,
 ):
-    """Generate partial product test vectors"""
+    """Generate partial product test vectors (a is w bits, b is wb bits)
+
+    With signed_mode every test also picks the mode (1 signed, 0 unsigned),
+    written to test_mode.hex.
+    """
+    wb = wb or w
 
     os.makedirs(output_dir, exist_ok=True)
 
@@ -206,7 +277,7 @@ def generate_test_vectors(
     if exhaustive:
         # Guard against ridiculously large files.
         MAX_EXHAUSTIVE = 2**20  # ~1 M vectors → ~16 MiB for 16‑bit operands
-        total_vectors = (1 << w) * (1 << w)
+        total_vectors = (1 << w) * (1 << wb)
         if total_vectors > MAX_EXHAUSTIVE:
             print(
                 f"⚠️  Exhaustive mode would create {total_vectors:,} test vectors,\n"
@@ -219,18 +290,28 @@ def generate_test_vectors(
         test_a = []
         test_b = []
         for a in range(1 << w):
-            for b in range(1 << w):
+            for b in range(1 << wb):
                 test_a.append(a)
                 test_b.append(b)
+        modes = [int(not unsigned)] * len(test_a)
+        if signed_mode:
+            # Every pair in both modes
+            test_a, test_b = test_a * 2, test_b * 2
+            modes = [1] * len(modes) + [0] * len(modes)
     else:
         # Non‑exhaustive – keep the original “hand‑picked + random” behaviour.
         test_a, test_b = [], []
         test_a.append(0);                test_b.append(0)
-        test_a.append((1 << w) - 1);     test_b.append((1 << w) - 1)
-
-        if not unsigned:
+        test_a.append((1 << w) - 1);     test_b.append((1 << wb) - 1)
+
+        if signed_mode:
+            # Signed corners, then the all-ones pair again unsigned
+            test_a += [1 << (w - 1), 1, (1 << w) - 1]
+            test_b += [1, 1 << (wb - 1), (1 << wb) - 1]
+            modes = [1, 1, 1, 1, 0]
+        elif not unsigned:
             test_a += [1 << (w - 1), 1, (1 << (w - 1)) - 1]
-            test_b += [1, 1 << (w - 1), (1 << (w - 1)) - 1]
+            test_b += [1, 1 << (wb - 1), (1 << (wb - 1)) - 1]
         else:
             test_a += [1, (1 << w) - 1]
             test_b += [1, 1]
@@ -238,42 +319,57 @@ def generate_test_vectors(
         # Fill the remainder with random values up to the requested count.
         for _ in range(num_tests - len(test_a)):
             test_a.append(random.randint(0, (1 << w) - 1))
-            test_b.append(random.randint(0, (1 << w) - 1))
+            test_b.append(random.randint(0, (1 << wb) - 1))
+        if signed_mode:
+            modes += [random.randint(0, 1) for _ in range(len(test_a) - len(modes))]
+        else:
+            modes = [int(not unsigned)] * len(test_a)
 
     # -----------------------------------------------------------------
     # 2️⃣  Choose the PP generator
     # -----------------------------------------------------------------
-    if encoding == 'booth':
+    if signed_mode:
+        k = radix.bit_length() - 1
+        pp_gen = lambda a, b, w, wb, mode: signed_mode_pp(a, b, w, wb, mode, encoding, radix)
+        # Booth rows of the (wb+1)-bit multiplier, each with a cpl
+        num_pp = wb // k + 1 if encoding == 'booth' else wb
+        num_cpl = num_pp
+    elif encoding == 'booth' and radix != 4:
+        k = radix.bit_length() - 1
+        pp_gen = lambda a, b, w, wb: booth_high_radix_pp(a, b, w, radix, unsigned, wb)
+        num_pp = wb // k + 1 if unsigned else (wb + k - 1) // k
+        num_cpl = num_pp - 1 if unsigned else num_pp
+    elif encoding == 'booth':
         if unsigned:
             pp_gen = booth_radix4_pp_unsigned
-            num_pp = (w) // 2 + 1
-            num_cpl = (w) // 2
+            num_pp = (wb) // 2 + 1
+            num_cpl = (wb) // 2
         else:
             pp_gen = booth_radix4_pp_signed
-            num_cpl = (w + 1) // 2
-            num_pp = (w + 1) // 2
+            num_cpl = (wb + 1) // 2
+            num_pp = (wb + 1) // 2
     else:
-        num_pp = w
+        num_pp = wb
         pp_gen = binary_radix2_unsigned_pp if unsigned else binary_radix2_signed_pp
 
-    prod_width = 2 * w
+    prod_width = w + wb
     all_pps, all_cpls, expected = [], [], []
 
     # -----------------------------------------------------------------
     # 3️⃣  Generate PP, CPL (if any) and expected product for every pair
     # -----------------------------------------------------------------
-    for a, b in zip(test_a, test_b):
-        pps, cpls = pp_gen(a, b, w)
+    for a, b, mode in zip(test_a, test_b, modes):
+        pps, cpls = pp_gen(a, b, w, wb, mode) if signed_mode else pp_gen(a, b, w, wb)
         all_pps.append(pps)
         all_cpls.append(cpls if cpls else [0] * num_pp)
-        if unsigned:
+        if not mode:
             product = a * b
         else:
             a_signed = a if a < (1 << (w - 1)) else a - (1 << w)
-            b_signed = b if b < (1 << (w - 1)) else b - (1 << w)
+            b_signed = b if b < (1 << (wb - 1)) else b - (1 << wb)
             product = a_signed * b_signed
             if product < 0:
-                product += (1 << (2 * w))
+                product += (1 << prod_width)
         expected.append(product & ((1 << prod_width) - 1))
 
     # -----------------------------------------------------------------
@@ -290,6 +386,11 @@ def generate_test_vectors(
                 for test_idx in range(len(test_a)):
                     f.write(f"{all_pps[test_idx][pp_idx]:0{(prod_width + 3)//4}x}\n")
 
+    if signed_mode:
+        with open(os.path.join(output_dir, 'test_mode.hex'), 'w') as f:
+            for mode in modes:
+                f.write(f"{mode:01x}\n")
+
     if encoding == 'booth' and not unsigned:
         for cpl_idx in range(num_cpl):
             with open(os.path.join(output_dir, f'test_cpl{cpl_idx}.hex'), 'w') as f:
@@ -307,7 +408,7 @@ def generate_test_vectors(
 
     with open(os.path.join(output_dir, 'test_b.hex'), 'w') as f:
         for b in test_b:
-            f.write(f"{b:0{(w + 3)//4}x}\n")
+            f.write(f"{b:0{(wb + 3)//4}x}\n")
 
     with open(os.path.join(output_dir, 'test_expected.hex'), 'w') as f:
         for exp in expected:
@@ -319,15 +420,15 @@ def generate_test_vectors(
     print(f"\n✅ Test vectors written to: {output_dir}")
     print("=" * 80)
     max_display = 50                     # avoid flooding the console
-    for i, (a, b, exp) in enumerate(zip(test_a, test_b, expected)):
+    for i, (a, b, exp, mode) in enumerate(zip(test_a, test_b, expected, modes)):
         if i >= max_display:
             print(f"... ({len(test_a) - max_display} more tests omitted)")
             break
-        if unsigned:
+        if not mode:
             print(f"Test {i}: {a} * {b} = {exp}")
         else:
-            print(f"Test {i}: {uint_to_signed(a, w)} * {uint_to_signed(b, w)} = {uint_to_signed(exp, prod_width)}")
-        print(f"        {uint_to_binary_str(a, w)} * {uint_to_binary_str(b, w)} = {uint_to_binary_str(exp, prod_width)}")
+            print(f"Test {i}: {uint_to_signed(a, w)} * {uint_to_signed(b, wb)} = {uint_to_signed(exp, prod_width)}")
+        print(f"        {uint_to_binary_str(a, w)} * {uint_to_binary_str(b, wb)} = {uint_to_binary_str(exp, prod_width)}")
 
     print("=" * 80)
 
@@ -338,11 +439,17 @@ def export_defines(args):
     # Compute NUM_PP and BOOTH based on encoding
     if args.encoding == "booth":
         booth = 1
-        num_pp = (args.width + 1) // 2
+        # The testbench adds the unsigned top row (no cpl) to NUM_PP itself,
+        # signed_mode has one more row with a cpl
+        k = args.radix.bit_length() - 1
+        if args.signed_mode:
+            num_pp = args.wb // k + 1
+        else:
+            num_pp = args.wb // k if args.unsigned else (args.wb + k - 1) // k
 
     else:
         booth = 0
-        num_pp = args.width
+        num_pp = args.wb
 
     # Create output directory if needed
     os.makedirs(os.path.dirname(args.header), exist_ok=True)
@@ -351,11 +458,14 @@ def export_defines(args):
 
     with open(header_path, "w") as f:
         f.write(f'`define W {args.width}\n')
+        f.write(f'`define WB {args.wb}\n')
         f.write(f'`define TESTS {args.num_tests}\n')
         f.write(f'`define NUM_PP {num_pp}\n')
         f.write(f'`define BOOTH {booth}\n')
+        f.write(f'`define RADIX {args.radix}\n')
         f.write(f'`define UNSIGNED {1 if args.unsigned else 0}\n')
-        f.write(f'`define PROD_W (2*`W)\n')
+        f.write(f'`define SIGNED_MODE {1 if args.signed_mode else 0}\n')
+        f.write(f'`define PROD_W (`W+`WB)\n')
 
     print(f"[+] Exported Verilog defines to {header_path}")
 
@@ -370,15 +480,27 @@ def main():
         '-w', '--width', type=int, default=16,
         help='Input width'
     )
+    parser.add_argument(
+        '--wb', type=int, default=None,
+        help='Multiplier (b) width (default: --width)'
+    )
     parser.add_argument(
         '-e', '--encoding', type=str, default='booth',
         choices=['booth', 'binary'],
         help='Encoding type'
     )
+    parser.add_argument(
+        '--radix', type=int, default=4, choices=[4, 8, 16],
+        help='Booth radix'
+    )
     parser.add_argument(
         '--unsigned', action='store_true',
         help='Unsigned multiplication'
     )
+    parser.add_argument(
+        '--signed-mode', action='store_true',
+        help='Runtime signed/unsigned tree: vectors of both modes, plus test_mode.hex'
+    )
     parser.add_argument(
         '-n', '--num-tests', type=int, default=8,
         help='Number of test vectors (ignored when --exhaustive is used)'
@@ -403,8 +525,13 @@ def main():
     if args.no_random:
         random.seed(0)
 
+    args.wb = args.wb or args.width
+
+    if args.signed_mode and args.unsigned:
+        parser.error('--signed-mode covers both modes, drop --unsigned')
+
     if args.exhaustive:
-        args.num_tests = 2 ** (args.width * 2)
+        args.num_tests = 2 ** (args.width + args.wb) * (2 if args.signed_mode else 1)
 
     test_a, test_b, all_pps, all_cpls, expected = generate_test_vectors(
         args.width,
@@ -413,6 +540,9 @@ def main():
         args.output,
         args.num_tests,
         exhaustive=args.exhaustive,
+        radix=args.radix,
+        wb=args.wb,
+        signed_mode=args.signed_mode,
     )
 
     export_defines(args)
@@ -22,11 +22,15 @@ def generate_test_data(args):
 
     Args:
         num_tests: Number of test cases
-        width: Bit width of operands
+        width: Bit width of operands (of x only when wb is set)
+        wb: Bit width of y
         output_dir: Directory to write output hex files
+        signed_mode: Pick signed or unsigned per test, written to mode_vals.hex
     """
     signed = not(args.unsigned)
     width = args.width
+    wb = args.wb
+    prod_width = width + wb
     num_tests = args.num_tests
     output_dir = args.output
     exhaustive = args.exhaustive
@@ -35,42 +39,48 @@ def generate_test_data(args):
     x_vals = []
     y_vals = []
     p_vals = []
+    m_vals = []
     if exhaustive:
-        max_val = 1 << width
-        print(f"Running exhaustive generation for width={width} ...")
-
-        for x in range(max_val):
-            for y in range(max_val):
-                if signed:
-                    x_signed = twos_complement(x, width)
-                    y_signed = twos_complement(y, width)
-                    p_signed = x_signed * y_signed
-                    p = twos_from_signed(p_signed, 2 * width)
-                else:
-                    p = x * y
-
-                x_vals.append(x)
-                y_vals.append(y)
-                p_vals.append(p)
+        print(f"Running exhaustive generation for width={width}x{wb} ...")
+
+        # signed_mode covers every pair in both modes
+        for signed in ([True, False] if args.signed_mode else [signed]):
+            for x in range(1 << width):
+                for y in range(1 << wb):
+                    if signed:
+                        x_signed = twos_complement(x, width)
+                        y_signed = twos_complement(y, wb)
+                        p_signed = x_signed * y_signed
+                        p = twos_from_signed(p_signed, prod_width)
+                    else:
+                        p = x * y
+
+                    x_vals.append(x)
+                    y_vals.append(y)
+                    p_vals.append(p)
+                    m_vals.append(int(signed))
         num_tests = len(x_vals)
     else:
         for _ in range(num_tests):
+            if args.signed_mode:
+                signed = random.random() < 0.5
             if signed:
                 x = random.randint(-(1 << (width - 1)), (1 << (width - 1)) - 1)
-                y = random.randint(-(1 << (width - 1)), (1 << (width - 1)) - 1)
+                y = random.randint(-(1 << (wb - 1)), (1 << (wb - 1)) - 1)
                 x_hex = twos_from_signed(x, width)
-                y_hex = twos_from_signed(y, width)
+                y_hex = twos_from_signed(y, wb)
             else:
                 x_hex = random.randint(0, (1 << width) - 1)
-                y_hex = random.randint(0, (1 << width) - 1)
+                y_hex = random.randint(0, (1 << wb) - 1)
                 x = x_hex
                 y = y_hex
             p = x * y
-            p_hex = p & ((1 << (2 * width)) - 1)
+            p_hex = p & ((1 << prod_width) - 1)
 
             x_vals.append(x_hex)
             y_vals.append(y_hex)
             p_vals.append(p_hex)
+            m_vals.append(int(signed))
     # Write to files
     def write_hex(filename, values):
         path = os.path.join(output_dir, filename)
@@ -81,22 +91,25 @@ def generate_test_data(args):
     write_hex("x_vals.hex", x_vals)
     write_hex("y_vals.hex", y_vals)
     write_hex("p_vals.hex", p_vals)
+    if args.signed_mode:
+        write_hex("mode_vals.hex", m_vals)
 
-    print(f"Generated {num_tests} test vectors ({width}-bit)")
+    print(f"Generated {num_tests} test vectors ({width}-bit)" if wb == width
+          else f"Generated {num_tests} test vectors ({width}x{wb}-bit)")
     print(f"Files written to: {os.path.abspath(output_dir)}")
     print("\nSample test cases:")
     if args.dump_all:
         for i in range(num_tests):
             print(f"  Test {i}: {x_vals[i]:x} * {y_vals[i]:x} = {p_vals[i]:x}")
-            if signed:
-                print(f"            {twos_complement(x_vals[i], width)} * {twos_complement(y_vals[i], width)} = {twos_complement(p_vals[i], 2 * width)}") # want 2s complement decimal values
+            if m_vals[i]:
+                print(f"            {twos_complement(x_vals[i], width)} * {twos_complement(y_vals[i], wb)} = {twos_complement(p_vals[i], prod_width)}") # want 2s complement decimal values
             else:
                 print(f"            {x_vals[i]} * {y_vals[i]} = {p_vals[i]}")
     else:
         for i in range(min(3, num_tests)):
             print(f"  Test {i}: {x_vals[i]:x} * {y_vals[i]:x} = {p_vals[i]:x}")
-            if signed:
-                print(f"            {twos_complement(x_vals[i], width)} * {twos_complement(y_vals[i], width)} = {twos_complement(p_vals[i], 2 * width)}") # want 2s complement decimal values
+            if m_vals[i]:
+                print(f"            {twos_complement(x_vals[i], width)} * {twos_complement(y_vals[i], wb)} = {twos_complement(p_vals[i], prod_width)}") # want 2s complement decimal values
             else:
                 print(f"            {x_vals[i]} * {y_vals[i]} = {p_vals[i]}")
 
@@ -110,9 +123,11 @@ def export_defines(args):
 
     with open(header_path, "w") as f:
         f.write(f'`define W {args.width}\n')
+        f.write(f'`define WB {args.wb}\n')
         f.write(f'`define TESTS {args.num_tests}\n')
         f.write(f'`define UNSIGNED {1 if args.unsigned else 0}\n')
-        f.write(f'`define PROD_W (2*`W)\n')
+        f.write(f'`define SIGNED_MODE {1 if args.signed_mode else 0}\n')
+        f.write(f'`define PROD_W (`W+`WB)\n')
 
     print(f"[+] Exported Verilog defines to {header_path}")
 
@@ -125,8 +140,12 @@ if __name__ == '__main__':
                         help='Number of test cases (ignored in exhaustive mode)')
     parser.add_argument('-w', '--width', type=int, default=16,
                         help='Bit width of operands')
+    parser.add_argument('--wb', type=int, default=None,
+                        help='Bit width of the second operand (default: --width)')
     parser.add_argument('-u', '--unsigned', action='store_true',
                         help='Generate unsigned multiplication test vectors')
+    parser.add_argument('--signed-mode', action='store_true',
+                        help='Runtime signed/unsigned multiplier: both modes, plus mode_vals.hex')
     parser.add_argument('-o', '--output', type=str, default="data/",
                         help='Output directory for hex files')
     parser.add_argument('--exhaustive', action='store_true',
@@ -139,14 +158,17 @@ if __name__ == '__main__':
                     help='Output directory to store top.h header file')
 
     args = parser.parse_args()
+    args.wb = args.wb or args.width
+    if args.signed_mode and args.unsigned:
+        parser.error('--signed-mode covers both modes, drop --unsigned')
     if args.no_random:
         random.seed(0)
         
     if args.exhaustive:
         max_width = 16
-        if args.width > max_width:
+        if max(args.width, args.wb) > max_width:
             raise ValueError(f"Exhaustive mode only valid for width ≤ {max_width}")
-        num_tests = 2 ** (args.width * 2)
+        num_tests = 2 ** (args.width + args.wb) * (2 if args.signed_mode else 1)
         args.num_tests = num_tests
     
     generate_test_data(args)
@@ -2,50 +2,98 @@
 for arg in "$@"; do
     case $arg in
         W=*) W="${arg#*=}" ;;
+        WB=*) WB="${arg#*=}" ;;
         ENCODING=*) ENCODING="${arg#*=}" ;;
         COMPRESSOR_ALGORITHM=*) COMPRESSOR_ALGORITHM="${arg#*=}" ;;
         PREFIX_ALGORITHM=*) PREFIX_ALGORITHM="${arg#*=}" ;;
         M=*) M="${arg#*=}" ;;
         PIPE=*) PIPE="${arg#*=}" ;;
         UNSIGNED=*) UNSIGNED="${arg#*=}" ;;
+        SIGNED_MODE=*) SIGNED_MODE="${arg#*=}" ;;
+        RADIX=*) RADIX="${arg#*=}" ;;
+        FINAL_HEIGHT=*) FINAL_HEIGHT="${arg#*=}" ;;
         FINAL_ADDER=*) ;;
         *) ;;
     esac
 done
 
 W=${W:-16}
+WB=${WB:-$W}
 ENCODING=${ENCODING:-binary}
 COMPRESSOR_ALGORITHM=${COMPRESSOR_ALGORITHM:-dadda}
 PREFIX_ALGORITHM=${PREFIX_ALGORITHM:-kogge-stone}
 M=${M:-0}
 PIPE=${PIPE:-0}
 UNSIGNED=${UNSIGNED:-0}
+SIGNED_MODE=${SIGNED_MODE:-0}
+RADIX=${RADIX:-4}
+FINAL_HEIGHT=${FINAL_HEIGHT:-2}
+[ "$ENCODING" = "booth" ] || RADIX=4
+case $RADIX in 4) BOOTH_K=2 ;; 8) BOOTH_K=3 ;; 16) BOOTH_K=4 ;; *) echo "ERROR: RADIX must be 4, 8 or 16" >&2; exit 1 ;; esac
+case $FINAL_HEIGHT in 2|3) ;; *) echo "ERROR: FINAL_HEIGHT must be 2 or 3" >&2; exit 1 ;; esac
 
-# Step 1: Generate compressor tree
-if [ "$UNSIGNED" -eq 1 ]; then
-    python3 compressor_tree.py -w $W -e $ENCODING -a $COMPRESSOR_ALGORITHM -o rtl/compressor_tree.sv -r tb/ --unsigned
+# SIGNED_MODE=1 adds a signed_mode input picking signed (1) or unsigned (0)
+# per multiplication, in one datapath
+if [ "$SIGNED_MODE" -eq 1 ] && [ "$UNSIGNED" -eq 1 ]; then
+    echo "ERROR: SIGNED_MODE=1 selects signedness at run time, drop UNSIGNED=1" >&2; exit 1
+fi
+SIGN_FLAG=""
+[ "$UNSIGNED" -eq 1 ] && SIGN_FLAG="--unsigned"
+[ "$SIGNED_MODE" -eq 1 ] && SIGN_FLAG="--signed-mode"
+
+# FINAL_HEIGHT=3 stops the tree at three rows, summed by its final_adder3
+TREE_OUTS="sum, carry"
+TREE_PORTS=".sum(sum), .carry(carry)"
+if [ "$FINAL_HEIGHT" -eq 3 ]; then
+    TREE_OUTS="sum, carry, carry2"
+    TREE_PORTS=".sum(sum), .carry(carry), .carry2(carry2)"
+fi
+
+# The tree has one row (or Booth digit) per bit of the recoded operand, so
+# recode the shorter one: X is recoded, Y is the multiplicand
+if [ "$WB" -gt "$W" ]; then
+    WX=$W; WY=$WB; X_OP=a; Y_OP=b
 else
-    python3 compressor_tree.py -w $W -e $ENCODING -a $COMPRESSOR_ALGORITHM -o rtl/compressor_tree.sv -r tb/
+    WX=$WB; WY=$W; X_OP=b; Y_OP=a
 fi
 
+# Generators sit next to this script or under its scripts/ folder
+SCRIPTS=$(dirname "$0")
+[ -f "$SCRIPTS/compressor_tree.py" ] || SCRIPTS="$SCRIPTS/scripts"
+
+# Step 1: Generate compressor tree
+python3 $SCRIPTS/compressor_tree.py -w $WY --wb $WX -e $ENCODING -a $COMPRESSOR_ALGORITHM --radix $RADIX --final-height $FINAL_HEIGHT -o rtl/compressor_tree.sv -r tb/ $SIGN_FLAG
+
 # Step 2: Extract parameters
 NUM_STAGES=$(grep "Reduction Stages:" rtl/compressor_tree.sv | grep -o "[0-9]*" | head -1)
 NUM_PP=$(grep "Partial Products:" rtl/compressor_tree.sv | grep -o "[0-9]*" | head -1)
-[ -z "$NUM_PP" ] && NUM_PP=$(( ENCODING == "booth" ? (W + 1) / 2 : W ))
+[ -z "$NUM_PP" ] && NUM_PP=$(( ENCODING == "booth" ? (WX + 1) / 2 : WX ))
 
 # Step 3: Generate prefix tree
-python3 prefix_tree.py -w $((W * 2)) --technique $PREFIX_ALGORITHM --verilog -o rtl/prefix_tree.sv > /dev/null 2>&1
+python3 $SCRIPTS/prefix_tree.py -w $((W + WB)) --technique $PREFIX_ALGORITHM --verilog -o rtl/prefix_tree.sv > /dev/null 2>&1
+
+# Step 3b: Radix-8/16 Booth precomputes its hard multiples (3Y, 5Y, 7Y)
+if [ "$RADIX" -gt 4 ]; then
+    python3 $SCRIPTS/hard_multiples.py -w $WY --radix $RADIX --technique $PREFIX_ALGORITHM -o rtl/hard_multiples.sv $SIGN_FLAG > /dev/null
+fi
 
 # Step 4: Generate multiplier.sv
 mkdir -p rtl
+MODE_PORT=""
+[ "$SIGNED_MODE" -eq 1 ] && MODE_PORT="
+    input  logic signed_mode,  // 1: signed a * b, 0: unsigned"
 cat > rtl/multiplier.sv << HEADER
-module multiplier #(parameter W = $W, parameter PIPE = $PIPE, parameter M = $M)(
+module multiplier #(parameter W = $W, parameter WB = $WB, parameter PIPE = $PIPE, parameter M = $M)(
     input  logic clk, rst,
-    input  logic [W-1:0] a, b,
-    output logic [2*W-1:0] product
+    input  logic [W-1:0] a,
+    input  logic [WB-1:0] b,$MODE_PORT
+    output logic [W+WB-1:0] product
 );
-    localparam PROD_W = 2 * W;
+    localparam PROD_W = W + WB;
     localparam NUM_PP = $NUM_PP;
+    localparam bit UNSIGNED = $UNSIGNED;
+    localparam bit SIGNED_MODE = $SIGNED_MODE;
+    localparam int BOOTH_K = $BOOTH_K;
     localparam int PP_STAGES = (M > 0) ? 1 : 0;
     localparam int OUTPUT_STAGES = (M > 1) ? 1 : 0;
     localparam int NUM_COMP_STAGES = $NUM_STAGES;
@@ -53,25 +101,90 @@ module multiplier #(parameter W = $W, parameter PIPE = $PIPE, parameter M = $M)(
     localparam int PREFIX_STAGES = 0;
     localparam int TOTAL_LATENCY = PP_STAGES + COMPRESSOR_STAGES + PREFIX_STAGES + OUTPUT_STAGES;
 
+    // PP rows recode x, the shorter operand, and multiply y
+    localparam WX = $WX;
+    localparam WY = $WY;
+    logic [WX-1:0] x;
+    logic [WY-1:0] y;
+    assign x = $X_OP;
+    assign y = $Y_OP;
+
 HEADER
 
 if [ "$ENCODING" = "booth" ]; then
+    # Operand sign fill: the sign bit, zeros, or the sign bit when signed_mode
+    if [ "$UNSIGNED" -eq 1 ]; then
+        Y_EXT="{1'b0, y}"; X_FILL="1'b0"
+    elif [ "$SIGNED_MODE" -eq 1 ]; then
+        Y_EXT="{signed_mode & y[WY-1], y}"; X_FILL="signed_mode & x[WX-1]"
+    else
+        Y_EXT="y"; X_FILL="x[WX-1]"
+    fi
     cat >> rtl/multiplier.sv << 'BOOTH'
-    localparam PP_WIDTH = W + 1;
+    // Radix-2^K Booth PPs are up to 2^(K-1) times the multiplicand, K-1
+    // bits wider. Unsigned Booth encodes the zero-extended (WY+1)-bit
+    // multiplicand, so its PPs are one bit wider again and its top row
+    // (never negative) has no cpl. SIGNED_MODE extends both operands with
+    // their sign bit ANDed with signed_mode and recodes them as signed
+    localparam Y_WIDTH = (UNSIGNED || SIGNED_MODE) ? WY + 1 : WY;
+    localparam PP_WIDTH = Y_WIDTH + BOOTH_K - 1;
+    localparam NUM_CPL = UNSIGNED ? NUM_PP - 1 : NUM_PP;
     logic [PP_WIDTH-1:0] pp_individual [NUM_PP-1:0];
     logic cpl_individual [NUM_PP-1:0];
     logic [PP_WIDTH-1:0] pp_packed [NUM_PP-1:0];
     logic [PP_WIDTH-1:0] pp_packed_pipe [NUM_PP-1:0];
     logic [NUM_PP-1:0] cpl, cpl_pipe;
 
+    // Multiplicand and multiplier extended for the Booth digits: x_ext[0]
+    // is x[-1] = 0, above x comes its sign (signed) or zeros (unsigned)
+    logic [Y_WIDTH-1:0] y_ext;
+    logic [BOOTH_K*NUM_PP+1:0] x_ext;
+BOOTH
+    cat >> rtl/multiplier.sv << BOOTH_EXT
+    assign y_ext = $Y_EXT;
+    assign x_ext = {{(BOOTH_K*NUM_PP+1-WX){$X_FILL}}, x, 1'b0};
+BOOTH_EXT
+    if [ "$RADIX" -eq 4 ]; then
+        cat >> rtl/multiplier.sv << 'BOOTH4'
+
     genvar i;
     generate
         for (i = 0; i < NUM_PP; i++) begin : gen_booth_pp
-            booth_pp #(.W(W), .PIPE(0)) booth_inst (
-                .clk(clk), .rst(rst), .y(a),
-                .booth_bits({(i == NUM_PP-1) ? 1'b0 : b[2*i+2], b[2*i+1], b[2*i], (i == 0) ? 1'b0 : b[2*i-1]}),
+            booth_pp #(.W(Y_WIDTH), .PIPE(0)) booth_inst (
+                .clk(clk), .rst(rst), .y(y_ext),
+                .booth_bits(x_ext[2*i +: 3]),
                 .pp(pp_individual[i]), .cpl(cpl_individual[i])
             );
+BOOTH4
+    else
+        # Radix-8 has no 5Y or 7Y (digits stop at 4)
+        if [ "$RADIX" -eq 16 ]; then
+            HARD_PORTS=".y3(y3), .y5(y5), .y7(y7)"
+            HARD_TIES=""
+        else
+            HARD_PORTS=".y3(y3)"
+            HARD_TIES="    assign y5 = '0;
+    assign y7 = '0;"
+        fi
+        cat >> rtl/multiplier.sv << HIGH_RADIX
+
+    // Hard multiples, shared by every PP row
+    logic [PP_WIDTH-1:0] y3, y5, y7;
+    hard_multiples hard_mult (.clk(clk), .rst(rst), .y(y_ext), $HARD_PORTS);
+$HARD_TIES
+
+    genvar i;
+    generate
+        for (i = 0; i < NUM_PP; i++) begin : gen_booth_pp
+            booth_pp_radix #(.W(Y_WIDTH), .K(BOOTH_K), .PIPE(0)) booth_inst (
+                .clk(clk), .rst(rst), .y(y_ext),
+                .y3(y3), .y5(y5), .y7(y7),
+                .booth_bits(x_ext[BOOTH_K*i +: BOOTH_K+1]),
+                .pp(pp_individual[i]), .cpl(cpl_individual[i])
+            );
+HIGH_RADIX
+    fi
+    cat >> rtl/multiplier.sv << 'BOOTH'
             assign pp_packed[i] = pp_individual[i];
             assign cpl[i] = cpl_individual[i];
         end
@@ -88,27 +201,32 @@ if [ "$ENCODING" = "booth" ]; then
         end
     endgenerate
 
-    logic [PROD_W-1:0] sum, carry;
+BOOTH
+    cat >> rtl/multiplier.sv << BOOTH_TREE
+    logic [PROD_W-1:0] $TREE_OUTS;
     generate
         if (M > 0) begin : gen_comp_pipeline
-            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed_pipe), .cpl(cpl_pipe), .sum(sum), .carry(carry));
+            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed_pipe), .cpl(cpl_pipe[NUM_CPL-1:0]), $TREE_PORTS);
         end else begin : gen_comp_no_pipeline
-            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed), .cpl(cpl), .sum(sum), .carry(carry));
+            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed), .cpl(cpl[NUM_CPL-1:0]), $TREE_PORTS);
         end
     endgenerate
-BOOTH
+BOOTH_TREE
 else
+    # The signed_mode tree switches its Baugh-Wooley bits, the PP rows stay ANDs
+    TREE_MODE=""
+    [ "$SIGNED_MODE" -eq 1 ] && TREE_MODE=", .signed_mode(tree_mode)"
     cat >> rtl/multiplier.sv << 'BINARY'
-    localparam PP_WIDTH = W;
-    logic [W:0] pp_individual [NUM_PP-1:0];
-    logic [W-1:0] pp_packed [NUM_PP-1:0];
-    logic [W-1:0] pp_packed_pipe [NUM_PP-1:0];
+    localparam PP_WIDTH = WY;
+    logic [WY:0] pp_individual [NUM_PP-1:0];
+    logic [WY-1:0] pp_packed [NUM_PP-1:0];
+    logic [WY-1:0] pp_packed_pipe [NUM_PP-1:0];
 
     genvar i;
     generate
         for (i = 0; i < NUM_PP; i++) begin : gen_binary_pp
-            binary_pp #(.W(W), .PIPE(0)) binary_inst (.clk(clk), .rst(rst), .y(a), .binary_bit(b[i]), .pp(pp_individual[i]));
-            assign pp_packed[i] = pp_individual[i][W-1:0];
+            binary_pp #(.W(WY), .PIPE(0)) binary_inst (.clk(clk), .rst(rst), .y(y), .binary_bit(x[i]), .pp(pp_individual[i]));
+            assign pp_packed[i] = pp_individual[i][WY-1:0];
         end
         if (M > 0) begin : gen_pp_pipeline
             always_ff @(posedge clk) begin
@@ -121,21 +239,51 @@ else
         end
     endgenerate
 
-    logic [PROD_W-1:0] sum, carry;
+BINARY
+    if [ "$SIGNED_MODE" -eq 1 ]; then
+        cat >> rtl/multiplier.sv << 'MODE'
+    // signed_mode reaches the tree in step with the PP rows
+    logic tree_mode;
+    generate
+        if (M > 0) begin : gen_mode_pipeline
+            always_ff @(posedge clk) begin
+                if (rst) tree_mode <= 1'b0;
+                else tree_mode <= signed_mode;
+            end
+        end else begin : gen_mode_no_pipeline
+            assign tree_mode = signed_mode;
+        end
+    endgenerate
+
+MODE
+    fi
+    cat >> rtl/multiplier.sv << BINARY
+    logic [PROD_W-1:0] $TREE_OUTS;
     generate
         if (M > 0) begin : gen_comp_pipeline
-            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed_pipe), .sum(sum), .carry(carry));
+            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed_pipe)$TREE_MODE, $TREE_PORTS);
         end else begin : gen_comp_no_pipeline
-            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed), .sum(sum), .carry(carry));
+            compressor_tree #(.PIPE(PIPE)) comp_tree (.clk(clk), .rst(rst), .pp(pp_packed)$TREE_MODE, $TREE_PORTS);
         end
     endgenerate
 BINARY
 fi
 
-cat >> rtl/multiplier.sv << 'FOOTER'
+cat >> rtl/multiplier.sv << 'FINAL'
 
     logic [PROD_W-1:0] final_sum;
+FINAL
+if [ "$FINAL_HEIGHT" -eq 3 ]; then
+    cat >> rtl/multiplier.sv << 'FINAL3'
+    final_adder3 #(.W(PROD_W)) final_add (.sum(sum), .carry(carry), .carry2(carry2), .product(final_sum));
+FINAL3
+else
+    cat >> rtl/multiplier.sv << 'FINAL2'
     assign final_sum = sum + carry;
+FINAL2
+fi
+
+cat >> rtl/multiplier.sv << 'FOOTER'
 
     generate
         if (M > 1) begin : gen_output_pipeline
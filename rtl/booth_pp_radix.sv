@@ -0,0 +1,85 @@
+module booth_pp_radix #(
+    parameter W    = 16,  // Multiplicand width (signed)
+    parameter K    = 3,   // Bits recoded per digit: 3 for radix-8, 4 for radix-16
+    parameter PIPE = 0
+) (
+    // Only if PIPE=1
+    input logic clk,
+    input logic rst,
+
+    input  logic [  W-1:0] y,           // Multiplicand
+    input  logic [W+K-2:0] y3,          // Hard multiples from hard_multiples.sv
+    input  logic [W+K-2:0] y5,          // (y5 and y7 radix-16 only)
+    input  logic [W+K-2:0] y7,
+    input  logic [    K:0] booth_bits,  // Booth Encoded Input
+    output logic [W+K-2:0] pp,          // Partial Product Output
+    output logic           cpl          // Complement Bit because its 2s complement
+);
+  localparam PW = W + K - 1;
+
+  int           magnitude;  // |digit|, 0 to 2^(K-1)
+  logic         sign;  // Sign bit (negate if 1)
+
+  logic [PW-1:0] y_ext;  // Sign-extended Y
+  logic [PW-1:0] selected;  // Mux output
+  logic [PW-1:0] pp_comb;  // Combinational partial product
+  logic          cpl_comb;  // Combinational complement bit
+
+  // Booth decoding logic
+  // digit = -2^(K-1) b[K] + sum 2^(j-1) b[j] (j = 1..K-1) + b[0]
+  // A negative digit has magnitude 2^(K-1) minus the rest, and the all-ones
+  // encoding is -0 (inverted zero plus cpl), like radix-4 111
+  always_comb begin
+    magnitude = int'(booth_bits[0]);
+    for (int j = 1; j < K; j++) magnitude += int'(booth_bits[j]) << (j - 1);
+    sign = booth_bits[K];
+    if (sign) magnitude = (1 << (K - 1)) - magnitude;
+  end
+
+  // Partial product generation
+  always_comb begin
+    y_ext = {{(K - 1) {y[W-1]}}, y};
+
+    // Multiplexer: even multiples are shifts, odd ones precomputed
+    case (magnitude)
+      0: selected = {PW{1'b0}};
+      1: selected = y_ext;
+      2: selected = y_ext << 1;
+      3: selected = y3;
+      4: selected = y_ext << 2;
+      5: selected = y5;
+      6: selected = y3 << 1;
+      7: selected = y7;
+      default: selected = y_ext << 3;
+    endcase
+
+    cpl_comb = sign;
+
+    // Conditional negation (one's complement)
+    // If sign bit is set, invert all bits
+    if (sign) begin
+      pp_comb = ~selected;
+    end else begin  // for the latch instead of ff
+      pp_comb = selected;
+    end
+  end
+
+  // Optional pipeline stage
+  generate
+    if (PIPE == 1) begin : gen_pipe
+      always_ff @(posedge clk or posedge rst) begin
+        if (rst) begin
+          pp  <= {PW{1'b0}};
+          cpl <= 1'b0;
+        end else begin
+          pp  <= pp_comb;
+          cpl <= cpl_comb;
+        end
+      end
+    end else begin : gen_comb
+      assign pp  = pp_comb;
+      assign cpl = cpl_comb;
+    end
+  endgenerate
+
+endmodule
@@ -0,0 +1,19 @@
+module compressor42 (
+    input  logic a,
+    input  logic b,
+    input  logic c,
+    input  logic d,
+    input  logic c_in,
+    output logic s,
+    output logic carry,
+    output logic c_out
+);
+  // a + b + c + d + c_in = s + 2 * (carry + c_out)
+  // c_out does not depend on c_in, so chained 4:2s do not ripple
+  logic ab, abcd;
+  assign ab    = a ^ b;
+  assign abcd  = ab ^ c ^ d;
+  assign c_out = ab ? c : a;
+  assign s     = abcd ^ c_in;
+  assign carry = abcd ? c_in : d;
+endmodule
@@ -0,0 +1,32 @@
+// Generalized parallel counters (k_1,k_0;m)
+// s = number of ones in x0 + 2 * number of ones in x1
+
+module gpc7_3 (
+    input  logic [6:0] x0,
+    output logic [2:0] s
+);
+  assign s = x0[0] + x0[1] + x0[2] + x0[3] + x0[4] + x0[5] + x0[6];
+endmodule
+
+module gpc6_3 (
+    input  logic [5:0] x0,
+    output logic [2:0] s
+);
+  assign s = x0[0] + x0[1] + x0[2] + x0[3] + x0[4] + x0[5];
+endmodule
+
+module gpc15_3 (
+    input  logic [4:0] x0,
+    input  logic [0:0] x1,
+    output logic [2:0] s
+);
+  assign s = x0[0] + x0[1] + x0[2] + x0[3] + x0[4] + {x1[0], 1'b0};
+endmodule
+
+module gpc23_3 (
+    input  logic [2:0] x0,
+    input  logic [1:0] x1,
+    output logic [2:0] s
+);
+  assign s = x0[0] + x0[1] + x0[2] + {x1[0], 1'b0} + {x1[1], 1'b0};
+endmodule
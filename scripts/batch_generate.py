@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+"""
+Batch generation of compressor trees and prefix trees
+Runs a list or grid of configurations across a process pool in one
+invocation. Every configuration gets its own output directory, and a
+manifest.json in the output root records parameters, statistics and outputs.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from compressor_tree import (
+    ALGORITHMS,
+    BOOTH_RADICES,
+    GPC_OBJECTIVES,
+    GPC_SHAPES,
+    CompressorTreeGenerator,
+    generate_cached,
+)
+from prefix_tree import PrefixTreeGenerator
+from tree_cache import TreeCache
+
+KINDS = ("compressor_tree", "prefix_tree")
+
+# Parameters of each kind, with the defaults of their CLIs
+DEFAULTS = {
+    "compressor_tree": {
+        "w": 16,
+        "wb": None,
+        "num_pp": None,
+        "encoding": "booth",
+        "radix": 4,
+        "algorithm": "dadda",
+        "unsigned": False,
+        "signed_mode": False,
+        "sign_ext_opt": True,
+        "fold_constants": True,
+        "prune_dead_logic": True,
+        "propagate_constants": True,
+        "gpc_objective": "stages",
+        "max_stages": None,
+        "max_cells": None,
+        "final_height": 2,
+        "timing_driven": False,
+        "assign_fa_pins": False,
+    },
+    "prefix_tree": {
+        "width": 32,
+        "technique": "kogge-stone",
+        "pipeline": 0,
+    },
+}
+
+
+def normalize(config):
+    """Fill in defaults and reject unknown parameters"""
+    kind = config.get("kind", "compressor_tree")
+    if kind not in KINDS:
+        raise ValueError(f"Unknown kind: {kind}")
+    params = {key: value for key, value in config.items() if key != "kind"}
+    unknown = set(params) - set(DEFAULTS[kind])
+    if unknown:
+        raise ValueError(f"Unknown {kind} parameters: {', '.join(sorted(unknown))}")
+    return {"kind": kind, **DEFAULTS[kind], **params}
+
+
+def config_name(config):
+    """Directory name of a configuration"""
+    if config["kind"] == "prefix_tree":
+        return f"prefix_tree_w{config['width']}_{config['technique']}_p{config['pipeline']}"
+    width = config["w"] if config["wb"] in (None, config["w"]) else f"{config['w']}x{config['wb']}"
+    sign = "mode" if config["signed_mode"] else "unsigned" if config["unsigned"] else "signed"
+    name = f"compressor_tree_w{width}_{config['encoding']}_{config['algorithm']}_{sign}"
+    if config["algorithm"] == "gpc":
+        name += f"_{config['gpc_objective']}"
+    if config["algorithm"] == "exact":
+        if config["max_stages"] is not None:
+            name += f"_s{config['max_stages']}"
+        if config["max_cells"] is not None:
+            name += f"_c{config['max_cells']}"
+    if config["encoding"] == "booth" and config["radix"] != 4:
+        name += f"_r{config['radix']}"
+    if config["num_pp"] is not None:
+        name += f"_pp{config['num_pp']}"
+    if config["final_height"] != 2:
+        name += f"_h{config['final_height']}"
+    if not config["sign_ext_opt"]:
+        name += "_naive"
+    if not config["fold_constants"]:
+        name += "_nofold"
+    if not config["prune_dead_logic"]:
+        name += "_noprune"
+    if not config["propagate_constants"]:
+        name += "_noprop"
+    if config["timing_driven"]:
+        name += "_timing"
+    if config["assign_fa_pins"]:
+        name += "_pins"
+    return name
+
+
+def grid(args):
+    """Configurations of the cartesian product of the CLI value lists"""
+    configs = []
+    if "compressor_tree" in args.kind:
+        for w, wb, encoding, algorithm, sign in itertools.product(
+            args.width, args.wb or [None], args.encoding, args.algorithm, args.sign
+        ):
+            # Only the gpc algorithm has an objective, only Booth a radix
+            objectives = args.gpc_objective if algorithm == "gpc" else [None]
+            radices = args.radix if encoding == "booth" else [4]
+            for objective, radix in itertools.product(objectives, radices):
+                config = {
+                    "kind": "compressor_tree",
+                    "w": w,
+                    "encoding": encoding,
+                    "algorithm": algorithm,
+                    "unsigned": sign == "unsigned",
+                }
+                if sign == "mode":
+                    config["signed_mode"] = True
+                if wb is not None and wb != w:
+                    config["wb"] = wb
+                if radix != 4:
+                    config["radix"] = radix
+                if objective:
+                    config["gpc_objective"] = objective
+                if args.timing_driven:
+                    config["timing_driven"] = True
+                if args.assign_fa_pins:
+                    config["assign_fa_pins"] = True
+                configs.append(config)
+    if "prefix_tree" in args.kind:
+        widths = args.prefix_width or [2 * w for w in args.width]
+        for width, technique, pipeline in itertools.product(
+            widths, args.technique, args.pipeline
+        ):
+            configs.append({
+                "kind": "prefix_tree",
+                "width": width,
+                "technique": technique,
+                "pipeline": pipeline,
+            })
+    return configs
+
+
+def _run_compressor_tree(config, out_dir, cache):
+    output = os.path.join(out_dir, "compressor_tree.sv")
+    gen = CompressorTreeGenerator(
+        w=config["w"],
+        wb=config["wb"],
+        num_pp=config["num_pp"],
+        sign_ext_opt=config["sign_ext_opt"],
+        unsigned=config["unsigned"],
+        signed_mode=config["signed_mode"],
+        encoding=config["encoding"],
+        algorithm=config["algorithm"],
+        build=False,
+        gpc_objective=config["gpc_objective"],
+        max_stages=config["max_stages"],
+        max_cells=config["max_cells"],
+        final_height=config["final_height"],
+        radix=config["radix"],
+        timing_driven=config["timing_driven"],
+        assign_fa_pins=config["assign_fa_pins"],
+        fold_constants=config["fold_constants"],
+        prune_dead_logic=config["prune_dead_logic"],
+        propagate_constants=config["propagate_constants"],
+    )
+    gen, cached = generate_cached(gen, output, cache)
+    stats = {
+        "num_pp": gen.num_pp,
+        "prod_width": gen.prod_width,
+        "stages": gen.num_stages,
+        "fa": len(gen.fa_instances),
+        "ha": len(gen.ha_instances),
+        "c42": len(gen.c42_instances),
+        "gpc": sum(len(gen.cell_lists()[kind]) for kind in GPC_SHAPES),
+        "final_height": gen.stages[-1].max_height(),
+        "sum_only": sum(len(cells) for cells in gen.sum_only_cells.values()),
+        "constant_cells": sum(gen.propagation_report or ()),
+    }
+    stats["lut_area"], stats["lut_levels"] = gen.cost()
+    stats["critical_path"] = max(gen.arrival_profile())
+    return [output], stats, cached
+
+
+def _run_prefix_tree(config, out_dir, cache):
+    output = os.path.join(out_dir, "prefix_tree.sv")
+    gen = PrefixTreeGenerator(config["width"], config["technique"], config["pipeline"])
+    gen.generate_tree()
+    gen.generate_verilog(output)
+    return [output], {"levels": gen.max_level}, False
+
+
+RUNNERS = {
+    "compressor_tree": _run_compressor_tree,
+    "prefix_tree": _run_prefix_tree,
+}
+
+
+def run_config(config, out_root, use_cache=True, cache_dir=None):
+    """Generate one configuration into out_root/<name>, returning its manifest record"""
+    name = config_name(config)
+    out_dir = os.path.join(out_root, name)
+    record = {"name": name, "config": config, "dir": name}
+    start = time.perf_counter()
+    try:
+        os.makedirs(out_dir, exist_ok=True)
+        cache = TreeCache(cache_dir) if use_cache else None
+        # Generators report progress on stdout; keep worker output quiet
+        with contextlib.redirect_stdout(io.StringIO()):
+            outputs, stats, cached = RUNNERS[config["kind"]](config, out_dir, cache)
+        record["outputs"] = [os.path.relpath(path, out_root) for path in outputs]
+        record["stats"] = stats
+        record["cached"] = cached
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["seconds"] = round(time.perf_counter() - start, 6)
+    return record
+
+
+def run_batch(configs, out_root, jobs=None, use_cache=True, cache_dir=None):
+    """Generate every configuration across a process pool and write the manifest
+
+    Returns the manifest dict; records are in input order.
+    """
+    configs = [normalize(config) for config in configs]
+    names = [config_name(config) for config in configs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate configurations: {', '.join(duplicates)}")
+
+    os.makedirs(out_root, exist_ok=True)
+    start = time.perf_counter()
+    n = len(configs)
+    if jobs == 1 or n <= 1:
+        records = [run_config(config, out_root, use_cache, cache_dir) for config in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            records = list(
+                pool.map(
+                    run_config,
+                    configs,
+                    [out_root] * n,
+                    [use_cache] * n,
+                    [cache_dir] * n,
+                    chunksize=max(1, n // (4 * (jobs or os.cpu_count() or 1))),
+                )
+            )
+
+    manifest = {
+        "jobs": jobs or os.cpu_count(),
+        "seconds": round(time.perf_counter() - start, 6),
+        "configs": records,
+    }
+    with open(os.path.join(out_root, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate many compressor/prefix tree configurations in parallel"
+    )
+    parser.add_argument(
+        "-c",
+        "--config",
+        type=str,
+        default=None,
+        help="JSON file with a list of configurations (overrides the grid options)",
+    )
+    parser.add_argument(
+        "-k",
+        "--kind",
+        type=str,
+        nargs="+",
+        default=["compressor_tree"],
+        choices=KINDS,
+        help="Generators in the grid",
+    )
+    parser.add_argument(
+        "-w", "--width", type=int, nargs="+", default=[16], help="Compressor tree input widths"
+    )
+    parser.add_argument(
+        "--wb",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Compressor tree multiplier (b) widths (default: square)",
+    )
+    parser.add_argument(
+        "-e",
+        "--encoding",
+        type=str,
+        nargs="+",
+        default=["booth"],
+        choices=["booth", "binary"],
+        help="Encoding types",
+    )
+    parser.add_argument(
+        "--radix",
+        type=int,
+        nargs="+",
+        default=[4],
+        choices=BOOTH_RADICES,
+        help="Booth radices",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        type=str,
+        nargs="+",
+        default=["dadda"],
+        choices=ALGORITHMS,
+        help="Reduction algorithms",
+    )
+    parser.add_argument(
+        "--gpc-objective",
+        type=str,
+        nargs="+",
+        default=["stages"],
+        choices=GPC_OBJECTIVES,
+        help="Objectives of the gpc algorithm",
+    )
+    parser.add_argument(
+        "--timing-driven",
+        action="store_true",
+        help="Build every compressor tree of the grid timing-driven",
+    )
+    parser.add_argument(
+        "--assign-fa-pins",
+        action="store_true",
+        help="Run FA pin assignment on every compressor tree of the grid",
+    )
+    parser.add_argument(
+        "--sign",
+        type=str,
+        nargs="+",
+        default=["signed"],
+        choices=["signed", "unsigned", "mode"],
+        help="Multiplication types (mode: signed or unsigned at run time, signed_mode)",
+    )
+    parser.add_argument(
+        "--prefix-width",
+        type=int,
+        nargs="+",
+        default=None,
+        help="Prefix tree widths (default twice each compressor tree width)",
+    )
+    parser.add_argument(
+        "-t",
+        "--technique",
+        type=str,
+        nargs="+",
+        default=["kogge-stone"],
+        choices=["brent-kung", "sklansky", "kogge-stone"],
+        help="Prefix tree techniques",
+    )
+    parser.add_argument(
+        "--pipeline", type=int, nargs="+", default=[0], help="Prefix tree pipeline stages"
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, default="batch", help="Output root directory"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always rebuild, bypassing the tree cache"
+    )
+    parser.add_argument("--cache-dir", type=str, default=None, help="Tree cache directory")
+    args = parser.parse_args()
+
+    if args.config:
+        with open(args.config) as f:
+            configs = json.load(f)
+    else:
+        configs = grid(args)
+
+    try:
+        manifest = run_batch(configs, args.output, args.jobs, not args.no_cache, args.cache_dir)
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    failed = [record for record in manifest["configs"] if "error" in record]
+    cached = sum(record.get("cached", False) for record in manifest["configs"])
+    for record in failed:
+        print(f"ERROR: {record['name']}: {record['error']}", file=sys.stderr)
+    print(
+        f"Generated {len(manifest['configs']) - len(failed)}/{len(manifest['configs'])} "
+        f"configurations ({cached} from cache) in {manifest['seconds']:.2f}s "
+        f"with {manifest['jobs']} jobs"
+    )
+    print(f"Manifest: {os.path.join(args.output, 'manifest.json')}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the compressor tree generator
+  emit: Verilog/Graphviz emission time against cell count
+  import: cold start of compressor_tree.py against a time budget
+  scale: build + Verilog time and peak memory at W=1024 against the envelope
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from compressor_tree import ALGORITHMS, CompressorTreeGenerator
+from gen_graphviz import GraphvizGenerator
+from gen_verilog import VerilogGenerator
+
+
+def _quiet(fn, *args, **kwargs):
+    """Call fn with stdout discarded"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def _best_of(repeat, fn):
+    """Smallest wall time of repeat calls to fn"""
+    best = math.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _loglog_slope(xs, ys):
+    """Least-squares slope of log(ys) against log(xs)"""
+    lx = [math.log(x) for x in xs]
+    ly = [math.log(y) for y in ys]
+    mx = sum(lx) / len(lx)
+    my = sum(ly) / len(ly)
+    num = sum((x - mx) * (y - my) for x, y in zip(lx, ly))
+    den = sum((x - mx) ** 2 for x in lx)
+    return num / den
+
+
+def bench_emit(args):
+    """Time Verilog and Graphviz emission for growing widths"""
+    cells, verilog_times, dot_times = [], [], []
+
+    print(f"{'W':>5} {'cells':>8} {'verilog':>10} {'us/cell':>8} {'graphviz':>10} {'us/cell':>8}")
+    for w in args.widths:
+        gen = _quiet(
+            CompressorTreeGenerator,
+            w=w,
+            encoding=args.encoding,
+            algorithm=args.algorithm,
+            unsigned=args.encoding == "binary",
+        )
+        n = sum(len(cells) for cells in gen.cell_lists().values())
+        t_v = _best_of(args.repeat, lambda: _quiet(VerilogGenerator(gen).generate_module))
+        t_g = _best_of(args.repeat, lambda: GraphvizGenerator(gen).generate_dot())
+        cells.append(n)
+        verilog_times.append(t_v)
+        dot_times.append(t_g)
+        print(
+            f"{w:>5} {n:>8} {t_v:>9.3f}s {1e6 * t_v / n:>8.2f} "
+            f"{t_g:>9.3f}s {1e6 * t_g / n:>8.2f}"
+        )
+
+    # Growth exponent over the larger half of the sweep, where fixed costs vanish
+    tail = max(2, len(cells) // 2)
+    slopes = {
+        "verilog": _loglog_slope(cells[-tail:], verilog_times[-tail:]),
+        "graphviz": _loglog_slope(cells[-tail:], dot_times[-tail:]),
+    }
+    print()
+    failed = False
+    for name, slope in slopes.items():
+        status = "ok" if slope <= args.max_slope else "FAIL"
+        failed |= slope > args.max_slope
+        print(f"{name} time ~ cells^{slope:.2f} (limit {args.max_slope}) {status}")
+    return 1 if failed else 0
+
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Modules only -v/-s may pull in, never at import
+LAZY_MODULES = ("rich", "gen_graphviz", "visualize_heap")
+
+
+def _time_python(code, repeat):
+    """Smallest wall time of repeat fresh interpreters running code"""
+    return _best_of(
+        repeat,
+        lambda: subprocess.run(
+            [sys.executable, "-c", code], cwd=SCRIPTS_DIR, check=True
+        ),
+    )
+
+
+def bench_import(args):
+    """Time a fresh interpreter importing compressor_tree, minus bare startup"""
+    t_bare = _time_python("pass", args.repeat)
+    t_import = _time_python("import compressor_tree", args.repeat)
+    cost_ms = 1e3 * (t_import - t_bare)
+
+    check = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys, compressor_tree; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))",
+        ],
+        cwd=SCRIPTS_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    eager = check.stdout.split()
+
+    print(f"interpreter startup:     {1e3 * t_bare:8.1f} ms")
+    print(f"import compressor_tree:  {1e3 * t_import:8.1f} ms")
+    status = "ok" if cost_ms <= args.budget_ms else "FAIL"
+    print(f"import cost:             {cost_ms:8.1f} ms (budget {args.budget_ms} ms) {status}")
+    if eager:
+        print(f"FAIL: imported eagerly: {', '.join(eager)}")
+    return 1 if eager or cost_ms > args.budget_ms else 0
+
+
+# Documented W=1024 envelope (README), per encoding/algorithm, with headroom
+# over measured values: (build seconds, build + Verilog seconds, peak RSS MiB)
+SCALE_WIDTH = 1024
+SCALE_ENVELOPE = {
+    ("binary", "dadda"): (12, 60, 700),
+    ("binary", "bickerstaff"): (12, 50, 720),
+    ("binary", "wallace"): (12, 50, 700),
+    ("binary", "wallace_ra"): (12, 50, 700),
+    ("binary", "faonly"): (25, 120, 1100),
+    ("binary", "c42"): (12, 35, 600),
+    ("binary", "gpc"): (10, 30, 520),
+    ("booth", "dadda"): (10, 45, 560),
+    ("booth", "bickerstaff"): (10, 40, 540),
+    ("booth", "wallace"): (10, 40, 540),
+    ("booth", "wallace_ra"): (10, 40, 540),
+    ("booth", "faonly"): (25, 110, 950),
+    ("booth", "c42"): (8, 35, 560),
+    ("booth", "gpc"): (8, 25, 420),
+}
+
+# The exact search is meant for small trees and has no W=1024 envelope
+SCALE_ALGORITHMS = tuple(a for a in ALGORITHMS if a != "exact")
+
+
+def _scale_point(w, encoding, algorithm, output):
+    """Build and emit one tree, printing timings and peak RSS as JSON"""
+    from gen_verilog import generate_verilog
+
+    start = time.perf_counter()
+    gen = _quiet(
+        CompressorTreeGenerator,
+        w=w,
+        encoding=encoding,
+        algorithm=algorithm,
+        unsigned=encoding == "binary",
+    )
+    built = time.perf_counter()
+    _quiet(generate_verilog, gen, output)
+    done = time.perf_counter()
+    print(json.dumps({
+        "cells": sum(len(cells) for cells in gen.cell_lists().values()),
+        "stages": gen.num_stages,
+        "build": built - start,
+        "total": done - start,
+        "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "bytes": os.path.getsize(output),
+    }))
+
+
+def bench_scale(args):
+    """Generate every encoding/algorithm at the given widths in fresh processes"""
+    failed = False
+    print(
+        f"{'W':>5} {'encoding':>8} {'algorithm':>12} {'cells':>8} {'stages':>6} "
+        f"{'build':>8} {'total':>8} {'RSS MiB':>8} {'RTL MiB':>8}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, "compressor_tree.sv")
+        for w in args.widths:
+            for encoding in args.encoding:
+                for algorithm in args.algorithm:
+                    code = (
+                        "import bench_compressor_tree as b; "
+                        f"b._scale_point({w}, {encoding!r}, {algorithm!r}, {output!r})"
+                    )
+                    result = subprocess.run(
+                        [sys.executable, "-c", code],
+                        cwd=SCRIPTS_DIR,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                    )
+                    r = json.loads(result.stdout.splitlines()[-1])
+                    status = ""
+                    if w == SCALE_WIDTH:
+                        max_build, max_total, max_rss = SCALE_ENVELOPE[(encoding, algorithm)]
+                        max_build *= args.slack
+                        max_total *= args.slack
+                        over = [
+                            name
+                            for name, value, limit in (
+                                ("build", r["build"], max_build),
+                                ("total", r["total"], max_total),
+                                ("RSS", r["rss_mb"], max_rss),
+                            )
+                            if value > limit
+                        ]
+                        status = f"FAIL ({', '.join(over)})" if over else "ok"
+                        failed |= bool(over)
+                    print(
+                        f"{w:>5} {encoding:>8} {algorithm:>12} {r['cells']:>8} {r['stages']:>6} "
+                        f"{r['build']:>7.2f}s {r['total']:>7.2f}s {r['rss_mb']:>8.0f} "
+                        f"{r['bytes'] / 2**20:>8.0f}  {status}"
+                    )
+    return 1 if failed else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compressor tree generator benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    emit = sub.add_parser("emit", help="Emission time against cell count")
+    emit.add_argument(
+        "-w", "--widths", type=int, nargs="+", default=[16, 32, 64, 128, 256]
+    )
+    emit.add_argument(
+        "-e", "--encoding", type=str, default="booth", choices=["booth", "binary"]
+    )
+    emit.add_argument(
+        "-a",
+        "--algorithm",
+        type=str,
+        default="dadda",
+        choices=ALGORITHMS,
+    )
+    emit.add_argument("--repeat", type=int, default=3, help="Runs per point (best kept)")
+    emit.add_argument(
+        "--max-slope",
+        type=float,
+        default=1.15,
+        help="Fail if emission time grows faster than cells^max-slope",
+    )
+    emit.set_defaults(func=bench_emit)
+
+    imp = sub.add_parser("import", help="Cold start of compressor_tree.py")
+    imp.add_argument("--repeat", type=int, default=10, help="Runs per point (best kept)")
+    imp.add_argument(
+        "--budget-ms",
+        type=float,
+        default=50.0,
+        help="Fail if importing compressor_tree costs more than this",
+    )
+    imp.set_defaults(func=bench_import)
+
+    scale = sub.add_parser("scale", help="W=1024 generation against the envelope")
+    scale.add_argument("-w", "--widths", type=int, nargs="+", default=[SCALE_WIDTH])
+    scale.add_argument(
+        "-e", "--encoding", type=str, nargs="+", default=["binary", "booth"],
+        choices=["booth", "binary"],
+    )
+    scale.add_argument(
+        "-a", "--algorithm", type=str, nargs="+", default=list(SCALE_ALGORITHMS),
+        choices=SCALE_ALGORITHMS,
+    )
+    scale.add_argument(
+        "--slack",
+        type=float,
+        default=1.0,
+        help="Scale the time limits (e.g. 2 on a slower machine); memory limits are fixed",
+    )
+    scale.set_defaults(func=bench_scale)
+
+    args = parser.parse_args()
+    sys.exit(args.func(args))
+
+
+if __name__ == "__main__":
+    main()
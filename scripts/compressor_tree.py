@@ -2,16 +2,18 @@
 """
 Compressor Tree Generator using Bit Heap Construction
 Generates optimized SystemVerilog code for compressor trees
-Supports: Dadda, Bickerstaff, FA-only algorithms
-Supports: Signed/Unsigned Binary and Booth (Radix-4) encoding
+Supports: Dadda, Bickerstaff, Wallace, FA-only, 4:2 compressor and GPC algorithms
+Supports: Signed/Unsigned Binary and Booth (Radix-4/8/16) encoding
 Uses Baugh-Wooley sign extension optimization
 """
 
 from gen_verilog import generate_verilog
-from gen_graphviz import generate_graphviz
-from visualize_heap import visualize_before_after_rich
+from tracing import SILENT, TRACE_LEVELS, tracer_from_args
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import partial
+from itertools import permutations
 import sys
-import os
 
 
 def dadda_sequence(n):
@@ -25,70 +27,417 @@ def dadda_sequence(n):
     return seq
 
 
+def c42_sequence(n):
+    """Generate 4:2 compressor tree height sequence up to/past n
+    Sequence: 2, 4, 8, 16, 32, ...
+    Each stage of 4:2 compressors halves the heap height
+    """
+    seq = [2]
+    while seq[-1] < n:
+        seq.append(seq[-1] * 2)
+    return seq
+
+
+def wallace_sequence(n):
+    """Generate Wallace height sequence from 2 up to n
+    Every stage maps each group of three rows to two, so a stage takes
+    height h to 2*floor(h/3) + h mod 3 (e.g. 16, 11, 8, 6, 4, 3, 2)
+    """
+    seq = [n]
+    while seq[-1] > 2:
+        h = seq[-1]
+        seq.append(2 * (h // 3) + h % 3)
+    return seq[::-1]
+
+
+def reduction_targets(seq, initial_max, final_height=2):
+    """Stage targets of a height sequence, from below initial_max down to final_height
+    Sequence heights at or below final_height give way to final_height itself
+    """
+    targets = [h for h in reversed(seq) if final_height < h < initial_max]
+    if initial_max > final_height:
+        targets.append(final_height)
+    return targets
+
+
 def compute_stages(n):
     """Compute number of stages needed for n partial products"""
     seq = dadda_sequence(n)
     return len(seq) - 1
 
 
+# Bit types, stored as small integer codes in the signal table
+BIT_TYPES = (
+    "normal",
+    "inverted_msb",
+    "sign_ext",
+    "correction",
+    "fa_sum",
+    "fa_carry",
+    "ha_sum",
+    "ha_carry",
+    "c42_sum",
+    "c42_carry",
+    "c42_cout",
+    "zero",
+    "gpc_s0",
+    "gpc_s1",
+    "gpc_s2",
+    "mode_inverted",
+    "mode",
+)
+BIT_TYPE_CODE = {bit_type: code for code, bit_type in enumerate(BIT_TYPES)}
+
+# Runtime signed/unsigned trees (signed_mode) read the mode as a primary
+# input: Baugh-Wooley bits are inverted, and its corrections set, only when
+# it is 1
+MODE_CODE = BIT_TYPE_CODE["mode"]
+
+# Suffix of the cell output wire driving a bit of each type
+OUTPUT_SUFFIX = tuple(
+    bit_type[3:] if bit_type.startswith("gpc_")
+    else "_s" if bit_type.endswith("_sum")
+    else "_co" if bit_type.endswith("_cout")
+    else "_c"
+    for bit_type in BIT_TYPES
+)
+
+# Generalized parallel counters (k_1,k_0;m) by cell kind, as (k_0, k_1, m):
+# a counter adds k_0 bits of its column and k_1 bits of the next one into an
+# m-bit count placed in its column and the m - 1 above. Listed in the order
+# they take bits from a column.
+GPC_SHAPES = {
+    "gpc7_3": (7, 0, 3),
+    "gpc6_3": (6, 0, 3),
+    "gpc15_3": (5, 1, 3),
+    "gpc23_3": (3, 2, 3),
+}
+
+# Cell kinds, indexed by the cell_kind array of the signal table
+CELL_KINDS = ("fa", "ha", "c42") + tuple(GPC_SHAPES)
+FA_KIND = CELL_KINDS.index("fa")
+
+# Estimated cost of each cell kind on a 6-input LUT fabric, as (area in
+# LUTs, delay in LUT levels). Dual-output LUTs fit an FA or HA in one LUT
+# and a 5-input counter in two; a (7;3) needs a second level.
+CELL_COSTS = {
+    "fa": (1, 1),
+    "ha": (1, 1),
+    "c42": (2, 2),
+    "gpc7_3": (5, 2),
+    "gpc6_3": (3, 1),
+    "gpc15_3": (3, 1),
+    "gpc23_3": (2, 1),
+}
+
+# Estimated delay from the latest input of a cell to each of its outputs, in
+# XOR gate delays: an HA sum is one XOR, a 4:2 sum goes through three XORs,
+# and a GPC count through the FA tree it maps to ((7;3): sum at 4, count
+# bits 1 and 2 at 5 and 4)
+OUTPUT_DELAYS = {
+    "ha_sum": 1,
+    "ha_carry": 1,
+    "c42_sum": 3,
+    "c42_carry": 2,
+    "gpc_s0": 4,
+    "gpc_s1": 5,
+    "gpc_s2": 4,
+}
+OUTPUT_DELAY = tuple(OUTPUT_DELAYS.get(bit_type, 0) for bit_type in BIT_TYPES)
+
+# Outputs with a delay per input pin, in the order of the cell's inputs, None
+# where the output does not depend on the input. c_in only goes through the
+# second XOR of an FA sum, and the 4:2 carry-out is a function of a, b and c,
+# so chained carry-outs don't ripple.
+PIN_DELAYS = {
+    "fa_sum": (2, 2, 1),  # a, b, c_in
+    "fa_carry": (1, 1, 1),
+    "c42_cout": (1, 1, 1, None, None),  # a, b, c, d, c_in
+}
+PIN_DELAY = tuple(PIN_DELAYS.get(bit_type) for bit_type in BIT_TYPES)
+
+# Reduction algorithms of CompressorTreeGenerator
+ALGORITHMS = ("dadda", "bickerstaff", "wallace", "wallace_ra", "faonly", "c42", "gpc", "exact")
+
+# What the GPC algorithm minimizes. stages reduces every column as far as
+# it can each stage, widest counters first; area reduces as late as possible
+# on the Dadda sequence with the counters removing the most bits per LUT
+GPC_OBJECTIVES = ("stages", "area")
+
+# Heap heights reduction can stop at: 2 rows for a sum + carry adder, or 3
+# for a ternary adder, one stage earlier
+FINAL_HEIGHTS = (2, 3)
+
+# Booth radices: radix 2**k recodes k multiplier bits per partial product;
+# radix 8 and 16 select precomputed odd (hard) multiples of the multiplicand
+BOOTH_RADICES = (4, 8, 16)
+
+
+def constant_cell_outputs(ones, free):
+    """Constant sum and carry of an FA or HA reading ones 1s and free other inputs
+
+    Each output is 0 or 1 when the constants fix it and None when it still
+    depends on the free inputs. The sum is the parity of the inputs and the
+    carry is set when two of them are.
+    """
+    sum_value = None if free else ones & 1
+    need = 2 - ones  # free inputs that must be set for a carry
+    if need <= 0:
+        carry_value = 1
+    elif need > free:
+        carry_value = 0
+    else:
+        carry_value = None
+    return sum_value, carry_value
+
+
+def constant_cell_logic(values, exprs):
+    """Sum and carry of an FA or HA with constant inputs, as Verilog expressions
+
+    values holds the value of each constant input and None for the others,
+    which are read through exprs. An HA with a 1 is an inverter and a wire,
+    an FA with a 1 an XNOR and an OR.
+    """
+    ones = sum(value for value in values if value)
+    free = [expr for value, expr in zip(values, exprs) if value is None]
+    sum_value, carry_value = constant_cell_outputs(ones, len(free))
+    if sum_value is not None:
+        sum_expr = f"1'b{sum_value}"
+    else:
+        sum_expr = " ^ ".join(free)
+        if ones & 1:
+            sum_expr = f"~{sum_expr}" if len(free) == 1 else f"~({sum_expr})"
+    if carry_value is not None:
+        carry_expr = f"1'b{carry_value}"
+    else:
+        carry_expr = (" | " if ones == 1 else " & ").join(free)
+    return sum_expr, carry_expr
+
+
+class SignalTable:
+    """Flat table of every bit signal in a compressor tree
+
+    Bits are integer IDs indexing parallel arrays (type, producing cell and
+    partial product coordinates). Names are only built when Verilog or DOT
+    is emitted.
+    """
+
+    def __init__(self):
+        # Per-bit data
+        self.bit_type = array("B")
+        self.source = array("l")  # producing cell, -1 for primary inputs
+        self.row = array("l")  # pp/cpl row, -1 for constant bits
+        self.index = array("l")  # bit within the pp row, -1 for cpl bits
+
+        # Per-cell data
+        self.cell_kind = array("B")
+        self.cell_stage = array("l")
+        self.cell_col = array("l")
+        self.cell_n = array("l")
+
+        self.zero = -1  # shared constant 1'b0 bit, created on first use
+
+    def __len__(self):
+        return len(self.bit_type)
+
+    def _add(self, bit_type, source=-1, row=-1, index=-1):
+        self.bit_type.append(BIT_TYPE_CODE[bit_type])
+        self.source.append(source)
+        self.row.append(row)
+        self.index.append(index)
+        return len(self.bit_type) - 1
+
+    def pp(self, row, index, bit_type="normal"):
+        """New bit for pp[row][index]"""
+        return self._add(bit_type, row=row, index=index)
+
+    def cpl(self, row, bit_type="normal"):
+        """New bit for cpl[row]"""
+        return self._add(bit_type, row=row)
+
+    def const_one(self, bit_type="normal"):
+        """New constant 1'b1 bit"""
+        return self._add(bit_type)
+
+    def mode(self):
+        """New bit for the signed_mode input"""
+        return self._add("mode")
+
+    def is_constant(self, bit):
+        """True for constant 1'b1 and 1'b0 bits, False for the signed_mode input"""
+        return self.row[bit] < 0 and self.bit_type[bit] != MODE_CODE
+
+    def const_zero(self):
+        """Shared constant 1'b0 bit, for cell inputs with nothing to add"""
+        if self.zero < 0:
+            self.zero = self._add("zero")
+        return self.zero
+
+    def add_cell(self, kind, stage, col, n):
+        """Register a cell and return its ID"""
+        self.cell_kind.append(CELL_KINDS.index(kind))
+        self.cell_stage.append(stage)
+        self.cell_col.append(col)
+        self.cell_n.append(n)
+        return len(self.cell_kind) - 1
+
+    def cell_output(self, cell, bit_type):
+        """New bit driven by an output of cell"""
+        return self._add(bit_type, source=cell)
+
+    def cell_name(self, cell):
+        """Instance name of a cell"""
+        return (
+            f"{CELL_KINDS[self.cell_kind[cell]]}_s{self.cell_stage[cell]}"
+            f"_c{self.cell_col[cell]}_n{self.cell_n[cell]}"
+        )
+
+    def type_of(self, bit):
+        """Bit type name of a bit"""
+        return BIT_TYPES[self.bit_type[bit]]
+
+    def is_direct(self, bit, stage):
+        """True if a cell of stage reads bit by name rather than from its column
+
+        That is the outputs of other cells of the same stage (chained 4:2
+        carry-outs) and the constant zero.
+        """
+        cell = self.source[bit]
+        if cell >= 0:
+            return self.cell_stage[cell] == stage
+        return bit == self.zero
+
+    def name(self, bit):
+        """Verilog name of a bit"""
+        cell = self.source[bit]
+        if cell >= 0:
+            return self.cell_name(cell) + OUTPUT_SUFFIX[self.bit_type[bit]]
+        row = self.row[bit]
+        if row < 0:
+            if self.bit_type[bit] == MODE_CODE:
+                return "signed_mode"
+            return "1'b0" if bit == self.zero else "1'b1"
+        index = self.index[bit]
+        if index < 0:
+            return f"cpl[{row}]"
+        return f"pp[{row}][{index}]"
+
+
 class BitHeap:
-    """Represents a bit heap - collection of bits at each position"""
+    """Represents a bit heap - collection of bits at each position
 
-    def __init__(self, width):
-        self.width = width
-        # Each heap entry is (bit_name, bit_type)
-        # bit_type: 'normal', 'inverted_msb', 'sign_ext', 'fa_sum', 'fa_carry', 'ha_sum', 'ha_carry'
-        self.heap = [[] for _ in range(width)]
+    Each column is an array of bit IDs from a shared SignalTable. Bits are
+    consumed from the bottom by advancing a per-column start offset. locate()
+    maps a bit to the (stage, column, index) where it sits so stage wiring
+    can look bits up directly.
+    """
 
-    def add_bit(self, position, bit_name, bit_type="normal"):
-        """Add a bit to the heap at given position with type"""
+    def __init__(self, width, signals=None, stage=0):
+        self.width = width
+        self.signals = SignalTable() if signals is None else signals
+        self.stage = stage
+        self.heap = [array("l") for _ in range(width)]
+        self.start = [0] * width
+        self._location = None
+
+    def add_bit(self, position, bit):
+        """Add a bit to the heap at given position"""
         if 0 <= position < self.width:
-            self.heap[position].append((bit_name, bit_type))
-
-    def add_word(self, word_name, word_width, offset=0, is_signed=False):
+            self.heap[position].append(bit)
+            self._location = None
+
+    def add_bits(self, position, bits):
+        """Add several bits to the heap at given position, in order"""
+        self.heap[position].extend(bits)
+        self._location = None
+
+    def locate(self, bit):
+        """(stage, column, index) where bit was placed in this heap, or None
+
+        The bit -> location map is only built on the first lookup, so heaps
+        that are never searched (every heap during reduction) don't pay for it.
+        """
+        if self._location is None:
+            stage = self.stage
+            self._location = {
+                bit: (stage, col, index)
+                for col, bits in enumerate(self.heap)
+                for index, bit in enumerate(bits)
+            }
+        return self._location.get(bit)
+
+    def add_word(self, row, word_width, offset=0, is_signed=False):
         """Add a word (partial product) to the heap"""
         for i in range(word_width):
             pos = offset + i
             if is_signed and i == word_width - 1:
                 # Mark MSB as inverted if using optimized sign extension
-                self.add_bit(pos, f"{word_name}[{i}]", "inverted_msb")
+                self.add_bit(pos, self.signals.pp(row, i, "inverted_msb"))
             else:
-                self.add_bit(pos, f"{word_name}[{i}]", "normal")
+                self.add_bit(pos, self.signals.pp(row, i, "normal"))
+
+    def bits(self, position):
+        """Bits currently in a column, bottom first"""
+        return self.heap[position][self.start[position]:]
+
+    def name(self, bit):
+        """Verilog name of a bit"""
+        return self.signals.name(bit)
+
+    def type_of(self, bit):
+        """Bit type name of a bit"""
+        return self.signals.type_of(bit)
 
     def height(self, position):
         """Get height of heap at given position"""
-        return len(self.heap[position])
+        return len(self.heap[position]) - self.start[position]
+
+    def heights(self):
+        """Heights of all columns"""
+        return [len(col) - start for col, start in zip(self.heap, self.start)]
 
     def max_height(self):
         """Get maximum heap height"""
-        return max(len(col) for col in self.heap) if self.heap else 0
+        return max(self.heights()) if self.heap else 0
+
+    def window(self, position, start, count):
+        """count bits of position from the start-th up, without copying the column"""
+        offset = self.start[position] + start
+        return self.heap[position][offset:offset + count]
+
+    def sort_columns(self, key):
+        """Order the bits of every column by key, keeping the order of ties"""
+        for position, bits in enumerate(self.heap):
+            self.heap[position] = array("l", sorted(bits[self.start[position]:], key=key))
+            self.start[position] = 0
+        self._location = None
 
     def pop_bits(self, position, count):
         """Remove and return count bits from the BOTTOM (start) of position"""
-        bits = self.heap[position][:count]
-        self.heap[position] = self.heap[position][count:]
+        start = self.start[position]
+        bits = self.heap[position][start:start + count]
+        self.start[position] = start + len(bits)
         return bits
 
     def pop_bits_from_top(self, position, count):
         """Remove and return count bits from the TOP (end) of position"""
         if position < len(self.heap):
-            bits = (
-                self.heap[position][-count:]
-                if count <= len(self.heap[position])
-                else self.heap[position]
-            )
-            self.heap[position] = (
-                self.heap[position][:-count]
-                if count <= len(self.heap[position])
-                else []
-            )
+            count = min(count, self.height(position))
+            col = self.heap[position]
+            bits = col[len(col) - count:]
+            del col[len(col) - count:]
             return bits
-        return []
+        return array("l")
 
     def __str_before_after__(
         self, before_heap, after_heap, stage_num, target_height, algorithm="dadda"
     ):
-        fa_input_map, ha_input_map = self._build_input_maps_from_data(after_heap)
+        # rich is only needed for -v, keep it out of the generator's startup
+        from visualize_heap import visualize_before_after_rich
+
+        fa_input_map, ha_input_map, c42_input_map, gpc_input_map = (
+            self._build_input_maps_from_data(after_heap)
+        )
         circuit_summary = self._build_circuit_summary(
             before_heap, after_heap, stage_num
         )
@@ -101,12 +450,16 @@ class BitHeap:
             ha_input_map,
             circuit_summary,
             width=self.width,
+            c42_input_map=c42_input_map,
+            gpc_input_map=gpc_input_map,
         )
 
     def _build_input_maps_from_data(self, after_heap):
-        """Build maps showing which input bits went into FAs (3) and HAs (2) using actual consumption data"""
+        """Build maps showing which input bits went into FAs (3), HAs (2), 4:2s (4-5) and GPCs using actual consumption data"""
         fa_inputs = set()
         ha_inputs = set()
+        c42_inputs = set()
+        gpc_inputs = set()
 
         # Use the stored consumption information
         if hasattr(after_heap, "fa_consumed") and hasattr(after_heap, "ha_consumed"):
@@ -121,10 +474,20 @@ class BitHeap:
                 for start_idx in after_heap.ha_consumed[col]:
                     ha_inputs.add((col, start_idx))
                     ha_inputs.add((col, start_idx + 1))
+
+                # Mark 4:2 inputs (start, count)
+                for start_idx, count in after_heap.c42_consumed[col]:
+                    for idx in range(start_idx, start_idx + count):
+                        c42_inputs.add((col, idx))
+
+                # Mark GPC inputs (start, count), per column they read
+                for start_idx, count in after_heap.gpc_consumed[col]:
+                    for idx in range(start_idx, start_idx + count):
+                        gpc_inputs.add((col, idx))
         else:
             print(f"WARNING: after_heap missing consumption data!")
 
-        return fa_inputs, ha_inputs
+        return fa_inputs, ha_inputs, c42_inputs, gpc_inputs
 
     def _build_circuit_summary(self, before_heap, after_heap, stage_num):
         """Build a summary of FA/HA cells showing counts per column"""
@@ -133,9 +496,12 @@ class BitHeap:
         # Count FAs and HAs by analyzing the after_heap
         fa_locations = {}
         ha_locations = {}
+        c42_locations = {}
+        gpc_locations = {}
 
         for col_idx in range(self.width):
-            for h_idx, (bit_name, bit_type) in enumerate(after_heap.heap[col_idx]):
+            for h_idx, bit in enumerate(after_heap.bits(col_idx)):
+                bit_type = after_heap.type_of(bit)
                 if bit_type == "fa_sum":
                     if col_idx not in fa_locations:
                         fa_locations[col_idx] = []
@@ -144,20 +510,43 @@ class BitHeap:
                     if col_idx not in ha_locations:
                         ha_locations[col_idx] = []
                     ha_locations[col_idx].append(h_idx)
+                elif bit_type == "c42_sum":
+                    if col_idx not in c42_locations:
+                        c42_locations[col_idx] = []
+                    c42_locations[col_idx].append(h_idx)
+                elif bit_type == "gpc_s0":
+                    if col_idx not in gpc_locations:
+                        gpc_locations[col_idx] = []
+                    gpc_locations[col_idx].append(h_idx)
 
         # Build summary for each column
         total_fa = sum(len(fas) for fas in fa_locations.values())
         total_ha = sum(len(has) for has in ha_locations.values())
-
-        summary_lines.append(f"Total: {total_fa} Full Adders, {total_ha} Half Adders")
+        total_c42 = sum(len(c42s) for c42s in c42_locations.values())
+        total_gpc = sum(len(gpcs) for gpcs in gpc_locations.values())
+
+        total = f"Total: {total_fa} Full Adders, {total_ha} Half Adders"
+        if total_c42:
+            total += f", {total_c42} 4:2 Compressors"
+        if total_gpc:
+            total += f", {total_gpc} GPCs"
+        summary_lines.append(total)
         summary_lines.append("")
 
         # Show column-by-column breakdown
-        for col in sorted(set(list(fa_locations.keys()) + list(ha_locations.keys()))):
+        for col in sorted(
+            set(fa_locations) | set(ha_locations) | set(c42_locations) | set(gpc_locations)
+        ):
             fa_count = len(fa_locations.get(col, []))
             ha_count = len(ha_locations.get(col, []))
+            c42_count = len(c42_locations.get(col, []))
+            gpc_count = len(gpc_locations.get(col, []))
 
             parts = []
+            if gpc_count > 0:
+                parts.append(f"{gpc_count} GPC")
+            if c42_count > 0:
+                parts.append(f"{c42_count} 4:2")
             if fa_count > 0:
                 parts.append(f"{fa_count} FA")
             if ha_count > 0:
@@ -169,6 +558,282 @@ class BitHeap:
         return summary_lines
 
 
+class StageHistory:
+    """Heaps of every reduction stage, stored as per-stage deltas
+
+    Stage 0 is kept in full. Every later stage is recorded as the number of
+    bits consumed from the bottom of each column plus the bits produced into
+    it, which are placed below the passed-through bits. Columns appended as
+    reordered may interleave the two, which is recorded as a mask of the
+    produced positions. Indexing rebuilds a stage's heap on demand; the
+    returned heaps are shared and read-only.
+    """
+
+    def __init__(self, initial_heap):
+        self.width = initial_heap.width
+        self.signals = initial_heap.signals
+        self.initial = [initial_heap.bits(col) for col in range(self.width)]
+        self.consumed = []  # per stage: array of consumed bit counts per column
+        self.produced = []  # per stage: flat array of produced bits
+        self.produced_start = []  # per stage: column offsets into produced
+        self.fa_consumed = []
+        self.ha_consumed = []
+        self.c42_consumed = []
+        self.gpc_consumed = []
+        self.order = []  # per stage: {col: produced mask} of reordered columns, or None
+        self._heights = initial_heap.heights()
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.consumed) + 1
+
+    def append(self, next_heap, reordered=False):
+        """Record the heap produced by a reduction stage
+
+        next_heap.consumed must hold the number of bits the stage consumed
+        from the bottom of each column of the previous stage. If reordered,
+        the produced bits may sit anywhere in a column, but passed-through
+        bits must keep their order.
+        """
+        produced = array("l")
+        produced_start = array("l", [0])
+        heights = next_heap.heights()
+        order = {}
+        source = self.signals.source
+        cell_stage = self.signals.cell_stage
+        stage = len(self.consumed)
+        for col in range(self.width):
+            passthrough = self._heights[col] - next_heap.consumed[col]
+            bits = next_heap.bits(col)
+            if reordered:
+                mask = array("b", (source[bit] >= 0 and cell_stage[source[bit]] == stage for bit in bits))
+                produced.extend(bit for bit, new in zip(bits, mask) if new)
+                if any(mask[len(bits) - passthrough:]):
+                    order[col] = mask
+            else:
+                produced.extend(bits[:len(bits) - passthrough])
+            produced_start.append(len(produced))
+
+        self.consumed.append(array("l", next_heap.consumed))
+        self.produced.append(produced)
+        self.produced_start.append(produced_start)
+        self.fa_consumed.append(next_heap.fa_consumed)
+        self.ha_consumed.append(next_heap.ha_consumed)
+        self.c42_consumed.append(next_heap.c42_consumed)
+        self.gpc_consumed.append(next_heap.gpc_consumed)
+        self.order.append(order or None)
+        self._heights = heights
+
+    def __getitem__(self, stage):
+        if stage < 0:
+            stage += len(self)
+        if not 0 <= stage < len(self):
+            raise IndexError(f"stage {stage} out of range")
+        if stage in self._cache:
+            # Mark as most recently used
+            heap = self._cache.pop(stage)
+            self._cache[stage] = heap
+            return heap
+
+        # Replay from the closest earlier cached stage
+        base = max((s for s in self._cache if s < stage), default=None)
+        if base is None:
+            columns = [col for col in self.initial]
+            base = 0
+        else:
+            columns = self._cache[base].heap
+        for s in range(base, stage):
+            consumed = self.consumed[s]
+            produced = self.produced[s]
+            starts = self.produced_start[s]
+            columns = [
+                produced[starts[col]:starts[col + 1]] + columns[col][consumed[col]:]
+                for col in range(self.width)
+            ]
+            for col, mask in (self.order[s] or {}).items():
+                bits = columns[col]
+                new = iter(bits[:starts[col + 1] - starts[col]])
+                passed = iter(bits[starts[col + 1] - starts[col]:])
+                columns[col] = array("l", (next(new) if m else next(passed) for m in mask))
+
+        heap = BitHeap(self.width, self.signals, stage)
+        for col, bits in enumerate(columns):
+            heap.add_bits(col, bits)
+        if stage == 0:
+            heap.fa_consumed = [[] for _ in range(self.width)]
+            heap.ha_consumed = [[] for _ in range(self.width)]
+            heap.c42_consumed = [[] for _ in range(self.width)]
+            heap.gpc_consumed = [[] for _ in range(self.width)]
+        else:
+            heap.fa_consumed = self.fa_consumed[stage - 1]
+            heap.ha_consumed = self.ha_consumed[stage - 1]
+            heap.c42_consumed = self.c42_consumed[stage - 1]
+            heap.gpc_consumed = self.gpc_consumed[stage - 1]
+
+        # Emitters walk consecutive stages, so two cached heaps are enough;
+        # evict the least recently used one
+        if len(self._cache) >= 2:
+            del self._cache[next(iter(self._cache))]
+        self._cache[stage] = heap
+        return heap
+
+
+class CellList:
+    """Cell instances of one kind, stored as parallel arrays
+
+    Reads as a sequence of (stage, col, index, input bit IDs) tuples, built
+    on access. Cells must be appended in stage order.
+    """
+
+    def __init__(self, arity):
+        self.arity = arity
+        self.stage = array("l")
+        self.col = array("l")
+        self.n = array("l")
+        self.inputs = array("l")  # arity bit IDs per cell
+
+    def append(self, stage, col, n, bits):
+        self.stage.append(stage)
+        self.col.append(col)
+        self.n.append(n)
+        self.inputs.extend(bits)
+
+    def __len__(self):
+        return len(self.stage)
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(f"cell {i} out of range")
+        a = self.arity
+        return self.stage[i], self.col[i], self.n[i], tuple(self.inputs[a * i:a * i + a])
+
+    def __iter__(self):
+        a = self.arity
+        inputs = self.inputs
+        for i, (stage, col, n) in enumerate(zip(self.stage, self.col, self.n)):
+            yield stage, col, n, tuple(inputs[a * i:a * i + a])
+
+    def stage_range(self, stage):
+        """Positions of the cells of one stage"""
+        return range(bisect_left(self.stage, stage), bisect_right(self.stage, stage))
+
+    def by_col(self, stage):
+        """Cells of one stage as {col: [(index, inputs)]} in placement order"""
+        a = self.arity
+        cols = {}
+        for i in self.stage_range(stage):
+            cols.setdefault(self.col[i], []).append(
+                (self.n[i], tuple(self.inputs[a * i:a * i + a]))
+            )
+        return cols
+
+
+class InstanceIndex:
+    """Cell instances of each stage grouped by kind and column
+
+    Indexing by stage gives {kind: {col: [(index, inputs)]}} for every kind
+    of cell_lists. Stages are grouped on access and only the last one is
+    kept, as emitters walk stages in order.
+    """
+
+    def __init__(self, cell_lists, num_stages):
+        self.cell_lists = cell_lists
+        self.num_stages = num_stages
+        self._stage = None
+        self._cols = None
+
+    def __len__(self):
+        return self.num_stages
+
+    def __getitem__(self, stage):
+        if stage < 0:
+            stage += self.num_stages
+        if not 0 <= stage < self.num_stages:
+            raise IndexError(f"stage {stage} out of range")
+        if stage != self._stage:
+            self._cols = {kind: cells.by_col(stage) for kind, cells in self.cell_lists.items()}
+            self._stage = stage
+        return self._cols
+
+
+class ArrivalTimes:
+    """Estimated arrival time of every bit of a signal table
+
+    Primary inputs arrive at 0, and a cell output arrives OUTPUT_DELAY
+    after its latest input, or PIN_DELAYS after each input. Times are filled
+    in by update() for the bits added since the previous call, so they can
+    follow a tree as it is built.
+
+    With assign_fa_pins, every FA's inputs are permuted as soon as their
+    times are known, to the order of the FA pins that gives the earliest sum
+    (then carry), keeping the placed order on ties.
+    """
+
+    def __init__(self, signals, cell_lists, assign_fa_pins=False):
+        self.signals = signals
+        self.cells = [cell_lists[kind] for kind in CELL_KINDS]
+        self.assign_fa_pins = assign_fa_pins
+        self.fa_permuted = 0  # FAs whose inputs were permuted
+        self.times = array("d")
+        self._index = array("l")  # per cell, position in the CellList of its kind
+        self._position = [0] * len(CELL_KINDS)  # next cell of each kind
+
+    def update(self):
+        """Compute the arrival times of the bits added since the last update"""
+        signals = self.signals
+        source = signals.source
+        bit_type = signals.bit_type
+        cell_kind = signals.cell_kind
+        times = self.times
+        index = self._index
+        for bit in range(len(times), len(signals)):
+            cell = source[bit]
+            if cell < 0:
+                times.append(0.0)
+                continue
+            # Cells are numbered in placement order, as their CellLists
+            while len(index) <= cell:
+                kind = cell_kind[len(index)]
+                index.append(self._position[kind])
+                self._position[kind] += 1
+                if kind == FA_KIND and self.assign_fa_pins:
+                    self._assign_pins(index[-1])
+            cells = self.cells[cell_kind[cell]]
+            start = cells.arity * index[cell]
+            inputs = cells.inputs[start:start + cells.arity]
+            code = bit_type[bit]
+            pins = PIN_DELAY[code]
+            if pins is None:
+                times.append(max(times[b] for b in inputs) + OUTPUT_DELAY[code])
+            else:
+                times.append(
+                    max(times[b] + delay for b, delay in zip(inputs, pins) if delay is not None)
+                )
+        return times
+
+    def _assign_pins(self, i):
+        """Permute the inputs of the i-th FA for the earliest sum, then carry"""
+        cells = self.cells[FA_KIND]
+        start = 3 * i
+        bits = cells.inputs[start:start + 3]
+        arrival = [self.times[bit] for bit in bits]
+        if min(arrival) == max(arrival):
+            return
+        sum_pins, carry_pins = PIN_DELAYS["fa_sum"], PIN_DELAYS["fa_carry"]
+        best = min(
+            permutations(range(3)),
+            key=lambda order: (
+                max(arrival[j] + delay for j, delay in zip(order, sum_pins)),
+                max(arrival[j] + delay for j, delay in zip(order, carry_pins)),
+            ),
+        )
+        if best != (0, 1, 2):
+            cells.inputs[start:start + 3] = array("l", (bits[j] for j in best))
+            self.fa_permuted += 1
+
+
 class CompressorTreeGenerator:
     def __init__(
         self,
@@ -178,44 +843,195 @@ class CompressorTreeGenerator:
         unsigned=False,
         encoding="booth",
         algorithm="dadda",
+        build=True,
+        tracer=None,
+        gpc_objective="stages",
+        timing_driven=False,
+        assign_fa_pins=False,
+        fold_constants=True,
+        prune_dead_logic=True,
+        propagate_constants=True,
+        max_stages=None,
+        max_cells=None,
+        final_height=2,
+        radix=4,
+        wb=None,
+        signed_mode=False,
     ):
+        # Multiplicand (a) and multiplier (b) widths: every PP row is a
+        # multiple of a, and b sets how many rows there are
         self.w = w
+        self.wb = w if wb is None else wb
         self.encoding = encoding
+        # Booth radix, and the multiplier bits recoded per partial product
+        self.radix = radix
+        self.booth_k = radix.bit_length() - 1
         self.algorithm = algorithm
+        self.gpc_objective = gpc_objective
+        self.timing_driven = timing_driven
+        self.assign_fa_pins = assign_fa_pins
+        self.fa_pin_report = None  # (critical path before, after, FAs permuted)
+        self.fold_constants = fold_constants
+        self.constant_report = None  # (constant bits before folding, after)
+        self.prune_dead_logic = prune_dead_logic
+        # Cells left with only their LSB sum, by kind, as {(stage, col, index)}
+        self.sum_only_cells = {}
+        self.propagate_constants = propagate_constants
+        # FAs and HAs with constant inputs, by kind, as {(stage, col, index)},
+        # the value of every constant bit they read or drive, and the number
+        # of them per stage
+        self.constant_cells = {}
+        self.constant_bits = {}
+        self.propagation_report = None
+        # Bounds of the exact algorithm: fewest cells within max_stages, or
+        # fewest stages within max_cells
+        self.max_stages = max_stages
+        self.max_cells = max_cells
+        # Rows left for the final adder: 2 (sum + carry) or 3 (ternary adder)
+        self.final_height = final_height
         self.unsigned = unsigned
+        # Signedness picked at run time by a signed_mode input, one tree for both
+        self.signed_mode = signed_mode
+        if signed_mode and unsigned:
+            raise ValueError("signed_mode selects signedness at run time, it excludes unsigned")
         self.sign_ext_opt = sign_ext_opt
 
+        # Structured events instead of console output, silent by default
+        self.tracer = tracer or SILENT
+        self._trace_cells = self.tracer.enabled("cell")
+
         # For Pipelining
         self.compressor_tree_stages = 0
 
         # Calculate num_pp based on encoding
         if num_pp is None:
-            if encoding == "booth":
-                self.num_pp = (w + 1) // 2
+            if encoding == "booth" and (unsigned or signed_mode):
+                # One more row for the zero- (or mode-) extended top Booth digit
+                self.num_pp = self.wb // self.booth_k + 1
+            elif encoding == "booth":
+                self.num_pp = (self.wb + self.booth_k - 1) // self.booth_k
             else:  # binary
-                self.num_pp = w
+                self.num_pp = self.wb
         else:
             self.num_pp = num_pp
 
-        self.prod_width = 2 * w
+        self.prod_width = w + self.wb
         self.num_stages = 0
-        self.stages = []
-
-        # Track all FA/HA instances for SystemVerilog generation
-        self.fa_instances = []  # (stage, col, index, inputs)
-        self.ha_instances = []  # (stage, col, index, inputs)
-
-        self.build_reduction()
-
-    def build_reduction(self):
-        """Build bit heap reduction stages"""
-        initial_heap = BitHeap(self.prod_width)
-
-        print(f"\nDEBUG: Building bit heap")
-        print(
-            f"  algorithm={self.algorithm}, encoding={self.encoding}, unsigned={self.unsigned}"
-        )
-        print(f"  w={self.w}, num_pp={self.num_pp}, prod_width={self.prod_width}")
+        self.stages = None
+
+        # Every bit and cell of the tree, addressed by integer ID
+        self.signals = SignalTable()
+
+        # Track all FA/HA/4:2 instances for SystemVerilog generation
+        self.fa_instances = CellList(3)  # (stage, col, index, input bit IDs)
+        self.ha_instances = CellList(2)  # (stage, col, index, input bit IDs)
+        self.c42_instances = CellList(5)  # (stage, col, index, input bit IDs + c_in)
+        for kind, (k0, k1, _) in GPC_SHAPES.items():
+            # (stage, col, index, input bit IDs of the column, then of the next)
+            setattr(self, f"{kind}_instances", CellList(k0 + k1))
+        self._instance_index = None
+        self._arrival = None
+
+        # build=False only configures the generator (e.g. for height planning)
+        if build:
+            self.build_reduction()
+
+    def cache_params(self):
+        """Configuration that fully determines the generated tree"""
+        params = {
+            "w": self.w,
+            "num_pp": self.num_pp,
+            "sign_ext_opt": self.sign_ext_opt,
+            "unsigned": self.unsigned,
+            "encoding": self.encoding,
+            "algorithm": self.algorithm,
+        }
+        if self.algorithm == "gpc":
+            params["gpc_objective"] = self.gpc_objective
+        if self.algorithm == "exact":
+            params["max_stages"] = self.max_stages
+            params["max_cells"] = self.max_cells
+        if self.timing_driven:
+            params["timing_driven"] = True
+        if self.assign_fa_pins:
+            params["assign_fa_pins"] = True
+        if not self.fold_constants:
+            params["fold_constants"] = False
+        if not self.prune_dead_logic:
+            params["prune_dead_logic"] = False
+        if not self.propagate_constants:
+            params["propagate_constants"] = False
+        if self.final_height != 2:
+            params["final_height"] = self.final_height
+        if self.radix != 4:
+            params["radix"] = self.radix
+        if self.wb != self.w:
+            params["wb"] = self.wb
+        if self.signed_mode:
+            params["signed_mode"] = True
+        return params
+
+    @property
+    def pp_width(self):
+        """Bits of each partial product row, sign bit included"""
+        if self.encoding == "binary":
+            return self.w
+        # Digits up to 2**(k-1) times the (w+1)-bit zero- or mode-extended
+        # multiplicand when unsigned or signed_mode, or the w-bit signed one
+        return self.w + (self.unsigned or self.signed_mode) + self.booth_k - 1
+
+    def to_netlist(self):
+        """Reduced netlist as plain data (dicts, lists, arrays) for storage
+
+        Holds no class references, so it loads regardless of how this module
+        was imported.
+        """
+        netlist = {
+            key: value
+            for key, value in vars(self).items()
+            if key not in (
+                "tracer", "_trace_cells", "_instance_index", "_arrival", "signals", "stages"
+            )
+        }
+        netlist["signals"] = dict(vars(self.signals))
+        for kind in self.cell_lists():
+            netlist[f"{kind}_instances"] = dict(vars(getattr(self, f"{kind}_instances")))
+        netlist["stages"] = {
+            key: value
+            for key, value in vars(self.stages).items()
+            if key not in ("signals", "_cache")
+        }
+        return netlist
+
+    @classmethod
+    def from_netlist(cls, netlist, tracer=None):
+        """Generator rebuilt from to_netlist() data, without re-running reduction"""
+        gen = cls.__new__(cls)
+        netlist = dict(netlist)
+        signals = SignalTable.__new__(SignalTable)
+        vars(signals).update(netlist.pop("signals"))
+        stages = StageHistory.__new__(StageHistory)
+        vars(stages).update(netlist.pop("stages"))
+        stages.signals = signals
+        stages._cache = {}
+        for key in (f"{kind}_instances" for kind in CELL_KINDS):
+            cells = CellList.__new__(CellList)
+            vars(cells).update(netlist[key])
+            netlist[key] = cells
+
+        vars(gen).update(netlist)
+        gen.signals = signals
+        gen.stages = stages
+        gen.tracer = tracer or SILENT
+        gen._trace_cells = gen.tracer.enabled("cell")
+        gen._instance_index = None
+        gen._arrival = None
+        return gen
+
+    def build_initial_heap(self):
+        """Build the stage 0 bit heap holding every partial product bit"""
+        initial_heap = BitHeap(self.prod_width, self.signals)
+        signals = self.signals
 
         # =================================================================
         # Binary & Booth Logic Start
@@ -230,281 +1046,746 @@ class CompressorTreeGenerator:
                     for bit in range(self.w):
                         bit_pos = offset + bit
                         if bit_pos < self.prod_width:
-                            initial_heap.add_bit(
-                                bit_pos, f"pp[{pp_idx}][{bit}]", "normal"
-                            )
+                            initial_heap.add_bit(bit_pos, signals.pp(pp_idx, bit))
             else:
-                # Signed binary multiplication using Baugh-Wooley
-                # Process rows 0 through w-2
-                for row in range(self.w - 1):
+                # Signed binary multiplication using Baugh-Wooley. With
+                # signed_mode the inversions become XORs with the mode and
+                # the corrections mode bits, so unsigned mode adds plain rows
+                inverted = "mode_inverted" if self.signed_mode else "inverted_msb"
+                one = signals.mode if self.signed_mode else signals.const_one
+                # Process rows 0 through wb-2
+                for row in range(self.wb - 1):
                     offset = row
 
                     # Regular bits (LSB through w-2)
                     for bit in range(self.w - 1):
                         pos = offset + bit
                         if pos < self.prod_width:
-                            initial_heap.add_bit(pos, f"pp[{row}][{bit}]", "normal")
+                            initial_heap.add_bit(pos, signals.pp(row, bit))
 
                     # MSB is inverted
                     msb_pos = offset + self.w - 1
                     if msb_pos < self.prod_width:
-                        initial_heap.add_bit(msb_pos, f"pp[{row}][{self.w-1}]", "inverted_msb")
-                # Last row (row w-1): b[w-1] is the sign bit
-                last_row = self.w - 1
+                        initial_heap.add_bit(msb_pos, signals.pp(row, self.w - 1, inverted))
+                # Last row (row wb-1): b[wb-1] is the sign bit
+                last_row = self.wb - 1
                 offset = last_row
 
                 # All bits except MSB are inverted
                 for bit in range(self.w - 1):
                     pos = offset + bit
                     if pos < self.prod_width:
-                        initial_heap.add_bit(pos, f"pp[{last_row}][{bit}]", "inverted_msb")
+                        initial_heap.add_bit(pos, signals.pp(last_row, bit, inverted))
                 msb_pos = offset + self.w - 1
                 if msb_pos < self.prod_width:
-                    initial_heap.add_bit(msb_pos, f"pp[{last_row}][{self.w-1}]", "normal")
+                    initial_heap.add_bit(msb_pos, signals.pp(last_row, self.w - 1))
 
-                # Baugh-Wooley correction bits
-                initial_heap.add_bit(self.w, "1'b1", "normal")  # Correction at position w
-                if 2 * self.w - 1 < self.prod_width:
-                    initial_heap.add_bit(2 * self.w - 1, "1'b1", "normal")  # Correction at MSB
+                # Baugh-Wooley correction bits: the inverted column (w-1) and
+                # row (wb-1) each need a 1 there, two at position w when square
+                if self.wb == self.w:
+                    initial_heap.add_bit(self.w, one())  # Correction at position w
+                else:
+                    initial_heap.add_bit(self.w - 1, one())
+                    initial_heap.add_bit(self.wb - 1, one())
+                initial_heap.add_bit(self.prod_width - 1, one())  # Correction at MSB
 
         elif self.encoding == "booth":
-            # Signed Booth Radix-4 encoding
-            if self.unsigned:
-                raise ValueError("Unsigned Booth multiplication not supported")
+            # Booth Radix-2**k encoding: row i is a digit in [-2**(k-1),
+            # 2**(k-1)] times the multiplicand, shifted by k*i. Unsigned is
+            # signed Booth of the zero-extended (w+1)-bit multiplicand, and
+            # its top row (a digit in [0, 2**(k-1)]) is never negative, so it
+            # has no complement or sign bit. signed_mode is signed Booth of
+            # both operands extended by their sign bit ANDed with the mode,
+            # so the tree needs no mode logic
+            pp_bits = self.pp_width - 1
             for pp_idx in range(self.num_pp):
-                offset = pp_idx * 2
-                
+                offset = pp_idx * self.booth_k
+
+                if self.unsigned and pp_idx == self.num_pp - 1:
+                    for bit in range(pp_bits):
+                        bit_pos = offset + bit
+                        if bit_pos < self.prod_width:
+                            initial_heap.add_bit(bit_pos, signals.pp(pp_idx, bit))
+                    continue
+
                 # Add complement bit (cpl) at LSB for Booth two's complement correction
-                initial_heap.add_bit(offset, f"cpl[{pp_idx}]", "normal")
+                initial_heap.add_bit(offset, signals.cpl(pp_idx))
 
-                # Add regular partial product bits (0 to w-1)
-                for bit in range(self.w):
+                # Add regular partial product bits (0 to pp_bits-1)
+                for bit in range(pp_bits):
                     bit_pos = offset + bit
                     if bit_pos < self.prod_width:
-                        initial_heap.add_bit(bit_pos, f"pp[{pp_idx}][{bit}]", "normal")
+                        initial_heap.add_bit(bit_pos, signals.pp(pp_idx, bit))
 
-                # Add INVERTED sign bit (bit w of the w+1 bit PP) at position p
-                sign_bit_pos = offset + self.w
+                # Add INVERTED sign bit (MSB of the PP) at position p
+                sign_bit_pos = offset + pp_bits
                 if sign_bit_pos < self.prod_width:
-                    initial_heap.add_bit(sign_bit_pos, f"pp[{pp_idx}][{self.w}]", "inverted_msb")
+                    initial_heap.add_bit(sign_bit_pos, signals.pp(pp_idx, pp_bits, "inverted_msb"))
 
                 # Add constant 1s from position p (sign bit) to position q (MSB)
                 for const_pos in range(sign_bit_pos, self.prod_width):
-                    initial_heap.add_bit(const_pos, "1'b1", "correction")
+                    initial_heap.add_bit(const_pos, signals.const_one("correction"))
 
         # =================================================================
         # Binary & Booth Logic End
         # =================================================================
 
-        print(f"\nDEBUG: Heap heights after PP generation:")
-        print(f"  {[len(col) for col in initial_heap.heap[:self.prod_width]]}")
+        if self.fold_constants:
+            self._fold_constant_bits(initial_heap)
+
+        if self.tracer.enabled("stage"):
+            self.tracer.emit(
+                "compressor_tree",
+                "heap_built",
+                algorithm=self.algorithm,
+                encoding=self.encoding,
+                unsigned=self.unsigned,
+                w=self.w,
+                num_pp=self.num_pp,
+                prod_width=self.prod_width,
+                heights=initial_heap.heights(),
+            )
+
+        return initial_heap
+
+    def _fold_constant_bits(self, heap):
+        """Replace the 1'b1 bits of heap by their sum, at most one per column
+
+        Booth sign extension and Baugh-Wooley correction bits add up to one
+        constant word (modulo 2**prod_width), injected as one constant bit
+        per set bit. signed_mode bits fold the same way into a word that is
+        added when the mode is set.
+        """
+        signals = self.signals
+        constant = 0
+        mode_constant = 0
+        before = 0
+        for col in range(self.prod_width):
+            bits = heap.bits(col)
+            kept = array("l", (bit for bit in bits if signals.row[bit] >= 0))
+            modes = sum(1 for bit in bits if signals.bit_type[bit] == MODE_CODE)
+            ones = len(bits) - len(kept) - modes
+            if ones or modes:
+                constant += ones << col
+                mode_constant += modes << col
+                before += ones + modes
+                heap.heap[col] = kept
+                heap.start[col] = 0
+        heap._location = None
+
+        constant %= 1 << self.prod_width
+        mode_constant %= 1 << self.prod_width
+        for col in range(self.prod_width):
+            if constant >> col & 1:
+                heap.add_bit(col, signals.const_one("correction"))
+            if mode_constant >> col & 1:
+                heap.add_bit(col, signals.mode())
+        self.constant_report = (
+            before, bin(constant).count("1") + bin(mode_constant).count("1")
+        )
+        self.tracer.emit(
+            "compressor_tree", "constants_folded",
+            before=before, after=self.constant_report[1], constant=hex(constant),
+        )
 
-        # Initialize empty consumption data
-        initial_heap.fa_consumed = [[] for _ in range(self.prod_width)]
-        initial_heap.ha_consumed = [[] for _ in range(self.prod_width)]
+    def build_reduction(self):
+        """Build bit heap reduction stages"""
+        initial_heap = self.build_initial_heap()
 
-        self.stages.append(self.copy_heap(initial_heap))
-        print(f"DEBUG: After copy_heap, stages[{len(self.stages)-1}].heap[0] has {len(self.stages[-1].heap[0])} bits")
+        self.stages = StageHistory(initial_heap)
 
         # Build reduction stages based on algorithm
         if self.algorithm == 'dadda':
             initial_max = initial_heap.max_height()
             self.dadda_seq = dadda_sequence(initial_max)
 
-            targets = [h for h in reversed(self.dadda_seq) if h < initial_max]
-            print(f"  Dadda sequence: {self.dadda_seq}")
-            print(f"  Initial max height: {initial_max}")
-            print(f"  Reduction targets: {targets}")
+            targets = reduction_targets(self.dadda_seq, initial_max, self.final_height)
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=targets,
+            )
+
+            current_heap = initial_heap
+            for target in targets:
+                current_heap = self._run_stage(self.reduce_stage_dadda, current_heap, target)
+        elif self.algorithm == 'wallace':
+            # Classic Wallace: every stage turns each group of three bits of a
+            # column into an FA and a leftover pair into an HA, as early as
+            # possible, which follows the Wallace sequence by construction
+            self.dadda_seq = []
+
+            initial_max = initial_heap.max_height()
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max,
+                targets=reduction_targets(
+                    wallace_sequence(initial_max), initial_max, self.final_height
+                ),
+            )
+
+            current_heap = initial_heap
+            stage_limit = self.prod_width
+            while current_heap.max_height() > self.final_height and self.num_stages < stage_limit:
+                current_heap = self._run_stage(self.reduce_stage_wallace, current_heap)
+        elif self.algorithm == 'wallace_ra':
+            # Reduced-area Wallace: as many FAs as possible, HAs only where a
+            # column would miss the height of the Wallace stage
+            self.dadda_seq = []
+
+            initial_max = initial_heap.max_height()
+            targets = reduction_targets(
+                wallace_sequence(initial_max), initial_max, self.final_height
+            )
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=targets,
+            )
 
             current_heap = initial_heap
             for target in targets:
-                print(f"  Stage {self.num_stages + 1}: reducing from {current_heap.max_height()} to {target}")
-                next_heap = self.reduce_stage_dadda(current_heap, target)
-                print(f"    Result: max_height = {next_heap.max_height()}")
-                self.stages.append(self.copy_heap(next_heap))
-                print(f"DEBUG: After copy_heap, stages[{len(self.stages)-1}].heap[0] has {len(self.stages[-1].heap[0])} bits")
-                current_heap = next_heap
-                self.num_stages += 1
+                current_heap = self._run_stage(self.reduce_stage_bickerstaff, current_heap, target)
+
+            # Columns the saved HAs left over the final height get one more stage
+            stage_limit = self.prod_width
+            while current_heap.max_height() > self.final_height and self.num_stages < stage_limit:
+                current_heap = self._run_stage(
+                    self.reduce_stage_bickerstaff, current_heap, self.final_height
+                )
         elif self.algorithm == 'faonly':
             # FA-only greedy: keep using FAs until no column has 3+ bits
             self.dadda_seq = []
 
             initial_max = initial_heap.max_height()
-            print(f"  FA-only greedy reduction")
-            print(f"  Initial max height: {initial_max}")
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=None,
+            )
 
             current_heap = initial_heap
             stage_limit = self.prod_width
             stage_count = 0
 
-            # Continue until no column has 3+ bits
+            # Continue until no column is over the final height
             while True:
-                # Check if any column has 3+ bits
-                any_reducible = any(current_heap.height(col) >= 3 for col in range(self.prod_width))
+                # Check if any column is over the final height
+                any_reducible = current_heap.max_height() > self.final_height
                 if not any_reducible:
-                    print(f"  FA-only complete: no columns with 3+ bits")
                     break
 
-                print(f"  FA-only stage {stage_count + 1}: max_height = {current_heap.max_height()}")
-                next_heap = self.reduce_stage_faonly(current_heap)
-                print(f"    After reduction: max_height = {next_heap.max_height()}")
-
-                self.stages.append(self.copy_heap(next_heap))
-                current_heap = next_heap
-                self.num_stages += 1
+                current_heap = self._run_stage(self.reduce_stage_faonly, current_heap)
                 stage_count += 1
 
                 if stage_count >= stage_limit:
                     print("WARNING: Reached stage limit")
                     break
+        elif self.algorithm == 'gpc':
+            # Generalized parallel counters, FAs and HAs picked per column
+            # by cost
+            self.dadda_seq = []
+
+            initial_max = initial_heap.max_height()
+            if self.gpc_objective == "area":
+                targets = reduction_targets(
+                    dadda_sequence(initial_max), initial_max, self.final_height
+                )
+            else:
+                # Every stage goes for the final height
+                targets = []
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=targets,
+            )
+
+            current_heap = initial_heap
+            for target in targets:
+                current_heap = self._run_stage(self.reduce_stage_gpc, current_heap, target)
+
+            # Stages until no column is over the final height, also covering
+            # columns a stage could not bring down to its target
+            stage_limit = self.prod_width
+            while current_heap.max_height() > self.final_height and self.num_stages < stage_limit:
+                current_heap = self._run_stage(
+                    self.reduce_stage_gpc, current_heap, self.final_height
+                )
+        elif self.algorithm == 'exact':
+            # Fewest FA/HA cells (or stages) found by search, placed as planned
+            from exact_tree import plan_exact
+
+            self.dadda_seq = []
+
+            initial_max = initial_heap.max_height()
+            cells, fa_plan, ha_plan = plan_exact(
+                initial_heap.heights(), self.max_stages, self.max_cells, self.final_height
+            )
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=None, cells=cells,
+            )
+
+            current_heap = initial_heap
+            for fa, ha in zip(fa_plan, ha_plan):
+                current_heap = self._run_stage(
+                    partial(self.reduce_stage_planned, fa=fa, ha=ha), current_heap
+                )
+        elif self.algorithm == 'c42':
+            # 4:2 compressors first, FA/HA for what is left, halving the
+            # height every stage
+            self.dadda_seq = []
+
+            initial_max = initial_heap.max_height()
+            targets = reduction_targets(c42_sequence(initial_max), initial_max, self.final_height)
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=targets,
+            )
+
+            current_heap = initial_heap
+            for target in targets:
+                current_heap = self._run_stage(self.reduce_stage_c42, current_heap, target)
         else:  # bickerstaff
             self.dadda_seq = []
 
             initial_max = initial_heap.max_height()
             dadda_seq_temp = dadda_sequence(initial_max)
-            targets = [h for h in reversed(dadda_seq_temp) if h < initial_max]
-            print(f"  Bickerstaff using Dadda targets: {targets}")
-            print(f"  Initial max height: {initial_max}")
+            targets = reduction_targets(dadda_seq_temp, initial_max, self.final_height)
+            self.tracer.emit(
+                "compressor_tree", "reduction_started",
+                initial_max=initial_max, targets=targets,
+            )
 
             current_heap = initial_heap
             stage_limit = 50
             stage_count = 0
             for target in targets:
-                print(f"  Bickerstaff stage {stage_count + 1}: max_height = {current_heap.max_height()}, target = {target}")
-                next_heap = self.reduce_stage_bickerstaff(current_heap, target)
-                print(f"    After reduction: max_height = {next_heap.max_height()}")
-
-                self.stages.append(self.copy_heap(next_heap))
-                current_heap = next_heap
-                self.num_stages += 1
+                current_heap = self._run_stage(self.reduce_stage_bickerstaff, current_heap, target)
                 stage_count += 1
 
                 if stage_count >= stage_limit:
                     print("WARNING: Reached stage limit")
                     break
 
-    def copy_heap(self, heap):
-        """Create a deep copy of a heap"""
-        new_heap = BitHeap(heap.width)
-        for col_idx, col in enumerate(heap.heap):
-            new_heap.heap[col_idx] = col.copy()
+        if self.assign_fa_pins:
+            self._assign_fa_pins()
+        if self.prune_dead_logic:
+            self._prune_dead_logic()
+        if self.propagate_constants:
+            self._propagate_constants()
+
+    def _assign_fa_pins(self):
+        """Post-placement pass putting the latest input of every FA on its fastest pin
+
+        Pins are ranked by PIN_DELAYS and FAs visited in placement order, so
+        each one sees the arrival times left by the permutations before it.
+        Records the critical path before and after in fa_pin_report.
+        """
+        before = max(self.arrival_profile())
+        self._arrival = ArrivalTimes(self.signals, self.cell_lists(), assign_fa_pins=True)
+        after = max(self.arrival_profile())
+        self._instance_index = None
+        self.fa_pin_report = (before, after, self._arrival.fa_permuted)
+        self.tracer.emit(
+            "compressor_tree", "fa_pins_assigned",
+            critical_before=before, critical_after=after, permuted=self._arrival.fa_permuted,
+        )
+
+    def _prune_dead_logic(self):
+        """Post-reduction pass marking cells whose carries are all dropped as sum-only
+
+        Outputs above the top column fall off the heap, so a cell of the top
+        column only drives its LSB sum: the parity of its column inputs. The
+        emitters write those cells as XORs in sum_only_cells. LSB sums always
+        land in the product, so no cell is left with no output at all.
+        """
+        top = self.prod_width - 1
+        self.sum_only_cells = {}
+        for kind, cells in self.cell_lists().items():
+            pruned = {
+                (stage, col, n)
+                for stage, col, n in zip(cells.stage, cells.col, cells.n)
+                if col == top
+            }
+            if pruned:
+                self.sum_only_cells[kind] = pruned
+        self.tracer.emit(
+            "compressor_tree", "dead_logic_pruned",
+            sum_only={kind: len(cells) for kind, cells in self.sum_only_cells.items()},
+        )
 
-        if hasattr(heap, "fa_consumed"):
-            new_heap.fa_consumed = [lst.copy() for lst in heap.fa_consumed]
-        if hasattr(heap, "ha_consumed"):
-            new_heap.ha_consumed = [lst.copy() for lst in heap.ha_consumed]
+    def is_sum_only(self, kind, stage, col, n):
+        """True if the cell was reduced to an XOR of its column inputs by dead-logic pruning"""
+        return (stage, col, n) in self.sum_only_cells.get(kind, ())
+
+    def _propagate_constants(self):
+        """Post-reduction pass simplifying the FAs and HAs with constant inputs
+
+        Walks the stages in order from the 1'b1 bits of the initial heap and
+        the shared 1'b0. A cell reading one of them is emitted as the logic
+        of constant_cell_logic instead of an instance, and its outputs that
+        constant_cell_outputs fixes are read as constants by the stages after it.
+        """
+        signals = self.signals
+        constant_bits = {
+            bit: 1
+            for col in range(self.prod_width)
+            for bit in self.stages[0].bits(col)
+            if signals.is_constant(bit)
+        }
+        if signals.zero >= 0:
+            constant_bits[signals.zero] = 0
+
+        self.constant_cells = {}
+        per_stage = [0] * self.num_stages
+        for stage in range(self.num_stages):
+            for kind in ("fa", "ha"):
+                cells = getattr(self, f"{kind}_instances")
+                span = cells.stage_range(stage)
+                a = cells.arity
+                inputs = cells.inputs[a * span.start:a * span.stop]
+                hits = constant_bits.keys() & set(inputs)
+                if not hits:
+                    continue
+                positions = sorted({j // a for j, bit in enumerate(inputs) if bit in hits})
+                for i in positions:
+                    _, col, n, bits = cells[span.start + i]
+                    self.constant_cells.setdefault(kind, set()).add((stage, col, n))
+                    per_stage[stage] += 1
+                    values = [constant_bits.get(bit) for bit in bits]
+                    outputs = constant_cell_outputs(
+                        sum(value for value in values if value), values.count(None)
+                    )
+                    for bit_type, weight, value in zip(("_sum", "_carry"), (0, 1), outputs):
+                        if value is not None:
+                            bit = self._cell_output_bit(kind + bit_type, stage, col, n, weight)
+                            if bit >= 0:
+                                constant_bits[bit] = value
+
+        self.constant_bits = constant_bits
+        self.propagation_report = per_stage
+        self.tracer.emit(
+            "compressor_tree", "constants_propagated",
+            cells=sum(per_stage), per_stage=per_stage,
+        )
+
+    def _cell_output_bit(self, bit_type, stage, col, n, weight):
+        """ID of the bit_type output of a cell in the heap after its stage, -1 if dropped"""
+        if col + weight >= self.prod_width:
+            return -1
+        signals = self.signals
+        code = BIT_TYPE_CODE[bit_type]
+        for bit in self.stages[stage + 1].bits(col + weight):
+            cell = signals.source[bit]
+            if (
+                signals.bit_type[bit] == code
+                and signals.cell_stage[cell] == stage
+                and signals.cell_col[cell] == col
+                and signals.cell_n[cell] == n
+            ):
+                return bit
+        return -1
+
+    def is_constant_cell(self, kind, stage, col, n):
+        """True if the cell reads a constant and is emitted as constant_cell_logic"""
+        return (stage, col, n) in self.constant_cells.get(kind, ())
+
+    def _run_stage(self, reduce_fn, heap, target=None):
+        """Run one reduction stage on heap, record it and return the new heap"""
+        stage = self.num_stages
+        trace = self.tracer.enabled("stage")
+        if trace:
+            fa_before = len(self.fa_instances)
+            ha_before = len(self.ha_instances)
+            c42_before = len(self.c42_instances)
+            gpc_before = self._gpc_count()
+            self.tracer.emit(
+                "compressor_tree", "stage_started",
+                stage=stage, target=target, max_height=heap.max_height(),
+            )
+
+        next_heap = reduce_fn(heap) if target is None else reduce_fn(heap, target)
+        if self.timing_driven:
+            # Earliest bits at the bottom of each column, where the next
+            # stage's cells take their inputs; late bits pass through
+            next_heap.sort_columns(self.arrival_times().__getitem__)
+        self.stages.append(next_heap, reordered=self.timing_driven)
+        self.num_stages += 1
+
+        if trace:
+            self.tracer.emit(
+                "compressor_tree", "stage_finished",
+                stage=stage,
+                fa=len(self.fa_instances) - fa_before,
+                ha=len(self.ha_instances) - ha_before,
+                c42=len(self.c42_instances) - c42_before,
+                gpc=self._gpc_count() - gpc_before,
+                max_height=next_heap.max_height(),
+                heights=next_heap.heights(),
+            )
+        return next_heap
 
-        return new_heap
+    def cell_lists(self):
+        """CellList of each cell kind, in the order cells take bits from the bottom of a column"""
+        cells = {kind: getattr(self, f"{kind}_instances") for kind in GPC_SHAPES}
+        cells["c42"] = self.c42_instances
+        cells["fa"] = self.fa_instances
+        cells["ha"] = self.ha_instances
+        return cells
+
+    def _gpc_count(self):
+        """Number of GPCs placed so far"""
+        return sum(len(getattr(self, f"{kind}_instances")) for kind in GPC_SHAPES)
+
+    def cost(self):
+        """Estimated (area in LUTs, delay in LUT levels) of the tree
+
+        Cell costs come from CELL_COSTS. The delay adds up the slowest cell
+        of every stage.
+        """
+        area = 0
+        stage_delay = [0] * self.num_stages
+        for kind, cells in self.cell_lists().items():
+            cell_area, cell_delay = CELL_COSTS[kind]
+            area += cell_area * len(cells)
+            for stage in set(cells.stage):
+                stage_delay[stage] = max(stage_delay[stage], cell_delay)
+        return area, sum(stage_delay)
+
+    def arrival_times(self):
+        """Estimated arrival time of every bit, indexed by bit ID (see ArrivalTimes)"""
+        if self._arrival is None:
+            self._arrival = ArrivalTimes(self.signals, self.cell_lists())
+        return self._arrival.update()
+
+    def arrival_profile(self):
+        """Latest arrival time of the output bits of each column, 0 if empty"""
+        times = self.arrival_times()
+        final_heap = self.stages[-1]
+        return [
+            max((times[bit] for bit in final_heap.bits(col)), default=0)
+            for col in range(self.prod_width)
+        ]
+
+    def instance_index(self):
+        """Cell instances grouped by stage, kind and column
+
+        Returns an InstanceIndex indexed by stage of {kind: {col: [(index,
+        inputs)]}}, with kinds in cell_lists() order and cells in placement
+        order.
+        """
+        if self._instance_index is None:
+            self._instance_index = InstanceIndex(self.cell_lists(), self.num_stages)
+        return self._instance_index
+
+    def _place_fa(self, next_heap, col, n, bits):
+        """Instantiate an FA on bits, adding its sum and carry to next_heap"""
+        cell = self.signals.add_cell("fa", self.num_stages, col, n)
+        self.fa_instances.append(self.num_stages, col, n, bits)
+        if self._trace_cells:
+            self._trace_cell("fa", col, n, bits)
+        next_heap.add_bit(col, self.signals.cell_output(cell, "fa_sum"))
+        next_heap.add_bit(col + 1, self.signals.cell_output(cell, "fa_carry"))
+
+    def _place_ha(self, next_heap, col, n, bits):
+        """Instantiate an HA on bits, adding its sum and carry to next_heap"""
+        cell = self.signals.add_cell("ha", self.num_stages, col, n)
+        self.ha_instances.append(self.num_stages, col, n, bits)
+        if self._trace_cells:
+            self._trace_cell("ha", col, n, bits)
+        next_heap.add_bit(col, self.signals.cell_output(cell, "ha_sum"))
+        next_heap.add_bit(col + 1, self.signals.cell_output(cell, "ha_carry"))
+
+    def _place_c42(self, next_heap, col, n, bits):
+        """Instantiate a 4:2 compressor on bits (a, b, c, d, c_in)
+
+        Adds its sum and carry to next_heap and returns its horizontal
+        carry-out bit, which the caller either chains into a 4:2 of the next
+        column or adds to that column of next_heap.
+        """
+        cell = self.signals.add_cell("c42", self.num_stages, col, n)
+        self.c42_instances.append(self.num_stages, col, n, bits)
+        if self._trace_cells:
+            self._trace_cell("c42", col, n, bits)
+        next_heap.add_bit(col, self.signals.cell_output(cell, "c42_sum"))
+        next_heap.add_bit(col + 1, self.signals.cell_output(cell, "c42_carry"))
+        return self.signals.cell_output(cell, "c42_cout")
+
+    def _place_gpc(self, next_heap, kind, col, n, bits):
+        """Instantiate a GPC of kind on bits, adding its count to next_heap"""
+        cell = self.signals.add_cell(kind, self.num_stages, col, n)
+        getattr(self, f"{kind}_instances").append(self.num_stages, col, n, bits)
+        if self._trace_cells:
+            self._trace_cell(kind, col, n, bits)
+        for weight in range(GPC_SHAPES[kind][2]):
+            next_heap.add_bit(col + weight, self.signals.cell_output(cell, f"gpc_s{weight}"))
+
+    def _trace_cell(self, kind, col, n, bits):
+        """Emit a cell_placed event for a cell of the stage being built"""
+        self.tracer.emit(
+            "compressor_tree", "cell_placed", level="cell",
+            stage=self.num_stages, kind=kind, col=col, n=n,
+            inputs=[self.signals.name(bit) for bit in bits],
+        )
 
     def reduce_stage_faonly(self, heap):
         """Reduce heap using only FAs"""
-        next_heap = BitHeap(self.prod_width)
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
+        fa_count = 0
+
+        fa_consumed = [[] for _ in range(self.prod_width)]
+        ha_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
+
+        for col in range(self.prod_width):
+            working_bits = heap.bits(col)
+            bit_index = 0
+
+            # Use FAs while we have 3+ bits available
+            while len(working_bits) - bit_index >= 3:
+                fa_consumed[col].append(bit_index)
+                self._place_fa(next_heap, col, fa_count, working_bits[bit_index:bit_index + 3])
+                fa_count += 1
+                bit_index += 3
+
+            # Pass through remaining bits
+            consumed[col] = bit_index
+            next_heap.add_bits(col, working_bits[bit_index:])
+
+        next_heap.fa_consumed = fa_consumed
+        next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
+        return next_heap
+
+    def reduce_stage_wallace(self, heap):
+        """Reduce heap using FAs on every three bits and HAs on leftover pairs (Wallace)"""
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
         fa_count = 0
+        ha_count = 0
 
         fa_consumed = [[] for _ in range(self.prod_width)]
         ha_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
 
         for col in range(self.prod_width):
-            working_bits = heap.heap[col].copy()
+            working_bits = heap.bits(col)
             bit_index = 0
 
-            # Use FAs while we have 3+ bits available and not in the last column
-            if col < self.prod_width:
-                while len(working_bits) >= 3:
-                    # Take 3 bits and create FA
-                    bits = [working_bits.pop(0) for _ in range(3)]
-                    fa_consumed[col].append(bit_index)
+            while len(working_bits) - bit_index >= 3:
+                fa_consumed[col].append(bit_index)
+                self._place_fa(next_heap, col, fa_count, working_bits[bit_index:bit_index + 3])
+                fa_count += 1
+                bit_index += 3
+
+            if len(working_bits) - bit_index == 2:
+                ha_consumed[col].append(bit_index)
+                self._place_ha(next_heap, col, ha_count, working_bits[bit_index:bit_index + 2])
+                ha_count += 1
+                bit_index += 2
 
-                    fa_name = f"fa_s{self.num_stages}_c{col}_n{fa_count}"
-                    inputs = [bit[0] for bit in bits]
-                    self.fa_instances.append((self.num_stages, col, fa_count, inputs))
+            # Pass through remaining bit
+            consumed[col] = bit_index
+            next_heap.add_bits(col, working_bits[bit_index:])
 
-                    next_heap.add_bit(col, f"{fa_name}_s", "fa_sum")
-                    next_heap.add_bit(col + 1, f"{fa_name}_c", "fa_carry")
-                    fa_count += 1
-                    bit_index += 3
+        next_heap.fa_consumed = fa_consumed
+        next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
+        return next_heap
+
+    def reduce_stage_planned(self, heap, fa, ha):
+        """Reduce heap with fa[col] FAs and then ha[col] HAs in every column"""
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
+        fa_count = 0
+        ha_count = 0
+
+        fa_consumed = [[] for _ in range(self.prod_width)]
+        ha_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
+
+        for col in range(self.prod_width):
+            working_bits = heap.bits(col)
+            bit_index = 0
+
+            for _ in range(fa[col]):
+                fa_consumed[col].append(bit_index)
+                self._place_fa(next_heap, col, fa_count, working_bits[bit_index:bit_index + 3])
+                fa_count += 1
+                bit_index += 3
+
+            for _ in range(ha[col]):
+                ha_consumed[col].append(bit_index)
+                self._place_ha(next_heap, col, ha_count, working_bits[bit_index:bit_index + 2])
+                ha_count += 1
+                bit_index += 2
 
             # Pass through remaining bits
-            for bit_name, bit_type in working_bits:
-                next_heap.add_bit(col, bit_name, bit_type)
+            consumed[col] = bit_index
+            next_heap.add_bits(col, working_bits[bit_index:])
 
         next_heap.fa_consumed = fa_consumed
         next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
         return next_heap
 
     def reduce_stage_dadda(self, heap, target_height):
         """Reduce heap to target height using FAs and HAs (Dadda algorithm)"""
-        next_heap = BitHeap(self.prod_width)
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
         fa_count = 0
         ha_count = 0
 
         fa_consumed = [[] for _ in range(self.prod_width)]
         ha_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
 
         for col in range(self.prod_width):
-            working_bits = heap.heap[col].copy()
+            working_bits = heap.bits(col)
             bit_index = 0
 
             def current_height():
-                return len(working_bits) + next_heap.height(col)
-
-            if col < self.prod_width:
-                # Use FAs while we have 3+ bits AND height > target
-                while len(working_bits) >= 3 and current_height() > target_height:
-                    # Check if we only need to reduce by 1 (use HA instead)
-                    if current_height() == target_height + 1 and len(working_bits) >= 2:
-                        break
-
-                    # Need to reduce by 2+, use FA
-                    bits = [working_bits.pop(0) for _ in range(3)]
-                    fa_consumed[col].append(bit_index)
-
-                    fa_name = f"fa_s{self.num_stages}_c{col}_n{fa_count}"
-                    inputs = [bit[0] for bit in bits]
-                    self.fa_instances.append((self.num_stages, col, fa_count, inputs))
-
-                    next_heap.add_bit(col, f"{fa_name}_s", "fa_sum")
-                    next_heap.add_bit(col + 1, f"{fa_name}_c", "fa_carry")
-                    fa_count += 1
-                    bit_index += 3
-
-                # Use HA if we're exactly 1 over target and have 2+ bits
-                if len(working_bits) >= 2 and current_height() == target_height + 1:
-                    bits = [working_bits.pop(0) for _ in range(2)]
-                    ha_consumed[col].append(bit_index)
-
-                    ha_name = f"ha_s{self.num_stages}_c{col}_n{ha_count}"
-                    inputs = [bit[0] for bit in bits]
-                    self.ha_instances.append((self.num_stages, col, ha_count, inputs))
-
-                    next_heap.add_bit(col, f"{ha_name}_s", "ha_sum")
-                    next_heap.add_bit(col + 1, f"{ha_name}_c", "ha_carry")
-                    ha_count += 1
-                    bit_index += 2
+                return len(working_bits) - bit_index + next_heap.height(col)
 
-            # Pass through remaining bits
-            for bit_name, bit_type in working_bits:
-                next_heap.add_bit(col, bit_name, bit_type)
+            # Use FAs while we have 3+ bits AND height > target
+            while len(working_bits) - bit_index >= 3 and current_height() > target_height:
+                # Check if we only need to reduce by 1 (use HA instead)
+                if current_height() == target_height + 1:
+                    break
 
+                # Need to reduce by 2+, use FA
+                fa_consumed[col].append(bit_index)
+                self._place_fa(next_heap, col, fa_count, working_bits[bit_index:bit_index + 3])
+                fa_count += 1
+                bit_index += 3
 
-            # DEBUG
-            if col == 0:
-                print(f"DEBUG Stage {self.num_stages}: Column 0 after passthrough has {len(next_heap.heap[0])} bits")
-                for bit in next_heap.heap[0]:
-                    print(f"  - {bit}")
+            # Use HA if we're exactly 1 over target and have 2+ bits
+            if len(working_bits) - bit_index >= 2 and current_height() == target_height + 1:
+                ha_consumed[col].append(bit_index)
+                self._place_ha(next_heap, col, ha_count, working_bits[bit_index:bit_index + 2])
+                ha_count += 1
+                bit_index += 2
+
+            # Pass through remaining bits
+            consumed[col] = bit_index
+            next_heap.add_bits(col, working_bits[bit_index:])
 
         next_heap.fa_consumed = fa_consumed
         next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
         return next_heap
 
     def reduce_stage_bickerstaff(self, heap, target_height):
         """Reduce heap using ASAP approach (Bickerstaff algorithm)"""
-        next_heap = BitHeap(self.prod_width)
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
         fa_count = 0
         ha_count = 0
 
         fa_consumed = [[] for _ in range(self.prod_width)]
         ha_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
 
         rightmost_2bit_col = -1
         for col in range(self.prod_width):
@@ -517,91 +1798,309 @@ class CompressorTreeGenerator:
         for col in range(self.prod_width):
             num_bits = heap.height(col)
 
-            if num_bits > 0:
-                print(f"    Col {col}: {num_bits} bits", end="")
-
-            fa_this_col = 0
             bits_consumed = 0
-            while bits_consumed + 3 <= num_bits and col < self.prod_width:
-                bits = heap.pop_bits(col, 3)
+            while bits_consumed + 3 <= num_bits:
                 fa_consumed[col].append(bits_consumed)
-
-                # Store FA instance data
-                fa_name = f"fa_s{self.num_stages}_c{col}_n{fa_count}"
-                inputs = [bit[0] for bit in bits]
-                self.fa_instances.append((self.num_stages, col, fa_count, inputs))
-
-                next_heap.add_bit(col, f"{fa_name}_s", 'fa_sum')
-                next_heap.add_bit(col + 1, f"{fa_name}_c", 'fa_carry')
+                self._place_fa(next_heap, col, fa_count, heap.pop_bits(col, 3))
                 fa_count += 1
-                fa_this_col += 1
                 bits_consumed += 3
 
             remaining = num_bits - bits_consumed
             current_height = remaining + next_heap.height(col)
 
-            ha_this_col = 0
-            if remaining == 2 and col < self.prod_width:
+            if remaining == 2:
                 use_ha = (current_height > target_height) or (col == rightmost_2bit_col)
                 if use_ha:
-                    bits = heap.pop_bits(col, 2)
                     ha_consumed[col].append(bits_consumed)
-
-                    # Store HA instance data
-                    ha_name = f"ha_s{self.num_stages}_c{col}_n{ha_count}"
-                    inputs = [bit[0] for bit in bits]
-                    self.ha_instances.append((self.num_stages, col, ha_count, inputs))
-
-                    next_heap.add_bit(col, f"{ha_name}_s", 'ha_sum')
-                    next_heap.add_bit(col + 1, f"{ha_name}_c", 'ha_carry')
+                    self._place_ha(next_heap, col, ha_count, heap.pop_bits(col, 2))
                     ha_count += 1
-                    ha_this_col += 1
                     bits_consumed += 2
 
-            for bit_name, bit_type in heap.heap[col]:
-                next_heap.add_bit(col, bit_name, bit_type)
+            consumed[col] = bits_consumed
+            next_heap.add_bits(col, heap.bits(col))
 
-            if num_bits > 0:
-                print(f" → {fa_this_col}FA + {ha_this_col}HA")
+        next_heap.fa_consumed = fa_consumed
+        next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
+        return next_heap
+
+    def reduce_stage_c42(self, heap, target_height):
+        """Reduce heap to target height preferring 4:2 compressors
+
+        Columns are reduced as late as possible like Dadda. While a column
+        is 3+ bits over target a 4:2 takes three bits from its bottom as
+        a, b and c, and the carry-outs of the 4:2s in the column below as
+        c_in and d (bottom bits where none are left, 0 for c_in once the
+        column is empty). Carry-outs only depend on a, b and c, so chained
+        4:2s do not ripple. FAs and HAs cover the rest of the excess, and
+        carry-outs left over become bits of the next stage.
+        """
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
+        c42_count = 0
+        fa_count = 0
+        ha_count = 0
 
-        print(f"    Total: {fa_count} FAs, {ha_count} HAs")
+        fa_consumed = [[] for _ in range(self.prod_width)]
+        ha_consumed = [[] for _ in range(self.prod_width)]
+        c42_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
+
+        couts = []  # carry-outs of the 4:2s of the previous column
+        for col in range(self.prod_width):
+            working_bits = heap.bits(col)
+            bit_index = 0
+            next_couts = []
+
+            def current_height():
+                return len(working_bits) - bit_index + len(couts) + next_heap.height(col)
+
+            def take(count):
+                """count inputs, bottom bits first, then carry-outs"""
+                nonlocal bit_index
+                bits = working_bits[bit_index:bit_index + count]
+                bit_index += len(bits)
+                while len(bits) < count:
+                    bits.append(couts.pop(0))
+                return bits
+
+            # Use 4:2s while 3+ over target, each leaves 3-4 fewer bits here
+            while (
+                current_height() - target_height >= 3
+                and len(working_bits) - bit_index >= 3
+                and len(working_bits) - bit_index + len(couts) >= 4
+            ):
+                start = bit_index
+                bits = take(4)
+                # c_in from the column below where possible, tied to 0 if
+                # only four bits are left
+                if couts or len(working_bits) - bit_index:
+                    bits.extend(take(1) if not couts else [couts.pop(0)])
+                else:
+                    bits.append(self.signals.const_zero())
+                c42_consumed[col].append((start, bit_index - start))
+                next_couts.append(self._place_c42(next_heap, col, c42_count, bits))
+                c42_count += 1
+
+            # Use FAs while we have 3+ bits AND height > target
+            while len(working_bits) - bit_index + len(couts) >= 3 and current_height() > target_height:
+                # Check if we only need to reduce by 1 (use HA instead)
+                if current_height() == target_height + 1:
+                    break
+
+                # Need to reduce by 2+, use FA
+                fa_consumed[col].append(bit_index)
+                self._place_fa(next_heap, col, fa_count, take(3))
+                fa_count += 1
+
+            # Use HA if we're exactly 1 over target and have 2+ bits
+            if len(working_bits) - bit_index + len(couts) >= 2 and current_height() == target_height + 1:
+                ha_consumed[col].append(bit_index)
+                self._place_ha(next_heap, col, ha_count, take(2))
+                ha_count += 1
+
+            # Unchained carry-outs of the column below stay in this column,
+            # then pass through remaining bits
+            next_heap.add_bits(col, couts)
+            consumed[col] = bit_index
+            next_heap.add_bits(col, working_bits[bit_index:])
+            couts = next_couts
+
+        next_heap.fa_consumed = fa_consumed
+        next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = c42_consumed
+        next_heap.gpc_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.consumed = consumed
+        return next_heap
+
+    def reduce_stage_gpc(self, heap, target_height):
+        """Reduce heap to target height with generalized parallel counters
+
+        Columns are reduced LSB first. While a column is over target, the
+        library cell (GPCs, FA or HA) that fits the bits left is added that
+        brings it closest to target without overshooting (stages), or that
+        removes the most bits per LUT (area), see CELL_COSTS. Counters
+        reading the next column take its bottom bits, before that column's
+        own cells. The cells of a column are placed in cell_lists() order,
+        the order emitters read them in.
+        """
+        next_heap = BitHeap(self.prod_width, self.signals, self.num_stages + 1)
+        counts = dict.fromkeys(CELL_KINDS, 0)
+
+        fa_consumed = [[] for _ in range(self.prod_width)]
+        ha_consumed = [[] for _ in range(self.prod_width)]
+        gpc_consumed = [[] for _ in range(self.prod_width)]
+        consumed = [0] * self.prod_width
+        taken = [0] * (self.prod_width + 1)  # bits taken from the bottom of each column
+
+        shapes = dict(GPC_SHAPES, fa=(3, 0, 2), ha=(2, 0, 2))
+        order = list(self.cell_lists())
+        per_lut = self.gpc_objective == "area"
+
+        def rank(kind, excess):
+            k0, k1, m = shapes[kind]
+            area = CELL_COSTS[kind][0]
+            cover = min(k0 - 1, excess)
+            overshoot = k0 - 1 - cover
+            removed = k0 + k1 - m
+            if per_lut:
+                return removed / area, cover, -overshoot, -area
+            return cover, -overshoot, removed / area, -area
+
+        for col in range(self.prod_width):
+            bits = heap.bits(col)
+            above = heap.bits(col + 1) if col + 1 < self.prod_width else array("l")
+            free = len(bits) - taken[col]
+            free_above = len(above) - taken[col + 1]
+            height = free + next_heap.height(col)
+
+            # Choose cells on bit counts first
+            chosen = []
+            while height > target_height:
+                fits = [
+                    kind for kind, (k0, k1, _) in shapes.items()
+                    if k0 <= free and k1 <= free_above
+                ]
+                if not fits:
+                    break
+                kind = max(fits, key=lambda kind: rank(kind, height - target_height))
+                k0, k1, _ = shapes[kind]
+                chosen.append(kind)
+                free -= k0
+                free_above -= k1
+                height -= k0 - 1
+
+            # Then hand them bits from the bottom, in emission order
+            for kind in sorted(chosen, key=order.index):
+                k0, k1, _ = shapes[kind]
+                start = taken[col]
+                inputs = bits[start:start + k0]
+                taken[col] += k0
+                if kind == "fa":
+                    fa_consumed[col].append(start)
+                    self._place_fa(next_heap, col, counts[kind], inputs)
+                elif kind == "ha":
+                    ha_consumed[col].append(start)
+                    self._place_ha(next_heap, col, counts[kind], inputs)
+                else:
+                    gpc_consumed[col].append((start, k0))
+                    if k1:
+                        start_above = taken[col + 1]
+                        inputs.extend(above[start_above:start_above + k1])
+                        taken[col + 1] += k1
+                        gpc_consumed[col + 1].append((start_above, k1))
+                    self._place_gpc(next_heap, kind, col, counts[kind], inputs)
+                counts[kind] += 1
+
+            # Pass through remaining bits
+            consumed[col] = taken[col]
+            next_heap.add_bits(col, bits[taken[col]:])
 
         next_heap.fa_consumed = fa_consumed
         next_heap.ha_consumed = ha_consumed
+        next_heap.c42_consumed = [[] for _ in range(self.prod_width)]
+        next_heap.gpc_consumed = gpc_consumed
+        next_heap.consumed = consumed
         return next_heap
 
+    def _exact_bounds_text(self):
+        """Objective of the exact algorithm, as in fewest cells within 6 stages"""
+        if self.max_cells is not None:
+            within = f" within {self.max_stages} stages" if self.max_stages is not None else ""
+            return f"fewest stages within {self.max_cells} cells{within}"
+        if self.max_stages is not None:
+            return f"fewest cells within {self.max_stages} stages"
+        return "fewest cells within the fewest stages"
+
+    def _sum_only_text(self):
+        """Summary of sum_only_cells, as in 3 cells as XORs (ha 3)"""
+        counts = {kind: len(cells) for kind, cells in self.sum_only_cells.items()}
+        detail = ", ".join(f"{kind} {count}" for kind, count in counts.items())
+        return f"{sum(counts.values())} cells as XORs ({detail})"
+
+    def _propagation_text(self):
+        """Summary of propagation_report, the cells simplified in total and per stage"""
+        per_stage = " ".join(map(str, self.propagation_report))
+        return f"{sum(self.propagation_report)} FA/HA cells simplified (per stage: {per_stage})"
+
+    def _type_text(self):
+        """Signedness for summaries"""
+        if self.signed_mode:
+            return "Signed/Unsigned (signed_mode input)"
+        return "Unsigned" if self.unsigned else "Signed"
+
+    def _width_text(self):
+        """Operand widths for summaries, a x b when rectangular"""
+        if self.wb == self.w:
+            return f"{self.w} bits"
+        return f"{self.w} x {self.wb} bits"
+
     def print_summary(self):
         """Print generation summary with heap visualization"""
+        from gen_graphviz import generate_graphviz
+        from visualize_heap import reset_bitheap_file
+
         algo_name = {
             "dadda": "Dadda",
             "bickerstaff": "Bickerstaff",
+            "wallace": "Wallace",
+            "wallace_ra": "Reduced-Area Wallace",
             "faonly": "FA-only Greedy",
+            "c42": "4:2 Compressor",
+            "gpc": "GPC",
+            "exact": "Exact",
         }[self.algorithm]
         print(f"\n{algo_name} Tree Configuration:")
         print(f"  Algorithm: {self.algorithm.upper()}")
-        print(f"  Input Width: {self.w} bits")
+        print(f"  Input Width: {self._width_text()}")
         print(
-            f"  Encoding: {self.encoding.upper()} ({'Radix-4 Booth' if self.encoding == 'booth' else 'Radix-2 Binary'})"
+            f"  Encoding: {self.encoding.upper()} ({f'Radix-{self.radix} Booth' if self.encoding == 'booth' else 'Radix-2 Binary'})"
         )
         print(f"  Partial Products: {self.num_pp}")
         print(f"  Product Width: {self.prod_width}")
-        print(f"  Multiplication Type: {'Unsigned' if self.unsigned else 'Signed'}")
+        print(f"  Multiplication Type: {self._type_text()}")
         if not self.unsigned:
             print(
                 f"  Sign Extension: {'Optimized (invert+extend)' if self.sign_ext_opt else 'Naive'}"
             )
         if self.algorithm == "dadda":
             print(f"  Dadda Sequence: {self.dadda_seq}")
+        if self.algorithm in ("wallace", "wallace_ra"):
+            print(f"  Wallace Sequence: {wallace_sequence(self.stages[0].max_height())}")
+        if self.algorithm == "gpc":
+            print(f"  GPC Objective: {self.gpc_objective}")
+        if self.algorithm == "exact":
+            print(f"  Exact Bounds: {self._exact_bounds_text()}")
+        if self.timing_driven:
+            print("  Timing-Driven: earliest bits into cells first")
+        if self.assign_fa_pins:
+            print("  FA Pins: latest input on the fastest pin")
+        if self.constant_report and self.constant_report[0]:
+            before, after = self.constant_report
+            print(f"  Constant Bits: {before} folded into {after}")
+        if self.sum_only_cells:
+            print(f"  Dead Carries: {self._sum_only_text()}")
+        if self.propagation_report and any(self.propagation_report):
+            print(f"  Constant Inputs: {self._propagation_text()}")
+        if self.final_height != 2:
+            print(f"  Final Height: {self.final_height} rows (ternary final adder)")
         print(f"  Number of Stages: {self.num_stages}")
         print()
 
+        reset_bitheap_file()
         print(f"Initial Partial Products (Stage 0):")
         print(self.stages[0])
         print()
 
         if self.algorithm == "dadda":
             initial_max = self.stages[0].max_height()
-            targets = [h for h in reversed(self.dadda_seq) if h < initial_max]
+            targets = reduction_targets(self.dadda_seq, initial_max, self.final_height)
+        elif self.algorithm in ("wallace", "wallace_ra"):
+            initial_max = self.stages[0].max_height()
+            targets = reduction_targets(
+                wallace_sequence(initial_max), initial_max, self.final_height
+            )
         else:
             targets = []
 
@@ -626,13 +2125,44 @@ class CompressorTreeGenerator:
         print()
 
 
+def generate_cached(gen, output_file, cache=None, need_netlist=True):
+    """Build gen and write its Verilog to output_file, going through cache
+
+    gen must be configured with build=False. On a cache hit the stored RTL
+    is copied, and the netlist only reloaded if need_netlist. Returns the
+    generator (reloaded on a hit) and whether the cache was hit.
+    """
+    key = cache.key(gen) if cache else None
+    if cache and cache.lookup(key):
+        gen.tracer.emit("tree_cache", "cache_hit", key=key)
+        cache.copy_rtl(key, output_file)
+        if need_netlist:
+            gen = cache.load_netlist(key, gen.tracer)
+        return gen, True
+
+    gen.build_reduction()
+    generate_verilog(gen, output_file)
+    if cache:
+        cache.store(key, gen, output_file)
+        gen.tracer.emit("tree_cache", "cache_stored", key=key)
+    return gen, False
+
+
 def main():
     import argparse
 
+    from tree_cache import TreeCache
+
     parser = argparse.ArgumentParser(
-        description="Generate Dadda/Bickerstaff/FAonly Compressor Tree"
+        description="Generate Dadda/Bickerstaff/Wallace/FAonly/4:2/GPC/Exact Compressor Tree"
     )
     parser.add_argument("-w", "--width", type=int, default=16, help="Input width")
+    parser.add_argument(
+        "--wb",
+        type=int,
+        default=None,
+        help="Multiplier (b) width if it differs from --width; it sets the rows, so give it the shorter operand",
+    )
     parser.add_argument(
         "-n", "--num-pp", type=int, default=None, help="Number of partial products"
     )
@@ -644,14 +2174,57 @@ def main():
         choices=["booth", "binary"],
         help="Encoding type",
     )
+    parser.add_argument(
+        "--radix",
+        type=int,
+        default=4,
+        choices=BOOTH_RADICES,
+        help="Booth radix (8 and 16 read precomputed hard multiples, see hard_multiples.py)",
+    )
     parser.add_argument(
         "-a",
         "--algorithm",
         type=str,
         default="dadda",
-        choices=["dadda", "bickerstaff", "faonly"],
+        choices=ALGORITHMS,
         help="Reduction algorithm",
     )
+    parser.add_argument(
+        "--gpc-objective",
+        type=str,
+        default="stages",
+        choices=GPC_OBJECTIVES,
+        help="What the gpc algorithm minimizes",
+    )
+    parser.add_argument(
+        "--max-stages",
+        type=int,
+        default=None,
+        help="Stage bound of the exact algorithm (default: fewest possible)",
+    )
+    parser.add_argument(
+        "--max-cells",
+        type=int,
+        default=None,
+        help="Cell budget of the exact algorithm, which then minimizes stages",
+    )
+    parser.add_argument(
+        "--final-height",
+        type=int,
+        default=2,
+        choices=FINAL_HEIGHTS,
+        help="Rows left for the final adder (3 adds a carry2 output and a ternary adder)",
+    )
+    parser.add_argument(
+        "--timing-driven",
+        action="store_true",
+        help="Feed the earliest-arriving bits of each column into cells (three-greedy)",
+    )
+    parser.add_argument(
+        "--assign-fa-pins",
+        action="store_true",
+        help="Permute FA inputs so the latest-arriving bit drives the fastest pin",
+    )
     parser.add_argument(
         "-o", "--output", type=str, default="compressor_tree.sv", help="Output file"
     )
@@ -668,13 +2241,51 @@ def main():
     parser.add_argument(
         "--unsigned", action="store_true", help="Unsigned multiplication"
     )
+    parser.add_argument(
+        "--signed-mode",
+        action="store_true",
+        help="Select signed or unsigned at run time with a signed_mode input (binary trees get the port)",
+    )
+    parser.add_argument(
+        "--no-fold-constants",
+        action="store_true",
+        help="Keep every constant 1'b1 bit instead of folding them into one per column",
+    )
+    parser.add_argument(
+        "--no-prune-dead-logic",
+        action="store_true",
+        help="Keep full cells in the top column instead of XORs for their dropped carries",
+    )
+    parser.add_argument(
+        "--no-propagate-constants",
+        action="store_true",
+        help="Instantiate FAs and HAs with constant inputs instead of simplifying them",
+    )
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default="silent",
+        choices=TRACE_LEVELS,
+        help="Generator event level (JSON lines, stderr unless --trace-file)",
+    )
+    parser.add_argument(
+        "--trace-file", type=str, default=None, help="Write generator events to this file"
+    )
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Always rebuild, bypassing the tree cache"
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        default=None,
+        help="Tree cache directory (default $COMPRESSOR_TREE_CACHE or ~/.cache/compressor_tree)",
+    )
 
     args = parser.parse_args()
+    if args.signed_mode and args.unsigned:
+        parser.error("--signed-mode selects signedness at run time, drop --unsigned")
 
-    # Validate: Booth encoding only supports signed
-    if args.encoding == "booth" and args.unsigned:
-        print("ERROR: Unsigned Booth multiplication not supported", file=sys.stderr)
-        sys.exit(1)
+    tracer, trace_file = tracer_from_args(args.trace, args.trace_file)
 
     gen = CompressorTreeGenerator(
         w=args.width,
@@ -683,33 +2294,84 @@ def main():
         unsigned=args.unsigned,
         encoding=args.encoding,
         algorithm=args.algorithm,
+        build=False,
+        tracer=tracer,
+        gpc_objective=args.gpc_objective,
+        timing_driven=args.timing_driven,
+        assign_fa_pins=args.assign_fa_pins,
+        fold_constants=not args.no_fold_constants,
+        prune_dead_logic=not args.no_prune_dead_logic,
+        propagate_constants=not args.no_propagate_constants,
+        max_stages=args.max_stages,
+        max_cells=args.max_cells,
+        final_height=args.final_height,
+        radix=args.radix,
+        wb=args.wb,
+        signed_mode=args.signed_mode,
     )
 
+    # Identical configurations reuse the netlist and RTL of an earlier run
+    cache = None if args.no_cache else TreeCache(args.cache_dir)
+    try:
+        gen, _ = generate_cached(
+            gen, args.output, cache, need_netlist=args.summary or args.visualize
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+
     if args.summary or args.visualize:
-        mult_type = "Unsigned" if args.unsigned else "Signed"
         encoding_name = (
-            "Radix-4 Booth" if args.encoding == "booth" else "Radix-2 Binary"
+            f"Radix-{args.radix} Booth" if args.encoding == "booth" else "Radix-2 Binary"
         )
         algorithm_names = {
             "dadda": "Dadda (ALAP)",
             "bickerstaff": "Bickerstaff (ASAP)",
+            "wallace": "Wallace (ASAP)",
+            "wallace_ra": "Reduced-Area Wallace (ASAP)",
             "faonly": "FA-only (Greedy)",
+            "c42": "4:2 Compressor (ALAP)",
+            "gpc": f"GPC ({'ALAP' if args.gpc_objective == 'area' else 'ASAP'}, min {args.gpc_objective})",
+            "exact": f"Exact (min {'stages' if args.max_cells is not None else 'cells'})",
         }
         algorithm_name = algorithm_names[args.algorithm]
 
         print(f"\n{algorithm_name} Tree Configuration:")
-        print(f"  Input Width: {args.width} bits")
+        print(f"  Input Width: {gen._width_text()}")
         print(f"  Encoding: {encoding_name}")
-        print(f"  Type: {mult_type}")
+        print(f"  Type: {gen._type_text()}")
         print(f"  Partial Products: {gen.num_pp}")
         print(f"  Product Width: {gen.prod_width}")
         print(f"  Stages: {gen.num_stages}")
         print(f"  Final heap height: {gen.stages[-1].max_height()}")
+        if gen.constant_report and gen.constant_report[0]:
+            before, after = gen.constant_report
+            print(f"  Constant bits: {before} folded into {after}")
+        if gen.sum_only_cells:
+            print(f"  Dead carries: {gen._sum_only_text()}")
+        if gen.propagation_report and any(gen.propagation_report):
+            print(f"  Constant inputs: {gen._propagation_text()}")
+        area, delay = gen.cost()
+        print(f"  LUT-6 estimate: {area} LUTs, {delay} levels")
+        profile = gen.arrival_profile()
+        critical = max(profile)
+        print(
+            f"  Critical path: {critical:g} XOR delays "
+            f"(column {profile.index(critical)}{', timing-driven' if gen.timing_driven else ''})"
+        )
+        print(f"  Output arrival (MSB..LSB): {' '.join(f'{t:g}' for t in reversed(profile))}")
+        if gen.fa_pin_report:
+            before, after, permuted = gen.fa_pin_report
+            print(
+                f"  FA pin assignment: {permuted} FAs permuted, critical path "
+                f"{before:g} -> {after:g} XOR delays"
+            )
 
         if args.visualize:
             gen.print_summary()
 
-    generate_verilog(gen, args.output)
+    if trace_file:
+        trace_file.close()
 
     print(f"\nGenerated {args.output}")
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Exact FA/HA allocation for compressor trees
+Finds the tree with the fewest cells within a number of stages, or the fewest
+stages within a cell budget, by dynamic programming over the heap columns
+from the LSB up. The state between two columns is the number of carries
+passed up in each stage; every cell sends exactly one carry, so the cells of
+a column are the sum of its carry vector.
+
+Two facts keep the search small. Fewer bits never make a column harder, and
+a bit that arrives earlier can wait in its column, so carry vector u beats v
+when every suffix sum of u (carries arriving at stage t or later) is at most
+that of v. Within a column, two schedules that leave the same height after
+a stage have the same futures, so only the carry prefixes no other beats are
+kept. More than one HA per column and stage never helps: an FA on three of
+the four bits leaves the same height with one cell and one carry less.
+"""
+
+
+def _suffix_sums(carries):
+    """Carries arriving at each stage or later"""
+    sums = []
+    total = 0
+    for count in reversed(carries):
+        total += count
+        sums.append(total)
+    return tuple(reversed(sums))
+
+
+def _beats(u, v):
+    return all(a <= b for a, b in zip(u, v))
+
+
+def _front(entries):
+    """Entries (carries, payload) whose carries no other entry beats, one per carry vector"""
+    unique = {}
+    for carries, payload in entries:
+        unique.setdefault(carries, payload)
+    ranked = sorted(((_suffix_sums(c), c, p) for c, p in unique.items()), key=lambda e: e[0])
+    kept = []
+    front = []
+    for sums, carries, payload in ranked:
+        if not any(_beats(other, sums) for other in kept):
+            kept.append(sums)
+            front.append((carries, payload))
+    return front
+
+
+def _lowest_height(height, carries_in, stage):
+    """Lowest height a column can reach at the end, from height at stage"""
+    for count in carries_in[stage:]:
+        height = height - 2 * (height // 3) - (height % 3 == 2) + count
+    return height
+
+
+def column_options(height, carries_in, final_height=2):
+    """Schedules of one column reaching final_height, given its carries in per stage
+
+    Returns [(carries out per stage, ((fa, ha) per stage))] with no carry
+    vector beaten by another.
+    """
+    num_stages = len(carries_in)
+    layer = {height: [((), ())]}
+    for stage in range(num_stages):
+        grown = {}
+        for bits, schedules in layer.items():
+            for fa in range(bits // 3 + 1):
+                for ha in (0, 1) if bits - 3 * fa >= 2 else (0,):
+                    after = bits - 2 * fa - ha + carries_in[stage]
+                    if _lowest_height(after, carries_in, stage + 1) > final_height:
+                        continue
+                    grown.setdefault(after, []).extend(
+                        (carries + (fa + ha,), cells + ((fa, ha),))
+                        for carries, cells in schedules
+                    )
+        layer = {bits: _front(schedules) for bits, schedules in grown.items()}
+    return _front(
+        schedule
+        for bits, schedules in layer.items()
+        if bits <= final_height
+        for schedule in schedules
+    )
+
+
+def min_cells(heights, num_stages, final_height=2):
+    """Fewest-cell tree reducing heights to final_height in num_stages stages
+
+    Returns (cells, fa, ha) with fa[s][col]/ha[s][col] the cells placed per
+    stage and column, or None when num_stages is not enough. Carries out of
+    the top column drop, as in BitHeap.
+    """
+    width = len(heights)
+    none = (0,) * num_stages
+    # Per column, {carries out: (cells up to here, carries in, schedule)}
+    columns = []
+    states = {none: (0, None, None)}
+    for col, height in enumerate(heights):
+        reached = {}
+        for carries_in, (cost, _, _) in states.items():
+            for carries, schedule in column_options(height, carries_in, final_height):
+                total = cost + sum(carries)
+                key = none if col == width - 1 else carries
+                if key not in reached or reached[key][0] > total:
+                    reached[key] = (total, carries_in, schedule)
+        if not reached:
+            return None
+
+        # Keep the states no cheaper state beats
+        ranked = sorted(reached.items(), key=lambda e: (e[1][0], _suffix_sums(e[0])))
+        kept = []
+        states = {}
+        for carries, state in ranked:
+            sums = _suffix_sums(carries)
+            if not any(cost <= state[0] and _beats(other, sums) for other, cost in kept):
+                kept.append((sums, state[0]))
+                states[carries] = state
+        columns.append(states)
+
+    # Walk back from the cheapest end state
+    fa = [[0] * width for _ in range(num_stages)]
+    ha = [[0] * width for _ in range(num_stages)]
+    carries = min(states, key=lambda c: states[c][0])
+    cells = states[carries][0]
+    for col in reversed(range(width)):
+        _, carries, schedule = columns[col][carries]
+        for stage, (f, h) in enumerate(schedule):
+            fa[stage][col] = f
+            ha[stage][col] = h
+    return cells, fa, ha
+
+
+def stage_lower_bound(heights, final_height=2):
+    """Stages the tallest column needs even with no carries coming in"""
+    stages = 0
+    height = max(heights, default=0)
+    while height > final_height:
+        height = _lowest_height(height, (0,), 0)
+        stages += 1
+    return stages
+
+
+def plan_exact(heights, max_stages=None, max_cells=None, final_height=2):
+    """Exact FA/HA plan of a heap with the given column heights
+
+    With max_cells, the fewest stages (up to max_stages) whose best tree
+    fits in max_cells; otherwise the fewest cells within max_stages, by
+    default the fewest stages possible. Returns (cells, fa, ha) as
+    min_cells, without stages that place no cell.
+    """
+    first = stage_lower_bound(heights, final_height)
+    if max_stages is not None and max_stages < first:
+        raise ValueError(f"No tree reaches height {final_height} in {max_stages} stages")
+    if max_cells is None and max_stages is not None:
+        stage_counts = [max_stages]
+    else:
+        # Each column finishes within one stage per halving of the heap
+        last = max_stages if max_stages is not None else first + 2 * len(heights).bit_length()
+        stage_counts = range(first, last + 1)
+
+    for num_stages in stage_counts:
+        plan = min_cells(heights, num_stages, final_height)
+        if plan is None:
+            continue
+        if max_cells is None or plan[0] <= max_cells:
+            cells, fa, ha = plan
+            used = [s for s in range(num_stages) if any(fa[s]) or any(ha[s])]
+            return cells, [fa[s] for s in used], [ha[s] for s in used]
+    if max_cells is not None:
+        raise ValueError(
+            f"No tree of at most {max_cells} cells"
+            + (f" within {max_stages} stages" if max_stages is not None else "")
+        )
+    raise ValueError(f"No tree reaches height {final_height} in {max_stages} stages")
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """
-Graphviz DOT Generator for Dadda/Bickerstaff Compressor Trees
+Graphviz DOT Generator for Dadda/Bickerstaff/4:2/GPC Compressor Trees
 Layout: MSB (high columns) on LEFT, LSB (column 0) on RIGHT
 """
 
+from compressor_tree import CELL_KINDS, GPC_SHAPES
+
+
 class GraphvizGenerator:
     def __init__(self, dadda_gen, show_final_adder=False):
         """
@@ -86,7 +89,8 @@ class GraphvizGenerator:
         # Iterate from high to low column (MSB to LSB)
         # This places MSB on left, LSB on right in the visualization
         for col in range(self.prod_width - 1, -1, -1):
-            for bit_idx, (bit_name, bit_type) in enumerate(self.stages[0].heap[col]):
+            for bit_idx, bit in enumerate(self.stages[0].bits(col)):
+                bit_name = self.stages[0].name(bit)
                 node_name = f"n{node_id}"
                 lines.append(f"    {node_name} [label=\"{bit_name}\", fillcolor=\"lightgray\"];")
                 stage0_nodes[col].append((node_name, 'normal'))
@@ -118,43 +122,108 @@ class GraphvizGenerator:
         stage_nodes_current = [[] for _ in range(self.prod_width)]
         all_nodes_in_order = []
 
-        # Get FA and HA instances for this stage
-        stage_fas = [(col, idx) for s, col, idx, inputs in self.fa_instances if s == stage_idx]
-        stage_has = [(col, idx) for s, col, idx, inputs in self.ha_instances if s == stage_idx]
+        # Cells of this stage, grouped by kind and column
+        cells = self.gen.instance_index()[stage_idx]
+        c42s_by_col, fas_by_col, has_by_col = cells["c42"], cells["fa"], cells["ha"]
 
-        # Track nodes created for each column
+        # Track nodes created for each column, as (node, inputs)
         fa_nodes_created = {}
         ha_nodes_created = {}
+        c42_nodes_created = {}
+        gpc_nodes_created = {}  # as (node, inputs of the column, inputs of the next)
 
         for col in range(self.prod_width):
             fa_nodes_created[col] = []
             ha_nodes_created[col] = []
+            c42_nodes_created[col] = []
+            gpc_nodes_created[col] = []
+
+        # Node of each cell of this stage, by (kind, col, index)
+        cell_nodes = {}
+
+        # Create GPC nodes - iterate from high to low column for left-to-right layout
+        gpc_cols = set().union(*(cells[kind] for kind in GPC_SHAPES))
+        for col in sorted(gpc_cols, reverse=True):
+            for kind, (k0, k1, m) in GPC_SHAPES.items():
+                for idx, inputs in cells[kind].get(col, ()):
+                    gpc_node = f"n{node_id}"
+                    cell_nodes[(kind, col, idx)] = gpc_node
+                    shape = f"{k1},{k0};{m}" if k1 else f"{k0};{m}"
+                    lines.append(f"    {gpc_node} [label=\"({shape})\\nc{col}\", fillcolor=\"palegreen\"];")
+                    gpc_nodes_created[col].append((gpc_node, inputs[:k0], inputs[k0:]))
+                    all_nodes_in_order.append(gpc_node)
+
+                    for weight in range(m):
+                        if col + weight < self.prod_width:
+                            stage_nodes_current[col + weight].append((gpc_node, f"gpc_s{weight}"))
 
-        # Create FA nodes - iterate from high to low column for left-to-right layout
-        for col, idx in sorted(stage_fas, key=lambda x: -x[0]):
-            fa_node = f"n{node_id}"
-            lines.append(f"    {fa_node} [label=\"FA\\nc{col}\", fillcolor=\"lightblue\"];")
-            fa_nodes_created[col].append(fa_node)
-            all_nodes_in_order.append(fa_node)
+                    node_id += 1
+
+        # 4:2 nodes by (col, index), for carry-outs chained within the stage
+        c42_nodes = {}
+
+        # Create 4:2 nodes - iterate from high to low column for left-to-right layout
+        for col in sorted(c42s_by_col, reverse=True):
+            for idx, inputs in c42s_by_col[col]:
+                c42_node = f"n{node_id}"
+                lines.append(f"    {c42_node} [label=\"4:2\\nc{col}\", fillcolor=\"khaki\"];")
+                c42_nodes_created[col].append((c42_node, inputs))
+                c42_nodes[(col, idx)] = c42_node
+                cell_nodes[("c42", col, idx)] = c42_node
+                all_nodes_in_order.append(c42_node)
 
-            stage_nodes_current[col].append((fa_node, 'fa_sum'))
-            if col + 1 < self.prod_width:
-                stage_nodes_current[col + 1].append((fa_node, 'fa_carry'))
+                stage_nodes_current[col].append((c42_node, 'c42_sum'))
+                if col + 1 < self.prod_width:
+                    stage_nodes_current[col + 1].append((c42_node, 'c42_carry'))
 
-            node_id += 1
+                node_id += 1
+
+        # Create FA nodes - iterate from high to low column for left-to-right layout
+        for col in sorted(fas_by_col, reverse=True):
+            for idx, inputs in fas_by_col[col]:
+                fa_node = f"n{node_id}"
+                cell_nodes[("fa", col, idx)] = fa_node
+                label = "XOR3" if self.gen.is_sum_only("fa", stage_idx, col, idx) else "FA"
+                lines.append(f"    {fa_node} [label=\"{label}\\nc{col}\", fillcolor=\"lightblue\"];")
+                fa_nodes_created[col].append((fa_node, inputs))
+                all_nodes_in_order.append(fa_node)
+
+                stage_nodes_current[col].append((fa_node, 'fa_sum'))
+                if col + 1 < self.prod_width:
+                    stage_nodes_current[col + 1].append((fa_node, 'fa_carry'))
+
+                node_id += 1
 
         # Create HA nodes - iterate from high to low column for left-to-right layout
-        for col, idx in sorted(stage_has, key=lambda x: -x[0]):
-            ha_node = f"n{node_id}"
-            lines.append(f"    {ha_node} [label=\"HA\\nc{col}\", fillcolor=\"pink\"];")
-            ha_nodes_created[col].append(ha_node)
-            all_nodes_in_order.append(ha_node)
+        for col in sorted(has_by_col, reverse=True):
+            for idx, inputs in has_by_col[col]:
+                ha_node = f"n{node_id}"
+                cell_nodes[("ha", col, idx)] = ha_node
+                label = "XOR2" if self.gen.is_sum_only("ha", stage_idx, col, idx) else "HA"
+                lines.append(f"    {ha_node} [label=\"{label}\\nc{col}\", fillcolor=\"pink\"];")
+                ha_nodes_created[col].append((ha_node, inputs))
+                all_nodes_in_order.append(ha_node)
+
+                stage_nodes_current[col].append((ha_node, 'ha_sum'))
+                if col + 1 < self.prod_width:
+                    stage_nodes_current[col + 1].append((ha_node, 'ha_carry'))
 
-            stage_nodes_current[col].append((ha_node, 'ha_sum'))
-            if col + 1 < self.prod_width:
-                stage_nodes_current[col + 1].append((ha_node, 'ha_carry'))
+                node_id += 1
 
-            node_id += 1
+        # 4:2s whose carry-out a cell of this stage reads directly, the
+        # others pass it on to the next stage
+        signals = self.gen.signals
+        chained = {
+            (signals.cell_col[signals.source[bit]], signals.cell_n[signals.source[bit]])
+            for created in (c42_nodes_created, fa_nodes_created, ha_nodes_created)
+            for col_cells in created.values()
+            for _, inputs in col_cells
+            for bit in inputs
+            if signals.source[bit] >= 0 and signals.is_direct(bit, stage_idx)
+        }
+        for (col, idx), c42_node in sorted(c42_nodes.items(), key=lambda item: -item[0][0]):
+            if col + 1 < self.prod_width and (col, idx) not in chained:
+                stage_nodes_current[col + 1].append((c42_node, 'c42_cout'))
 
         lines.extend([
             "  }",
@@ -170,45 +239,90 @@ class GraphvizGenerator:
 
         # Create edges from previous stage to current stage
         self._generate_stage_edges(stage_idx, stage_nodes, fa_nodes_created,
-                                   ha_nodes_created, stage_nodes_current, lines)
+                                   ha_nodes_created, stage_nodes_current, lines,
+                                   c42_nodes_created, c42_nodes, gpc_nodes_created)
+        if self.gen.timing_driven:
+            # Columns are ordered by arrival, follow the generator's heap
+            stage_nodes_current = self._order_like_heap(
+                stage_idx, stage_nodes[stage_idx], cell_nodes
+            )
 
         return node_id, stage_nodes_current
 
     def _generate_stage_edges(self, stage_idx, stage_nodes, fa_nodes_created,
-                              ha_nodes_created, stage_nodes_current, lines):
+                              ha_nodes_created, stage_nodes_current, lines,
+                              c42_nodes_created, c42_nodes, gpc_nodes_created):
         """Generate edges connecting stages"""
+        carry_types = ['fa_carry', 'ha_carry', 'c42_carry', 'c42_cout', 'gpc_s1', 'gpc_s2']
+        signals = self.gen.signals
+        prev_stage = stage_nodes[stage_idx]
+        consumed = [0] * self.prod_width
+
+        def connect(cell_node, col, inputs):
+            """Edges into cell_node from the bottom bits of col, except
+            chained 4:2 carry-outs and constants"""
+            prev_bits = prev_stage[col]
+            for bit in inputs:
+                if signals.is_direct(bit, stage_idx):
+                    cell = signals.source[bit]
+                    if cell >= 0:
+                        source_node = c42_nodes[(signals.cell_col[cell], signals.cell_n[cell])]
+                        lines.append(
+                            f"  {source_node} -> {cell_node} [label=\"co\", color=\"red\", style=\"dashed\"];"
+                        )
+                elif consumed[col] < len(prev_bits):
+                    input_node, input_type = prev_bits[consumed[col]]
+                    if input_type in carry_types:
+                        lines.append(f"  {input_node} -> {cell_node} [label=\"c\", color=\"red\"];")
+                    else:
+                        lines.append(f"  {input_node} -> {cell_node};")
+                    consumed[col] += 1
+
+        # GPCs go first, column by column, taking bits of the next column too
+        for col in range(self.prod_width):
+            for gpc_node, inputs, inputs_above in gpc_nodes_created[col]:
+                connect(gpc_node, col, inputs)
+                if inputs_above:
+                    connect(gpc_node, col + 1, inputs_above)
+
         # Process all columns
         for col in range(self.prod_width):
-            prev_bits = stage_nodes[stage_idx][col]
-
-            bits_consumed = 0
-
-            # Connect to FAs
-            for fa_node in fa_nodes_created[col]:
-                for i in range(3):
-                    if bits_consumed < len(prev_bits):
-                        input_node, input_type = prev_bits[bits_consumed]
-                        if input_type in ['fa_carry', 'ha_carry']:
-                            lines.append(f"  {input_node} -> {fa_node} [label=\"c\", color=\"red\"];")
-                        else:
-                            lines.append(f"  {input_node} -> {fa_node};")
-                        bits_consumed += 1
-
-            # Connect to HAs
-            for ha_node in ha_nodes_created[col]:
-                for i in range(2):
-                    if bits_consumed < len(prev_bits):
-                        input_node, input_type = prev_bits[bits_consumed]
-                        if input_type in ['fa_carry', 'ha_carry']:
-                            lines.append(f"  {input_node} -> {ha_node} [label=\"c\", color=\"red\"];")
-                        else:
-                            lines.append(f"  {input_node} -> {ha_node};")
-                        bits_consumed += 1
+            prev_bits = prev_stage[col]
+
+            # Cells take the bottom bits of the column in order (4:2s, then
+            # FAs, then HAs)
+            for created in (c42_nodes_created, fa_nodes_created, ha_nodes_created):
+                for cell_node, inputs in created[col]:
+                    connect(cell_node, col, inputs)
 
             # Passthrough bits
-            while bits_consumed < len(prev_bits):
-                stage_nodes_current[col].append(prev_bits[bits_consumed])
-                bits_consumed += 1
+            while consumed[col] < len(prev_bits):
+                stage_nodes_current[col].append(prev_bits[consumed[col]])
+                consumed[col] += 1
+
+    def _order_like_heap(self, stage_idx, prev_stage, cell_nodes):
+        """(node, type) of every bit of stage stage_idx + 1, in heap order
+
+        Cell outputs map to the node of their cell and passed-through bits to
+        their node in the previous stage.
+        """
+        signals = self.gen.signals
+        locate = self.stages[stage_idx].locate
+        next_heap = self.stages[stage_idx + 1]
+        columns = []
+        for col in range(self.prod_width):
+            nodes = []
+            for bit in next_heap.bits(col):
+                cell = signals.source[bit]
+                if cell >= 0 and signals.cell_stage[cell] == stage_idx:
+                    kind = CELL_KINDS[signals.cell_kind[cell]]
+                    node = cell_nodes[(kind, signals.cell_col[cell], signals.cell_n[cell])]
+                    nodes.append((node, signals.type_of(bit)))
+                else:
+                    _, prev_col, prev_idx = locate(bit)
+                    nodes.append(prev_stage[prev_col][prev_idx])
+            columns.append(nodes)
+        return columns
 
     def _generate_final_stage(self, node_id, stage_nodes, lines):
         """Generate sum/carry output nodes and optionally final adder"""
@@ -231,13 +345,16 @@ class GraphvizGenerator:
             for bit_idx, (node_name, node_type) in enumerate(final_bits):
                 output_node = f"n{node_id}"
                 
-                # Assign first bit to sum, second bit to carry
+                # Assign first bit to sum, second bit to carry, third to carry2
                 if bit_idx == 0:
                     label = f"s[{col}]"
                     color = "yellow"
-                else:
+                elif bit_idx == 1:
                     label = f"c[{col}]"
                     color = "orange"
+                else:
+                    label = f"c2[{col}]"
+                    color = "orange"
                 
                 lines.append(f"    {output_node} [label=\"{label}\", fillcolor=\"{color}\", shape=\"ellipse\"];")
                 output_nodes.append((node_name, output_node))
@@ -3,60 +3,121 @@
 SystemVerilog Generator for Dadda/Bickerstaff Compressor Trees
 """
 
+from itertools import chain, islice
+
+# Buffer size of the streaming writer used by generate_verilog
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Lines joined into one chunk by the bulk sections of the module
+CHUNK_LINES = 1024
+
+# Tree name in the module header, per reduction algorithm
+ALGORITHM_TITLES = {
+    "dadda": "Dadda",
+    "wallace": "Wallace",
+    "wallace_ra": "Reduced-Area Wallace",
+    "c42": "4:2 Compressor",
+    "gpc": "GPC",
+    "exact": "Exact",
+}
+
+
+# Output port of each row of the final heap, LSB row first
+OUTPUT_ROWS = ("sum", "carry", "carry2")
+
+
+def _joined(lines, size=CHUNK_LINES):
+    """Join an iterable of lines into chunks of up to size lines"""
+    lines = iter(lines)
+    while batch := list(islice(lines, size)):
+        yield "\n".join(batch)
+
+
 class VerilogGenerator:
-    def __init__(self, dadda_gen):
+    def __init__(self, dadda_gen, tracer=None):
         """
         Initialize with a DaddaGenerator instance
 
         Args:
             dadda_gen: DaddaGenerator object containing stages, FA/HA instances, etc.
+            tracer: Tracer for emission events, defaults to the generator's tracer
         """
         self.gen = dadda_gen
+        self.tracer = tracer or dadda_gen.tracer
         self.w = dadda_gen.w
+        self.wb = dadda_gen.wb
         self.prod_width = dadda_gen.prod_width
         self.num_pp = dadda_gen.num_pp
         self.unsigned = dadda_gen.unsigned
+        self.signed_mode = dadda_gen.signed_mode
         self.encoding = dadda_gen.encoding
-        if (self.unsigned) and (self.encoding == 'booth'):
-            self.num_pp = dadda_gen.num_pp + 1
+        self.radix = dadda_gen.radix
+        self.pp_width = dadda_gen.pp_width
         self.num_stages = dadda_gen.num_stages
         self.stages = dadda_gen.stages
         self.fa_instances = dadda_gen.fa_instances
         self.ha_instances = dadda_gen.ha_instances
         self.sign_ext_opt = dadda_gen.sign_ext_opt
         self.algorithm = dadda_gen.algorithm
+        self.final_height = dadda_gen.final_height
+        self.outputs = OUTPUT_ROWS[:self.final_height]
+
+        # compressor_tree imports this module on startup, import it late
+        from compressor_tree import GPC_SHAPES, constant_cell_logic
+        self.gpc_shapes = GPC_SHAPES
+        self.constant_cell_logic = constant_cell_logic
 
     def generate_module(self):
         """Generate complete SystemVerilog module with FA/HA instantiations"""
-        lines = []
+        return "\n".join(self.iter_lines())
 
-        lines.extend(self._generate_header())
-        lines.extend(self._generate_module_declaration())
-        lines.extend(self._generate_wire_declarations())
-        lines.extend(self._generate_stage_signals())
-        lines.extend(self._generate_stage0_assignment())
-        lines.extend(self._generate_reduction_stages())
-        lines.extend(self._generate_final_outputs())
+    def write_module(self, f):
+        """Stream the module to an open text file, section by section
 
-        lines.append("endmodule")
-
-        return "\n".join(lines)
+        Writes exactly what generate_module returns without holding the
+        whole module in memory.
+        """
+        chunks = self.iter_lines()
+        f.write(next(chunks))
+        for chunk in chunks:
+            f.write("\n")
+            f.write(chunk)
+
+    def iter_lines(self):
+        """Yield the module in order, as lines or chunks of "\n"-joined lines"""
+        return chain(
+            self._generate_header(),
+            self._generate_module_declaration(),
+            self._generate_wire_declarations(),
+            self._generate_stage_signals(),
+            self._generate_stage0_assignment(),
+            self._generate_reduction_stages(),
+            self._generate_final_outputs(),
+            ["endmodule"],
+            self._generate_final_adder3() if self.final_height == 3 else (),
+        )
 
     def _generate_header(self):
         """Generate module header comment"""
         lines = [
             "//",
-            f"// {'Dadda' if self.algorithm == 'dadda' else 'Bickerstaff'} Tree Compressor",
+            f"// {ALGORITHM_TITLES.get(self.algorithm, 'Bickerstaff')} Tree Compressor",
             f"// Algorithm: {self.algorithm.upper()}",
-            f"// Input Width: {self.w} bits",
+            f"// Input Width: {self.w} bits" if self.wb == self.w
+            else f"// Input Width: {self.w} x {self.wb} bits",
             f"// Encoding: {self.encoding.upper()}",
-            f"// Type: {'Unsigned' if self.unsigned else 'Signed'}",
+            *([f"// Booth Radix: {self.radix} (hard multiples precomputed)"]
+              if self.encoding == 'booth' and self.radix != 4 else []),
+            f"// Type: {self.gen._type_text()}",
             f"// Partial Products: {self.num_pp}",
             f"// Product Width: {self.prod_width}",
             f"// Reduction Stages: {self.num_stages}",
-            "//",
-            ""
         ]
+        if self.gen.timing_driven:
+            lines.append("// Timing-Driven: earliest bits into cells first")
+        if self.final_height == 3:
+            lines.append("// Final Height: 3 rows (sum + carry + carry2, see final_adder3)")
+        lines.extend(["//", ""])
         return lines
 
 
@@ -70,10 +131,9 @@ class VerilogGenerator:
             f"    input logic rst,",
         ]
 
-        if self.encoding == 'booth':
-            lines.append(f"    input logic [{self.w}:0] pp [{self.num_pp-1}:0],")
-        else:
-            lines.append(f"    input logic [{self.w-1}:0] pp [{self.num_pp-1}:0],")
+        # Booth rows are k-1 bits wider than the multiplicand (one more for
+        # the zero-extended unsigned one), binary rows as wide
+        lines.append(f"    input logic [{self.pp_width-1}:0] pp [{self.num_pp-1}:0],")
 
         if self.encoding == 'booth':
             lines.append(f"    /* verilator lint_off ASCRANGE */")
@@ -82,10 +142,14 @@ class VerilogGenerator:
             else:
                 lines.append(f"    input logic [{self.num_pp-1}:0] cpl,")
             lines.append(f"    /* verilator lint_on ASCRANGE */")
+        elif self.signed_mode:
+            # Switches the Baugh-Wooley inversions and corrections (Booth
+            # trees take the mode in the extension bit of their operands)
+            lines.append(f"    input logic signed_mode,")
 
         lines.extend([
-            f"    output logic [{self.prod_width-1}:0] sum,",
-            f"    output logic [{self.prod_width-1}:0] carry",
+            *(f"    output logic [{self.prod_width-1}:0] {name}," for name in self.outputs[:-1]),
+            f"    output logic [{self.prod_width-1}:0] {self.outputs[-1]}",
             ");",
             ""
             f"    localparam int COMPRESSOR_TREE_STAGES = PIPE ? {self.num_stages} : 0;\n"
@@ -94,266 +158,385 @@ class VerilogGenerator:
         return lines
 
     def _generate_wire_declarations(self):
-        """Generate FA and HA output wire declarations"""
-        lines = ["    // FA and HA output wires"]
-
-        for stage_idx, col, idx, inputs in self.fa_instances:
-            fa_name = f"fa_s{stage_idx}_c{col}_n{idx}"
-            lines.append(f"    logic {fa_name}_s, {fa_name}_c;")
-
-        for stage_idx, col, idx, inputs in self.ha_instances:
-            ha_name = f"ha_s{stage_idx}_c{col}_n{idx}"
-            lines.append(f"    logic {ha_name}_s, {ha_name}_c;")
-
-        lines.append("")
-        return lines
+        """Generate FA, HA, 4:2 compressor and GPC output wire declarations"""
+        yield "    // FA and HA output wires"
+
+        # Sum-only cells (dead-logic pruning) have no carry wires
+        is_sum_only = self.gen.is_sum_only
+
+        for kind, cells in (("fa", self.fa_instances), ("ha", self.ha_instances)):
+            yield from _joined(
+                f"    logic {kind}_s{stage_idx}_c{col}_n{idx}_s;"
+                if is_sum_only(kind, stage_idx, col, idx)
+                else f"    logic {kind}_s{stage_idx}_c{col}_n{idx}_s, {kind}_s{stage_idx}_c{col}_n{idx}_c;"
+                for stage_idx, col, idx in zip(cells.stage, cells.col, cells.n)
+            )
+
+        cells = self.gen.c42_instances
+        if len(cells):
+            yield "    // 4:2 compressor output wires (sum, carry, horizontal carry-out)"
+            yield from _joined(
+                f"    logic c42_s{stage_idx}_c{col}_n{idx}_s;"
+                if is_sum_only("c42", stage_idx, col, idx)
+                else f"    logic c42_s{stage_idx}_c{col}_n{idx}_s, c42_s{stage_idx}_c{col}_n{idx}_c, "
+                f"c42_s{stage_idx}_c{col}_n{idx}_co;"
+                for stage_idx, col, idx in zip(cells.stage, cells.col, cells.n)
+            )
+
+        cell_lists = self.gen.cell_lists()
+        if any(len(cell_lists[kind]) for kind in self.gpc_shapes):
+            yield "    // GPC output wires (count bits, LSB first)"
+            for kind, (_, _, m) in self.gpc_shapes.items():
+                cells = cell_lists[kind]
+                yield from _joined(
+                    "    logic "
+                    + ", ".join(
+                        f"{kind}_s{stage_idx}_c{col}_n{idx}_s{i}"
+                        for i in range(1 if is_sum_only(kind, stage_idx, col, idx) else m)
+                    )
+                    + ";"
+                    for stage_idx, col, idx in zip(cells.stage, cells.col, cells.n)
+                )
+
+        yield ""
 
     def _generate_stage_signals(self):
         """Generate internal stage signal declarations"""
-        lines = []
-
         for stage_idx in range(self.num_stages + 1):
-            lines.append(f"    // Stage {stage_idx} signals")
+            yield f"    // Stage {stage_idx} signals"
             stage_heap = self.stages[stage_idx]
 
-            # DEBUG
-            if stage_idx == 2:
-                print(f"DEBUG _generate_stage_signals stage 2: col0 has {len(stage_heap.heap[0])} bits")
-
             for col in range(self.prod_width):
-                col_bits = stage_heap.heap[col]
-                if len(col_bits) > 0:
-                    lines.append(f"    logic [{len(col_bits)-1}:0] stage{stage_idx}_col{col};")
-            lines.append("")
-
-        return lines
+                height = stage_heap.height(col)
+                if height > 0:
+                    yield f"    logic [{height-1}:0] stage{stage_idx}_col{col};"
+            yield ""
 
     def _generate_stage0_assignment(self):
         """Generate Stage 0 partial product assignments"""
-        lines = ["    // Stage 0: Partial Product Assignment"]
+        yield "    // Stage 0: Partial Product Assignment"
         stage0_heap = self.stages[0]
-        lines.append("    // Combinational assignment")
-        lines.append("    always_comb begin")
-        for col in range(self.prod_width):
-            for bit_idx, (bit_name, bit_type) in enumerate(stage0_heap.heap[col]):
-                if bit_type == 'inverted_msb':
-                    lines.append(f"        stage0_col{col}[{bit_idx}] = ~{bit_name};")
-                elif bit_type == 'correction' or "1'b1" in bit_name:
-                    lines.append(f"        stage0_col{col}[{bit_idx}] = 1'b1;")
-                else:
-                    lines.append(f"        stage0_col{col}[{bit_idx}] = {bit_name};")
-        lines.append("    end")
-        lines.append("")
+        yield "    // Combinational assignment"
+        yield "    always_comb begin"
 
-        lines.append("")
-        return lines
+        def assignments():
+            for col in range(self.prod_width):
+                for bit_idx, bit in enumerate(stage0_heap.bits(col)):
+                    bit_name = stage0_heap.name(bit)
+                    bit_type = stage0_heap.type_of(bit)
+                    if bit_type == 'inverted_msb':
+                        yield f"        stage0_col{col}[{bit_idx}] = ~{bit_name};"
+                    elif bit_type == 'mode_inverted':
+                        yield f"        stage0_col{col}[{bit_idx}] = {bit_name} ^ signed_mode;"
+                    elif bit_type == 'correction' or "1'b1" in bit_name:
+                        yield f"        stage0_col{col}[{bit_idx}] = 1'b1;"
+                    else:
+                        yield f"        stage0_col{col}[{bit_idx}] = {bit_name};"
 
-    def _generate_reduction_stages(self):
-        """Generate all reduction stages with FA/HA instantiations"""
-        lines = []
+        yield from _joined(assignments())
+        yield "    end"
+        yield ""
 
-        for stage_idx in range(self.num_stages):
-            lines.extend(self._generate_single_reduction_stage(stage_idx))
+        yield ""
 
-        return lines
+    def _generate_reduction_stages(self):
+        """Generate all reduction stages with FA/HA instantiations"""
+        return chain.from_iterable(
+            map(self._generate_single_reduction_stage, range(self.num_stages))
+        )
 
     def _generate_single_reduction_stage(self, stage_idx):
         """Generate a single reduction stage"""
-        lines = [f"    // Stage {stage_idx + 1}: Reduction"]
-
-        # Get FAs and HAs for this stage
-        stage_fas = [(col, idx, inputs) for s, col, idx, inputs in self.fa_instances if s == stage_idx]
-        stage_has = [(col, idx, inputs) for s, col, idx, inputs in self.ha_instances if s == stage_idx]
-
-        # Group by column
-        fas_by_col = {}
-        has_by_col = {}
+        yield f"    // Stage {stage_idx + 1}: Reduction"
 
-        for col, idx, inputs in stage_fas:
-            if col not in fas_by_col:
-                fas_by_col[col] = []
-            fas_by_col[col].append((idx, inputs))
-
-        for col, idx, inputs in stage_has:
-            if col not in has_by_col:
-                has_by_col[col] = []
-            has_by_col[col].append((idx, inputs))
+        # Cells of this stage, grouped by kind and column
+        cells = self.gen.instance_index()[stage_idx]
+        c42s_by_col, fas_by_col, has_by_col = cells["c42"], cells["fa"], cells["ha"]
+        gpc_shapes = self.gpc_shapes
+        signals = self.gen.signals
+        trace_cells = self.tracer.enabled("cell")
+        self.tracer.emit("verilog", "stage_started", stage=stage_idx)
 
         # Track bit consumption
         col_bit_idx = {}
-
-        # Instantiate FAs
-        for col in sorted(fas_by_col.keys()):
-            if col not in col_bit_idx:
-                col_bit_idx[col] = 0
-
-            for idx, inputs in fas_by_col[col]:
-                fa_name = f"fa_s{stage_idx}_c{col}_n{idx}"
-                lines.extend([
-                    f"    fa {fa_name} (",
-                    f"        .a(stage{stage_idx}_col{col}[{col_bit_idx[col]}]),",
-                    f"        .b(stage{stage_idx}_col{col}[{col_bit_idx[col] + 1}]),",
-                    f"        .c_in(stage{stage_idx}_col{col}[{col_bit_idx[col] + 2}]),",
-                    f"        .s({fa_name}_s),",
-                    f"        .c_out({fa_name}_c)",
-                    f"    );",
-                    ""
-                ])
-                col_bit_idx[col] += 3
-
-        # Instantiate HAs
-        for col in sorted(has_by_col.keys()):
-            if col not in col_bit_idx:
-                col_bit_idx[col] = 0
-
-            for idx, inputs in has_by_col[col]:
-                ha_name = f"ha_s{stage_idx}_c{col}_n{idx}"
-                lines.extend([
-                    f"    ha {ha_name} (",
-                    f"        .a(stage{stage_idx}_col{col}[{col_bit_idx[col]}]),",
-                    f"        .b(stage{stage_idx}_col{col}[{col_bit_idx[col] + 1}]),",
-                    f"        .s({ha_name}_s),",
-                    f"        .c_out({ha_name}_c)",
-                    f"    );",
-                    ""
-                ])
-                col_bit_idx[col] += 2
+        is_direct = signals.is_direct
+        is_sum_only = self.gen.is_sum_only
+        is_constant_cell = self.gen.is_constant_cell
+        constant_bits = self.gen.constant_bits
+        stage_heap = self.stages[stage_idx]
+
+        def sources(col, inputs):
+            """Source expression of each cell input
+
+            A cell takes the next bits from the bottom of the column, in any
+            order (FA pin assignment permutes them), except chained 4:2
+            carry-outs and constants, which are read by name.
+            """
+            taken = [bit for bit in inputs if not is_direct(bit, stage_idx)]
+            if taken:
+                start = col_bit_idx.setdefault(col, 0)
+                window = stage_heap.window(col, start, len(taken))
+                col_bit_idx[col] = start + len(taken)
+            exprs = []
+            for bit in inputs:
+                if is_direct(bit, stage_idx):
+                    exprs.append(signals.name(bit))
+                else:
+                    exprs.append(f"stage{stage_idx}_col{col}[{start + window.index(bit)}]")
+            return exprs
+
+        def xor(output, exprs):
+            """Sum-only cell: its LSB output is the parity of its column inputs"""
+            return f"    assign {output} = {' ^ '.join(exprs)};\n"
+
+        def constant_cell(kind, col, idx, name, inputs, exprs):
+            """FA or HA with constant inputs, as the logic left on the others"""
+            values = [constant_bits.get(bit) for bit in inputs]
+            sum_expr, carry_expr = self.constant_cell_logic(values, exprs)
+            lines = f"    assign {name}_s = {sum_expr};\n"
+            if not is_sum_only(kind, stage_idx, col, idx):
+                lines += f"    assign {name}_c = {carry_expr};\n"
+            return lines
+
+        def instances():
+            # Instantiate GPCs column by column, they take the bottom bits of
+            # their column and of the next one
+            gpc_cols = sorted(set().union(*(cells[kind] for kind in gpc_shapes)))
+            for col in gpc_cols:
+                for kind, (k0, k1, m) in gpc_shapes.items():
+                    for idx, inputs in cells[kind].get(col, ()):
+                        gpc_name = f"{kind}_s{stage_idx}_c{col}_n{idx}"
+                        if trace_cells:
+                            self._trace_cell(stage_idx, kind, col, idx, gpc_name)
+                        x0 = sources(col, inputs[:k0])
+                        x1 = sources(col + 1, inputs[k0:])
+                        if is_sum_only(kind, stage_idx, col, idx):
+                            yield xor(f"{gpc_name}_s0", x0)
+                            continue
+                        s = [f"{gpc_name}_s{i}" for i in range(m)]
+                        ports = [f"        .x0({{{', '.join(reversed(x0))}}})"]
+                        if k1:
+                            ports.append(f"        .x1({{{', '.join(reversed(x1))}}})")
+                        ports.append(f"        .s({{{', '.join(reversed(s))}}})")
+                        yield f"    {kind} {gpc_name} (\n" + ",\n".join(ports) + "\n    );\n"
+
+            # Instantiate 4:2 compressors, they take the bottom bits of a column
+            for col in sorted(c42s_by_col.keys()):
+                if col not in col_bit_idx:
+                    col_bit_idx[col] = 0
+
+                for idx, inputs in c42s_by_col[col]:
+                    c42_name = f"c42_s{stage_idx}_c{col}_n{idx}"
+                    if trace_cells:
+                        self._trace_cell(stage_idx, "c42", col, idx, c42_name)
+                    a, b, c, d, c_in = sources(col, inputs)
+                    if is_sum_only("c42", stage_idx, col, idx):
+                        yield xor(f"{c42_name}_s", (a, b, c, d, c_in))
+                        continue
+                    yield (
+                        f"    compressor42 {c42_name} (\n"
+                        f"        .a({a}),\n"
+                        f"        .b({b}),\n"
+                        f"        .c({c}),\n"
+                        f"        .d({d}),\n"
+                        f"        .c_in({c_in}),\n"
+                        f"        .s({c42_name}_s),\n"
+                        f"        .carry({c42_name}_c),\n"
+                        f"        .c_out({c42_name}_co)\n"
+                        f"    );\n"
+                    )
+
+            # Instantiate FAs
+            for col in sorted(fas_by_col.keys()):
+                if col not in col_bit_idx:
+                    col_bit_idx[col] = 0
+
+                for idx, inputs in fas_by_col[col]:
+                    fa_name = f"fa_s{stage_idx}_c{col}_n{idx}"
+                    if trace_cells:
+                        self._trace_cell(stage_idx, "fa", col, idx, fa_name)
+                    a, b, c_in = sources(col, inputs)
+                    if is_constant_cell("fa", stage_idx, col, idx):
+                        yield constant_cell("fa", col, idx, fa_name, inputs, (a, b, c_in))
+                        continue
+                    if is_sum_only("fa", stage_idx, col, idx):
+                        yield xor(f"{fa_name}_s", (a, b, c_in))
+                        continue
+                    yield (
+                        f"    fa {fa_name} (\n"
+                        f"        .a({a}),\n"
+                        f"        .b({b}),\n"
+                        f"        .c_in({c_in}),\n"
+                        f"        .s({fa_name}_s),\n"
+                        f"        .c_out({fa_name}_c)\n"
+                        f"    );\n"
+                    )
+
+            # Instantiate HAs
+            for col in sorted(has_by_col.keys()):
+                if col not in col_bit_idx:
+                    col_bit_idx[col] = 0
+
+                for idx, inputs in has_by_col[col]:
+                    ha_name = f"ha_s{stage_idx}_c{col}_n{idx}"
+                    if trace_cells:
+                        self._trace_cell(stage_idx, "ha", col, idx, ha_name)
+                    a, b = sources(col, inputs)
+                    if is_constant_cell("ha", stage_idx, col, idx):
+                        yield constant_cell("ha", col, idx, ha_name, inputs, (a, b))
+                        continue
+                    if is_sum_only("ha", stage_idx, col, idx):
+                        yield xor(f"{ha_name}_s", (a, b))
+                        continue
+                    yield (
+                        f"    ha {ha_name} (\n"
+                        f"        .a({a}),\n"
+                        f"        .b({b}),\n"
+                        f"        .s({ha_name}_s),\n"
+                        f"        .c_out({ha_name}_c)\n"
+                        f"    );\n"
+                    )
+
+        # One chunk per group of cells, each cell block ending in a blank line
+        yield from _joined(instances(), CHUNK_LINES // 8)
 
         # Map to next stage
-        lines.extend(self._generate_stage_mapping(stage_idx, col_bit_idx))
-
-        return lines
+        yield from self._generate_stage_mapping(stage_idx, col_bit_idx)
+
+        if self.tracer.enabled("stage"):
+            self.tracer.emit(
+                "verilog", "stage_finished",
+                stage=stage_idx,
+                fa=sum(len(cells) for cells in fas_by_col.values()),
+                ha=sum(len(cells) for cells in has_by_col.values()),
+                c42=sum(len(cells) for cells in c42s_by_col.values()),
+                gpc=sum(len(col_cells) for kind in gpc_shapes for col_cells in cells[kind].values()),
+            )
+
+    def _trace_cell(self, stage_idx, kind, col, idx, name):
+        """Emit a cell_placed event for an instance written to the module"""
+        self.tracer.emit(
+            "verilog", "cell_placed", level="cell",
+            stage=stage_idx, kind=kind, col=col, n=idx, instance=name,
+        )
+
+    def _stage_sources(self, stage_idx):
+        """Source expressions of the bits of stage stage_idx + 1
+
+        Yields (col, [source of each bit]) for every column in order. Bits
+        produced by this stage read their cell output wire; every other bit
+        is looked up where it was placed in stage stage_idx.
+        """
+        next_heap = self.stages[stage_idx + 1]
+        locate = self.stages[stage_idx].locate
+        signals = self.gen.signals
+        source = signals.source
+        cell_stage = signals.cell_stage
+        name = signals.name
+        for col in range(self.prod_width):
+            sources = []
+            for bit in next_heap.bits(col):
+                cell = source[bit]
+                if cell >= 0 and cell_stage[cell] == stage_idx:
+                    # New output from THIS stage - use wire directly
+                    sources.append(name(bit))
+                    continue
+
+                # Passthrough bit - it MUST exist in the previous stage
+                location = locate(bit)
+                if location is None:
+                    raise RuntimeError(
+                        f"Bit {name(bit)} not found in stage {stage_idx} column {col}"
+                    )
+                prev_stage, prev_col, prev_bit_idx = location
+                sources.append(f"stage{prev_stage}_col{prev_col}[{prev_bit_idx}]")
+            yield col, sources
 
     def _generate_stage_mapping(self, stage_idx, col_bit_idx):
         """Generate mapping from current stage to next stage"""
-        lines = [f"    // Map to Stage {stage_idx + 1} columns"]
+        yield f"    // Map to Stage {stage_idx + 1} columns"
 
         next_heap = self.stages[stage_idx + 1]
-        prev_heap = self.stages[stage_idx]
-        lines.append("    generate")
-        lines.append(f"        if (PIPE) begin : gen_stage{stage_idx + 1}_pipe")
-        lines.append("            always_ff @(posedge clk) begin")
-        lines.append("                if (rst) begin")
-        lines.append("                    // Reset logic here")
-        for col in range(self.prod_width):
-            next_col_bits = next_heap.heap[col]
-
-            for bit_idx, (bit_name, bit_type) in enumerate(next_col_bits):
-                lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= 1'b0;")
-        lines.append("                end else begin")
-        lines.append("                    // Normal operation logic here")
-        for col in range(self.prod_width):
-            next_col_bits = next_heap.heap[col]
-            for bit_idx, (bit_name, bit_type) in enumerate(next_col_bits):
-                if bit_type in ['fa_sum', 'fa_carry', 'ha_sum', 'ha_carry']:
-                    # This is an FA/HA output - check if it's from the current stage
-                    if f"_s{stage_idx}_" in bit_name:
-                        # New output from THIS stage - use wire directly
-                        lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= {bit_name};")
-                    else:
-                        # FA/HA output from a previous stage that passed through
-                        # It must exist in the previous stage's column
-                        found = False
-                        for prev_bit_idx, (prev_bit_name, prev_bit_type) in enumerate(prev_heap.heap[col]):
-                            if prev_bit_name == bit_name:
-                                lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= stage{stage_idx}_col{col}[{prev_bit_idx}];")
-                                found = True
-                                break
-
-                        if not found:
-                            # Shouldn't happen - fallback
-                            lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= {bit_name};")
-                else:
-                    # Passthrough bit - it MUST exist in the previous stage
-                    found = False
-                    for prev_bit_idx, (prev_bit_name, prev_bit_type) in enumerate(prev_heap.heap[col]):
-                        if prev_bit_name == bit_name:
-                            lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= stage{stage_idx}_col{col}[{prev_bit_idx}];")
-                            found = True
-                            break
-
-                    if not found:
-                        # This shouldn't happen with proper heap tracking
-                        print(f"WARNING: Bit {bit_name} not found in stage {stage_idx} column {col}")
-                        lines.append(f"                    stage{stage_idx + 1}_col{col}[{bit_idx}] <= {bit_name};")
-        lines.append("                end")
-        lines.append("            end")
-        lines.append(f"        end else begin : gen_stage{stage_idx + 1}_no_pipe")
-        lines.append("            // Combinational assignment")
-        lines.append("            always_comb begin")
-        for col in range(self.prod_width):
-            next_col_bits = next_heap.heap[col]
-            for bit_idx, (bit_name, bit_type) in enumerate(next_col_bits):
-                if bit_type in ['fa_sum', 'fa_carry', 'ha_sum', 'ha_carry']:
-                    # This is an FA/HA output - check if it's from the current stage
-                    if f"_s{stage_idx}_" in bit_name:
-                        # New output from THIS stage - use wire directly
-                        lines.append(f"                stage{stage_idx + 1}_col{col}[{bit_idx}] = {bit_name};")
-                    else:
-                        # FA/HA output from a previous stage that passed through
-                        # It must exist in the previous stage's column
-                        found = False
-                        for prev_bit_idx, (prev_bit_name, prev_bit_type) in enumerate(prev_heap.heap[col]):
-                            if prev_bit_name == bit_name:
-                                lines.append(f"                stage{stage_idx + 1}_col{col}[{bit_idx}] = stage{stage_idx}_col{col}[{prev_bit_idx}];")
-                                found = True
-                                break
-
-                        if not found:
-                            # Shouldn't happen - fallback
-                            lines.append(f"                stage{stage_idx + 1}_col{col}[{bit_idx}] = {bit_name};")
-                else:
-                    # Passthrough bit - it MUST exist in the previous stage
-                    found = False
-                    for prev_bit_idx, (prev_bit_name, prev_bit_type) in enumerate(prev_heap.heap[col]):
-                        if prev_bit_name == bit_name:
-                            lines.append(f"                stage{stage_idx + 1}_col{col}[{bit_idx}] = stage{stage_idx}_col{col}[{prev_bit_idx}];")
-                            found = True
-                            break
-
-                    if not found:
-                        # This shouldn't happen with proper heap tracking
-                        print(f"WARNING: Bit {bit_name} not found in stage {stage_idx} column {col}")
-                        lines.append(f"                stage{stage_idx + 1}_col{col}[{bit_idx}] = {bit_name};")
-        lines.append("            end")
-        lines.append("        end")
-        lines.append("    endgenerate")
-        lines.append("")
-        return lines
+        target = f"stage{stage_idx + 1}_col"
+        yield "    generate"
+        yield f"        if (PIPE) begin : gen_stage{stage_idx + 1}_pipe"
+        yield "            always_ff @(posedge clk) begin"
+        yield "                if (rst) begin"
+        yield "                    // Reset logic here"
+        yield from _joined(
+            f"                    {target}{col}[{bit_idx}] <= 1'b0;"
+            for col in range(self.prod_width)
+            for bit_idx in range(next_heap.height(col))
+        )
+        yield "                end else begin"
+        yield "                    // Normal operation logic here"
+        yield from _joined(
+            f"                    {target}{col}[{bit_idx}] <= {source};"
+            for col, sources in self._stage_sources(stage_idx)
+            for bit_idx, source in enumerate(sources)
+        )
+        yield "                end"
+        yield "            end"
+        yield f"        end else begin : gen_stage{stage_idx + 1}_no_pipe"
+        yield "            // Combinational assignment"
+        yield "            always_comb begin"
+        yield from _joined(
+            f"                {target}{col}[{bit_idx}] = {source};"
+            for col, sources in self._stage_sources(stage_idx)
+            for bit_idx, source in enumerate(sources)
+        )
+        yield "            end"
+        yield "        end"
+        yield "    endgenerate"
+        yield ""
 
     def _generate_final_outputs(self):
-        """Generate final sum and carry output assignments"""
-        lines = ["    // Final outputs (sum and carry)"]
+        """Generate final sum and carry (and carry2) output assignments"""
+        yield f"    // Final outputs ({', '.join(self.outputs[:-1])} and {self.outputs[-1]})"
 
         final_stage = self.num_stages
         final_heap = self.stages[final_stage]
-
-        # DEBUG
-        print(f"DEBUG _generate_final_outputs: final_stage={final_stage}")
-        print(f"DEBUG: Column 0 has {len(final_heap.heap[0])} bits")
-        for bit in final_heap.heap[0]:
-            print(f"  - {bit}")
+        self.tracer.emit("verilog", "outputs_started", stage=final_stage)
 
         for col in range(self.prod_width):
-            bits = final_heap.heap[col]
-
-            if len(bits) == 0:
-                lines.append(f"    assign sum[{col}] = 1'b0;")
-                lines.append(f"    assign carry[{col}] = 1'b0;")
-            elif len(bits) == 1:
-                lines.append(f"    assign sum[{col}] = stage{final_stage}_col{col}[0];")
-                lines.append(f"    assign carry[{col}] = 1'b0;")
-            elif len(bits) > 2:
-                print(f"ERROR: Final stage column {col} has more than 2 bits ({len(bits)} bits).")
-                lines.append(f"    // ERROR: More than 2 bits in final stage column {col}")
-                lines.append(f"    assign sum[{col}] = ^(stage{final_stage}_col{col});")
-                lines.append(f"    assign carry[{col}] = 1'b0;")
-            else:  # len(bits) == 2
-                lines.append(f"    assign sum[{col}] = stage{final_stage}_col{col}[0];")
-                lines.append(f"    assign carry[{col}] = stage{final_stage}_col{col}[1];")
-
-        lines.append("")
-        return lines
+            bits = final_heap.bits(col)
+
+            if len(bits) > self.final_height:
+                raise RuntimeError(
+                    f"Final stage column {col} has {len(bits)} bits, "
+                    f"more than {self.final_height}"
+                )
+
+            # Row i of the column drives output i, missing rows are 0
+            for i, name in enumerate(self.outputs):
+                if i < len(bits):
+                    yield f"    assign {name}[{col}] = stage{final_stage}_col{col}[{i}];"
+                else:
+                    yield f"    assign {name}[{col}] = 1'b0;"
+
+        yield ""
+
+    def _generate_final_adder3(self):
+        """Generate the 3-operand adder that finishes a tree stopped at height 3
+
+        Written as one ternary sum so synthesis can map it onto a native
+        ternary adder (FPGA carry chains with a third input) or its own
+        carry-save row ahead of the carry-propagate adder.
+        """
+        return [
+            "",
+            "// 3-operand final adder: product = sum + carry + carry2",
+            "module final_adder3 #(",
+            f"    parameter int W = {self.prod_width}",
+            ")(",
+            "    input logic [W-1:0] sum,",
+            "    input logic [W-1:0] carry,",
+            "    input logic [W-1:0] carry2,",
+            "    output logic [W-1:0] product",
+            ");",
+            "    assign product = sum + carry + carry2;",
+            "endmodule",
+        ]
 
 
 def generate_verilog(dadda_gen, output_file=None):
@@ -365,15 +548,15 @@ def generate_verilog(dadda_gen, output_file=None):
         output_file: Optional output filename. If provided, writes to file.
 
     Returns:
-        str: Complete SystemVerilog module code
+        str: Complete SystemVerilog module code, or None when output_file is
+        given (the module is then streamed to the file and never held whole)
     """
     verilog_gen = VerilogGenerator(dadda_gen)
-    verilog_code = verilog_gen.generate_module()
 
-    print(output_file);
     if output_file:
-        with open(output_file, 'w') as f:
-            f.write(verilog_code)
+        with open(output_file, 'w', buffering=WRITE_BUFFER_SIZE) as f:
+            verilog_gen.write_module(f)
+        return None
 
-    return verilog_code
+    return verilog_gen.generate_module()
 
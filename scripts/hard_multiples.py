@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Hard-Multiple Generator for Radix-8/16 Booth
+Generates the odd multiples of the multiplicand that a Booth digit cannot
+select by shifting (3Y for radix-8; 3Y, 5Y and 7Y for radix-16), each one
+carry-propagate addition of shifted copies of Y over a prefix_tree.py carry
+network. Every PP row of a multiplier shares the one precomputed set.
+"""
+
+import argparse
+import sys
+
+from prefix_tree import PrefixTreeGenerator
+
+# Odd multiples above 1 of each radix, as (multiple, shift, subtract): the
+# multiple is (Y << shift) + Y, or (Y << shift) - Y when subtract is set
+HARD_MULTIPLES = {
+    8: ((3, 1, False),),
+    16: ((3, 1, False), (5, 2, False), (7, 3, True)),
+}
+
+
+class HardMultipleGenerator:
+    """Generate the hard_multiples module of a radix-8/16 Booth multiplier"""
+
+    def __init__(self, w: int, radix: int = 8, technique: str = "kogge-stone",
+                 unsigned: bool = False, signed_mode: bool = False):
+        if radix not in HARD_MULTIPLES:
+            raise ValueError(f"Radix {radix} has no hard multiples (use 8 or 16)")
+        self.w = w
+        self.radix = radix
+        self.k = radix.bit_length() - 1
+        self.unsigned = unsigned
+        self.signed_mode = signed_mode
+        # Unsigned multiplicands are zero-extended to a (w+1)-bit signed
+        # value (mode-extended with signed_mode), and every multiple up to
+        # 2**(k-1) Y fits k-1 more bits, the width of a Booth PP row
+        self.y_width = w + 1 if unsigned or signed_mode else w
+        self.width = self.y_width + self.k - 1
+        self.multiples = HARD_MULTIPLES[radix]
+
+        # One carry network width serves every adder
+        self.prefix = PrefixTreeGenerator(
+            self.width, technique, module_name="hard_multiple_prefix"
+        )
+        self.prefix.generate_tree()
+
+    @property
+    def levels(self):
+        """Prefix levels of each adder, the depth of the precompute"""
+        return self.prefix.max_level
+
+    def generate_verilog(self, output_file: str):
+        """Generate SystemVerilog RTL for the hard multiples and their carry network"""
+
+        with open(output_file, "w") as f:
+            self._write_verilog_header(f)
+            self._write_verilog_module(f)
+            f.write("\n")
+            self.prefix.write_verilog(f)
+
+    def _write_verilog_header(self, f):
+        """Write file header"""
+        names = ", ".join(f"{multiple}Y" for multiple, _, _ in self.multiples)
+        if self.signed_mode:
+            kind = "Signed/Unsigned, extended by signed_mode"
+        else:
+            kind = "Unsigned" if self.unsigned else "Signed"
+        f.write(
+            f"""//
+// Booth Hard Multiples - Radix-{self.radix}
+// Multiplicand Width: {self.w} bits ({kind})
+// Multiples: {names} ({self.width} bits)
+// Prefix Tree: {self.prefix.technique.upper()}, {self.levels} levels
+// Auto-generated by hard_multiples.py
+//
+
+"""
+        )
+
+    def _write_verilog_module(self, f):
+        """Write the hard_multiples module, one prefix adder per multiple"""
+        mw = self.width
+
+        f.write(f"module hard_multiples (\n")
+        f.write(f"    input  logic clk,\n")
+        f.write(f"    input  logic rst,\n")
+        f.write(f"    input  logic [{self.y_width-1}:0] y,  // Multiplicand (signed)\n")
+        for i, (multiple, _, _) in enumerate(self.multiples):
+            sep = "," if i < len(self.multiples) - 1 else ""
+            f.write(f"    output logic [{mw-1}:0] y{multiple}{sep}\n")
+        f.write(f");\n\n")
+
+        f.write(f"    // Sign-extended multiplicand\n")
+        f.write(f"    logic [{mw-1}:0] y_ext;\n")
+        f.write(f"    assign y_ext = {{{{{self.k - 1}{{y[{self.y_width-1}]}}}}, y}};\n\n")
+
+        for multiple, shift, subtract in self.multiples:
+            name = f"y{multiple}"
+            op = "-" if subtract else "+"
+            f.write(f"    // {multiple}Y = (Y << {shift}) {op} Y")
+            if subtract:
+                f.write(f" = (Y << {shift}) + ~Y + 1")
+            f.write(f"\n")
+            f.write(f"    logic [{mw-1}:0] {name}_x, {name}_z, {name}_g, {name}_p, {name}_c;\n")
+            f.write(f"    assign {name}_x = y_ext << {shift};\n")
+            f.write(f"    assign {name}_z = {'~' if subtract else ''}y_ext;\n")
+            f.write(f"    assign {name}_p = {name}_x ^ {name}_z;\n")
+            if subtract:
+                # The carry-in of 1 folds into bit 0: g0 = x0 & z0 | p0 & 1
+                f.write(f"    assign {name}_g = {{{name}_x[{mw-1}:1] & {name}_z[{mw-1}:1], "
+                        f"{name}_x[0] | {name}_z[0]}};\n")
+            else:
+                f.write(f"    assign {name}_g = {name}_x & {name}_z;\n")
+            f.write(f"    /* verilator lint_off PINCONNECTEMPTY */\n")
+            f.write(f"    hard_multiple_prefix #(.PIPE(0)) {name}_carries (\n")
+            f.write(f"        .clk(clk),\n")
+            f.write(f"        .rst(rst),\n")
+            f.write(f"        .g_in({name}_g),\n")
+            f.write(f"        .p_in({name}_p),\n")
+            f.write(f"        .a_in('0),\n")
+            f.write(f"        .g_out({name}_c),\n")
+            f.write(f"        .p_out(),\n")
+            f.write(f"        .a_out()\n")
+            f.write(f"    );\n")
+            f.write(f"    /* verilator lint_on PINCONNECTEMPTY */\n")
+            # Bit i adds the group carry out of bits i-1..0
+            f.write(f"    assign {name} = {name}_p ^ {{{name}_c[{mw-2}:0], 1'b{int(subtract)}}};\n\n")
+
+        f.write(f"endmodule\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Booth Hard-Multiple Generator")
+    parser.add_argument("-w", "--width", type=int, required=True, help="Multiplicand width")
+    parser.add_argument(
+        "--radix", type=int, default=8, choices=sorted(HARD_MULTIPLES), help="Booth radix"
+    )
+    parser.add_argument(
+        "--technique",
+        type=str,
+        default="kogge-stone",
+        choices=["brent-kung", "sklansky", "kogge-stone"],
+        help="Prefix tree technique of the adders",
+    )
+    parser.add_argument(
+        "--unsigned", action="store_true", help="Unsigned (zero-extended) multiplicand"
+    )
+    parser.add_argument(
+        "--signed-mode",
+        action="store_true",
+        help="Runtime signed/unsigned multiplicand, sign bit ANDed with signed_mode",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=str,
+        default="rtl/hard_multiples.sv",
+        help="Output Verilog file",
+    )
+
+    args = parser.parse_args()
+
+    try:
+        gen = HardMultipleGenerator(
+            args.width, args.radix, args.technique, args.unsigned, args.signed_mode
+        )
+    except ValueError as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        sys.exit(1)
+    gen.generate_verilog(args.output)
+    print(f"Verilog generated: {args.output} ({gen.width}-bit multiples, {gen.levels} levels)")
+
+
+if __name__ == "__main__":
+    main()
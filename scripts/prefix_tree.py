@@ -32,10 +32,14 @@ class Node:
 class PrefixTreeGenerator:
     """Generate parallel prefix trees for carry computation"""
 
-    def __init__(self, width: int, technique: str, pipeline: int = 0):
+    def __init__(
+        self, width: int, technique: str, pipeline: int = 0, module_name: str = "prefix_tree"
+    ):
         self.width = width
         self.technique = technique.lower()
         self.pipeline = pipeline
+        # Other generators embed trees of their own widths under other names
+        self.module_name = module_name
         self.levels = []
         self.max_level = 0
         self.prefix_tree_stages = 0
@@ -217,8 +221,12 @@ class PrefixTreeGenerator:
         """Generate SystemVerilog RTL for the prefix tree"""
 
         with open(output_file, "w") as f:
-            self._write_verilog_header(f)
-            self._write_verilog_module(f)
+            self.write_verilog(f)
+
+    def write_verilog(self, f):
+        """Write the header and module to an open text file"""
+        self._write_verilog_header(f)
+        self._write_verilog_module(f)
 
     def _write_verilog_header(self, f):
         """Write file header"""
@@ -238,7 +246,7 @@ class PrefixTreeGenerator:
         """Write the main module using prefix_cell instances"""
 
         # Module declaration
-        f.write(f"module prefix_tree #(\n")
+        f.write(f"module {self.module_name} #(\n")
         f.write(f"    parameter WIDTH = {self.width},\n")
         f.write(f"    parameter PIPE = {self.pipeline}\n")
         f.write(f") (\n")
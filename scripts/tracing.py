@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Structured tracing for the compressor tree generators
+Generators emit events (stage started, cell placed, stage finished) to a
+Tracer; a Tracer forwards them to sinks, which are plain callables taking
+one event dict. The default Tracer is silent and costs one comparison per
+event site.
+"""
+
+import sys
+
+# Trace levels, from quietest to noisiest
+#   silent: no events
+#   stage:  one event per stage and per generator phase
+#   cell:   additionally one event per FA/HA cell
+TRACE_LEVELS = ("silent", "stage", "cell")
+
+
+class Tracer:
+    """Dispatch generator events at or below a trace level to sinks"""
+
+    def __init__(self, level="silent", sinks=()):
+        if level not in TRACE_LEVELS:
+            raise ValueError(f"Unknown trace level: {level}")
+        self.level = TRACE_LEVELS.index(level)
+        self.sinks = list(sinks)
+
+    def enabled(self, level):
+        """True if events of this level reach the sinks"""
+        return bool(self.sinks) and TRACE_LEVELS.index(level) <= self.level
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+
+    def emit(self, source, event, level="stage", **fields):
+        """Send one event to every sink if level is enabled"""
+        if not self.enabled(level):
+            return
+        record = {"source": source, "event": event, **fields}
+        for sink in self.sinks:
+            sink(record)
+
+
+class JsonLinesSink:
+    """Write each event as one JSON object per line"""
+
+    def __init__(self, f):
+        # json pulls in re/enum, only pay for it when events are written
+        import json
+
+        self.f = f
+        self.dumps = json.dumps
+
+    def __call__(self, record):
+        self.f.write(self.dumps(record, separators=(",", ":")))
+        self.f.write("\n")
+
+
+# Shared default: no sinks, nothing is ever formatted
+SILENT = Tracer()
+
+
+def tracer_from_args(level, trace_file=None):
+    """Build a Tracer for CLI options, returning (tracer, file to close or None)
+
+    Events go to trace_file as JSON lines, or to stderr when only a level is
+    given. A trace file without a level traces stages.
+    """
+    if trace_file and level == "silent":
+        level = "stage"
+    if level == "silent":
+        return SILENT, None
+    if trace_file:
+        f = open(trace_file, "w")
+        return Tracer(level, [JsonLinesSink(f)]), f
+    return Tracer(level, [JsonLinesSink(sys.stderr)]), None
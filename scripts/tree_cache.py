@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Persistent content-addressed cache of generated compressor trees
+Entries are keyed on CompressorTreeGenerator.cache_params() plus a hash of
+the generator sources, and hold the reduced netlist (pickled to_netlist()
+data) and the emitted RTL. The cache is bounded in size and evicts least
+recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+
+# Bump when the layout of an entry changes
+CACHE_FORMAT = 2
+
+# Sources whose changes invalidate every entry
+GENERATOR_SOURCES = (
+    "compressor_tree.py",
+    "exact_tree.py",
+    "gen_verilog.py",
+    "tracing.py",
+    "tree_cache.py",
+)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "compressor_tree"
+)
+DEFAULT_MAX_MB = 512
+
+NETLIST_FILE = "netlist.pkl"
+RTL_FILE = "compressor_tree.sv"
+
+
+def generator_version():
+    """Hash of the generator sources and the cache format"""
+    scripts_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256(f"format {CACHE_FORMAT}\n".encode())
+    for name in GENERATOR_SOURCES:
+        with open(os.path.join(scripts_dir, name), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class TreeCache:
+    """On-disk LRU cache of compressor tree netlists and RTL"""
+
+    def __init__(self, root=None, max_bytes=None):
+        self.root = root or os.environ.get("COMPRESSOR_TREE_CACHE", DEFAULT_CACHE_DIR)
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("COMPRESSOR_TREE_CACHE_MB", DEFAULT_MAX_MB)) << 20
+        self.max_bytes = max_bytes
+        self._version = None
+
+    def key(self, gen):
+        """Content address of the tree gen builds"""
+        if self._version is None:
+            self._version = generator_version()
+        params = json.dumps(gen.cache_params(), sort_keys=True)
+        return hashlib.sha256(f"{self._version}\n{params}".encode()).hexdigest()
+
+    def _entry(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def lookup(self, key):
+        """True if key is cached, marking the entry as recently used"""
+        entry = self._entry(key)
+        if not os.path.exists(os.path.join(entry, RTL_FILE)):
+            return False
+        os.utime(entry)
+        return True
+
+    def load_netlist(self, key, tracer=None):
+        """Reduced netlist of a cached entry as a CompressorTreeGenerator"""
+        from compressor_tree import CompressorTreeGenerator
+
+        with open(os.path.join(self._entry(key), NETLIST_FILE), "rb") as f:
+            netlist = pickle.load(f)
+        return CompressorTreeGenerator.from_netlist(netlist, tracer)
+
+    def copy_rtl(self, key, output_file):
+        """Write the cached RTL of key to output_file"""
+        shutil.copyfile(os.path.join(self._entry(key), RTL_FILE), output_file)
+
+    def store(self, key, gen, rtl_file):
+        """Cache the netlist of gen and the RTL already written to rtl_file"""
+        entry = self._entry(key)
+        if os.path.exists(os.path.join(entry, RTL_FILE)):
+            return
+        os.makedirs(os.path.dirname(entry), exist_ok=True)
+
+        # Build the entry aside and rename it in, so concurrent runs never
+        # see a partial entry
+        tmp = tempfile.mkdtemp(prefix=f".{key[:8]}-", dir=os.path.dirname(entry))
+        try:
+            with open(os.path.join(tmp, NETLIST_FILE), "wb") as f:
+                pickle.dump(gen.to_netlist(), f, protocol=pickle.HIGHEST_PROTOCOL)
+            shutil.copyfile(rtl_file, os.path.join(tmp, RTL_FILE))
+            os.rename(tmp, entry)
+        except OSError:
+            # Another run stored the same entry first
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.exists(os.path.join(entry, RTL_FILE)):
+                raise
+        self.evict()
+
+    def entries(self):
+        """[(last use, size in bytes, path)] of every complete entry"""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for shard in os.listdir(self.root):
+            shard_dir = os.path.join(self.root, shard)
+            if not os.path.isdir(shard_dir):
+                continue
+            for name in os.listdir(shard_dir):
+                entry = os.path.join(shard_dir, name)
+                if name.startswith(".") or not os.path.isdir(entry):
+                    continue
+                size = sum(
+                    os.path.getsize(os.path.join(entry, f)) for f in os.listdir(entry)
+                )
+                result.append((os.path.getmtime(entry), size, entry))
+        return result
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits max_bytes
+
+        The most recently used entry is always kept.
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the compressor tree cache")
+    parser.add_argument("--cache-dir", type=str, default=None, help="Cache directory")
+    parser.add_argument("--clear", action="store_true", help="Delete every entry")
+    args = parser.parse_args()
+
+    cache = TreeCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {cache.root}")
+        sys.exit(0)
+
+    entries = cache.entries()
+    total = sum(size for _, size, _ in entries)
+    print(f"{cache.root}: {len(entries)} entries, {total / 2**20:.1f} MiB "
+          f"of {cache.max_bytes / 2**20:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
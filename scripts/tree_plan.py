@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Height-only planning for Dadda/Bickerstaff/Wallace/FA-only/Exact compressor trees
+Runs the reduction schemes of compressor_tree.py on NumPy column-height
+vectors to get per-stage, per-column FA/HA counts without building a netlist
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import sys
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from compressor_tree import (
+    BOOTH_RADICES,
+    FINAL_HEIGHTS,
+    CompressorTreeGenerator,
+    dadda_sequence,
+    reduction_targets,
+    wallace_sequence,
+)
+from exact_tree import plan_exact
+
+
+@dataclass
+class ReductionPlan:
+    """Result of planning one compressor tree
+
+    heights[s] is the column height vector entering stage s (heights[-1] is
+    the final heap), fa[s]/ha[s] are the cells placed per column in stage s.
+    """
+
+    algorithm: str
+    heights: np.ndarray
+    fa: np.ndarray
+    ha: np.ndarray
+
+    @property
+    def num_stages(self):
+        return len(self.fa)
+
+    @property
+    def final_heights(self):
+        return self.heights[-1]
+
+    @property
+    def fa_total(self):
+        return int(self.fa.sum())
+
+    @property
+    def ha_total(self):
+        return int(self.ha.sum())
+
+
+def _next_heights(heights, fa, ha):
+    """Column heights after placing fa/ha cells (carries out of the top column drop)"""
+    nxt = heights - 2 * fa - ha
+    nxt[1:] += fa[:-1] + ha[:-1]
+    return nxt
+
+
+def plan_stage_faonly(heights):
+    """FA-only stage: every group of three bits becomes an FA"""
+    fa = heights // 3
+    return fa, np.zeros_like(fa)
+
+
+def plan_stage_wallace(heights):
+    """Wallace stage: FAs on every group of three bits, an HA on a leftover pair"""
+    fa = heights // 3
+    return fa, (heights % 3 == 2).astype(np.int64)
+
+
+def plan_stage_dadda(heights, target_height):
+    """Dadda stage: reduce every column to target_height as late as possible"""
+    width = len(heights)
+    fa = np.zeros(width, dtype=np.int64)
+    ha = np.zeros(width, dtype=np.int64)
+    carries = 0
+    for col, num_bits in enumerate(heights.tolist()):
+        height = num_bits + carries
+        f = min(num_bits // 3, max(0, (height - target_height) // 2))
+        height -= 2 * f
+        h = 1 if num_bits - 3 * f >= 2 and height == target_height + 1 else 0
+        fa[col] = f
+        ha[col] = h
+        carries = f + h
+    return fa, ha
+
+
+def plan_stage_bickerstaff(heights, target_height):
+    """Bickerstaff stage: as many FAs as possible, HAs only where needed"""
+    fa = heights // 3
+    ha = np.zeros_like(fa)
+    remaining = heights - 3 * fa
+
+    two_bit_cols = np.flatnonzero(heights % 3 == 2)
+    rightmost_2bit_col = two_bit_cols[0] if len(two_bit_cols) else -1
+
+    # Only columns left with exactly two bits can take an HA, and that
+    # decision depends on the HA carry coming in from the column below
+    height = remaining + fa
+    height[1:] += fa[:-1]
+    for col in np.flatnonzero(remaining == 2).tolist():
+        carry_in = ha[col - 1] if col > 0 else 0
+        if height[col] + carry_in > target_height or col == rightmost_2bit_col:
+            ha[col] = 1
+    return fa, ha
+
+
+def plan_reduction(heights, algorithm="dadda", final_height=2):
+    """Plan a full reduction of an initial column height vector down to final_height"""
+    heights = np.asarray(heights, dtype=np.int64)
+    history = [heights]
+    fas = []
+    has = []
+
+    def run(stage_fn, *args):
+        fa, ha = stage_fn(history[-1], *args)
+        fas.append(fa)
+        has.append(ha)
+        history.append(_next_heights(history[-1], fa, ha))
+
+    initial_max = int(heights.max()) if len(heights) else 0
+    if algorithm in ("dadda", "bickerstaff"):
+        targets = reduction_targets(dadda_sequence(initial_max), initial_max, final_height)
+        stage_fn = plan_stage_dadda if algorithm == "dadda" else plan_stage_bickerstaff
+        for target in targets:
+            run(stage_fn, target)
+    elif algorithm == "wallace":
+        while (history[-1] > final_height).any():
+            run(plan_stage_wallace)
+    elif algorithm == "wallace_ra":
+        targets = reduction_targets(wallace_sequence(initial_max), initial_max, final_height)
+        for target in targets:
+            run(plan_stage_bickerstaff, target)
+        stage_limit = len(heights)
+        while (history[-1] > final_height).any() and len(fas) < stage_limit:
+            run(plan_stage_bickerstaff, final_height)
+    elif algorithm == "exact":
+        _, fa_plan, ha_plan = plan_exact(heights.tolist(), final_height=final_height)
+        for fa, ha in zip(fa_plan, ha_plan):
+            run(lambda _, fa=fa, ha=ha: (np.array(fa), np.array(ha)))
+    elif algorithm == "faonly":
+        stage_limit = len(heights)
+        while (history[-1] > final_height).any() and len(fas) < stage_limit:
+            run(plan_stage_faonly)
+    else:
+        raise ValueError(f"Unknown algorithm: {algorithm}")
+
+    width = len(heights)
+    return ReductionPlan(
+        algorithm=algorithm,
+        heights=np.array(history),
+        fa=np.array(fas, dtype=np.int64).reshape(-1, width),
+        ha=np.array(has, dtype=np.int64).reshape(-1, width),
+    )
+
+
+def _add_rows(heights, starts, length):
+    """Add rows of length bits starting at each column of starts, clipped to the heap"""
+    width = len(heights)
+    starts = np.asarray(starts, dtype=np.int64)
+    delta = np.zeros(width + 1, dtype=np.int64)
+    np.add.at(delta, np.minimum(starts, width), 1)
+    np.add.at(delta, np.minimum(starts + length, width), -1)
+    heights += np.cumsum(delta[:-1])
+
+
+def _add_constants(heights, counts, fold):
+    """Add constant bits (counts per column), or one bit per set bit of their sum when folded"""
+    if not fold:
+        heights += counts
+        return
+    width = len(heights)
+    total = sum(count << col for col, count in enumerate(counts.tolist()) if count)
+    total %= 1 << width
+    heights += [total >> col & 1 for col in range(width)]
+
+
+def initial_heights(w, num_pp=None, encoding="booth", unsigned=False, sign_ext_opt=True,
+                    radix=4, wb=None, signed_mode=False, fold_constants=True):
+    """Column heights of the stage 0 heap of a CompressorTreeGenerator configuration
+
+    Mirrors CompressorTreeGenerator.build_initial_heap on heights alone,
+    without allocating a bit per partial product (--check compares them).
+    sign_ext_opt does not change the heap and is only kept for the signature.
+    """
+    wb = w if wb is None else wb
+    k = radix.bit_length() - 1
+    if num_pp is None:
+        if encoding == "booth" and (unsigned or signed_mode):
+            num_pp = wb // k + 1
+        elif encoding == "booth":
+            num_pp = (wb + k - 1) // k
+        else:
+            num_pp = wb
+    prod_width = w + wb
+    heights = np.zeros(prod_width, dtype=np.int64)
+    ones = np.zeros(prod_width, dtype=np.int64)  # constant 1'b1 bits per column
+    modes = np.zeros(prod_width, dtype=np.int64)  # signed_mode bits per column
+
+    if encoding == "binary":
+        if unsigned:
+            _add_rows(heights, np.arange(num_pp), w)
+        else:
+            # Baugh-Wooley rows, inverted bits included, and the corrections
+            _add_rows(heights, np.arange(wb), w)
+            one = modes if signed_mode else ones
+            corrections = [w] if wb == w else [w - 1, wb - 1]
+            np.add.at(one, corrections + [prod_width - 1], 1)
+    elif encoding == "booth":
+        # Row bits below the sign bit (see CompressorTreeGenerator.pp_width)
+        pp_bits = w + (unsigned or signed_mode) + k - 2
+        offsets = np.arange(num_pp) * k
+        # Unsigned Booth's top row has no cpl, sign bit or sign extension
+        signed_rows = offsets[:-1] if unsigned else offsets
+        _add_rows(heights, offsets, pp_bits)
+        _add_rows(heights, signed_rows, 1)  # cpl
+        _add_rows(heights, signed_rows + pp_bits, 1)  # inverted sign bit
+        _add_rows(ones, signed_rows + pp_bits, prod_width)  # sign extension
+
+    _add_constants(heights, ones, fold_constants)
+    _add_constants(heights, modes, fold_constants)
+    return heights
+
+
+def plan_config(w, num_pp=None, encoding="booth", unsigned=False, sign_ext_opt=True,
+                algorithm="dadda", final_height=2, radix=4, wb=None, signed_mode=False):
+    """Plan the compressor tree of a CompressorTreeGenerator configuration"""
+    return plan_reduction(
+        initial_heights(w, num_pp, encoding, unsigned, sign_ext_opt, radix, wb, signed_mode),
+        algorithm,
+        final_height,
+    )
+
+
+def cell_counts(gen):
+    """Per-stage, per-column FA/HA counts of a fully built CompressorTreeGenerator"""
+    fa = np.zeros((gen.num_stages, gen.prod_width), dtype=np.int64)
+    ha = np.zeros((gen.num_stages, gen.prod_width), dtype=np.int64)
+    for stage, col, _, _ in gen.fa_instances:
+        fa[stage, col] += 1
+    for stage, col, _, _ in gen.ha_instances:
+        ha[stage, col] += 1
+    return fa, ha
+
+
+def check_plan(plan, gen):
+    """Compare a plan against a fully built generator, returning a list of mismatches"""
+    errors = []
+    initial = np.array(gen.stages[0].heights(), dtype=np.int64)
+    if not np.array_equal(initial, plan.heights[0]):
+        errors.append(f"initial heights: plan {plan.heights[0].tolist()}, generator {initial.tolist()}")
+    if plan.num_stages != gen.num_stages:
+        errors.append(f"stages: plan {plan.num_stages}, generator {gen.num_stages}")
+        return errors
+    fa, ha = cell_counts(gen)
+    for name, planned, built in (("FA", plan.fa, fa), ("HA", plan.ha, ha)):
+        for stage, col in zip(*np.nonzero(planned != built)):
+            errors.append(
+                f"stage {stage} column {col}: plan {planned[stage, col]} {name}, "
+                f"generator {built[stage, col]} {name}"
+            )
+    final = np.array(gen.stages[-1].heights(), dtype=np.int64)
+    if not np.array_equal(final, plan.final_heights):
+        errors.append(f"final heights: plan {plan.final_heights.tolist()}, generator {final.tolist()}")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Plan Dadda/Bickerstaff/Wallace/FAonly/Exact compressor trees from column heights"
+    )
+    parser.add_argument(
+        "-w", "--width", type=int, nargs="+", default=[16], help="Input widths"
+    )
+    parser.add_argument(
+        "--wb", type=int, default=None, help="Multiplier (b) width of every point (default: square)"
+    )
+    parser.add_argument(
+        "-e",
+        "--encoding",
+        type=str,
+        nargs="+",
+        default=["booth"],
+        choices=["booth", "binary"],
+        help="Encoding types",
+    )
+    parser.add_argument(
+        "-a",
+        "--algorithm",
+        type=str,
+        nargs="+",
+        default=["dadda"],
+        choices=["dadda", "bickerstaff", "wallace", "wallace_ra", "faonly", "exact"],
+        help="Reduction algorithms",
+    )
+    parser.add_argument(
+        "--unsigned", action="store_true", help="Unsigned multiplication"
+    )
+    parser.add_argument(
+        "--signed-mode",
+        action="store_true",
+        help="Runtime signed/unsigned trees (signed_mode input)",
+    )
+    parser.add_argument(
+        "--final-height",
+        type=int,
+        default=2,
+        choices=FINAL_HEIGHTS,
+        help="Rows left for the final adder",
+    )
+    parser.add_argument(
+        "--radix",
+        type=int,
+        default=4,
+        choices=BOOTH_RADICES,
+        help="Booth radix",
+    )
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Build every point with CompressorTreeGenerator and compare counts",
+    )
+    args = parser.parse_args()
+
+    failures = 0
+    start = time.perf_counter()
+    points = list(itertools.product(args.width, args.encoding, args.algorithm))
+
+    print(f"{'W':>5} {'encoding':>8} {'algorithm':>12} {'stages':>6} {'FA':>7} {'HA':>6}  final")
+    for w, encoding, algorithm in points:
+        plan = plan_config(
+            w, encoding=encoding, unsigned=args.unsigned, algorithm=algorithm,
+            final_height=args.final_height, radix=args.radix, wb=args.wb,
+            signed_mode=args.signed_mode,
+        )
+        print(
+            f"{w:>5} {encoding:>8} {algorithm:>12} {plan.num_stages:>6} "
+            f"{plan.fa_total:>7} {plan.ha_total:>6}  max {int(plan.final_heights.max())}"
+        )
+
+        if args.check:
+            with contextlib.redirect_stdout(io.StringIO()):
+                gen = CompressorTreeGenerator(
+                    w=w, unsigned=args.unsigned, encoding=encoding, algorithm=algorithm,
+                    final_height=args.final_height, radix=args.radix, wb=args.wb,
+                    signed_mode=args.signed_mode,
+                )
+            errors = check_plan(plan, gen)
+            for error in errors:
+                print(f"  MISMATCH: {error}")
+            failures += bool(errors)
+
+    elapsed = time.perf_counter() - start
+    print(f"\nPlanned {len(points)} configurations in {elapsed:.3f}s")
+    if args.check:
+        print(f"Check against generator: {len(points) - failures}/{len(points)} match")
+        if failures:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,32 @@
 from rich.console import Console
 import os
 
-# Delete file once at the start
-if os.path.exists('bitheap.txt'):
-    os.remove('bitheap.txt')
+BITHEAP_FILE = 'bitheap.txt'
+
+def reset_bitheap_file():
+    """Delete the stage chart before a run appends its stages to it"""
+    if os.path.exists(BITHEAP_FILE):
+        os.remove(BITHEAP_FILE)
 
 def visualize_before_after_rich(before_heap, after_heap, stage_num, target_height,
                                 fa_input_map, ha_input_map, circuit_summary,
-                                width):
+                                width, c42_input_map=(), gpc_input_map=()):
     console = Console(record=True,soft_wrap=True)
 
     _visualize_before_after_rich(before_heap, after_heap, stage_num, target_height,
                             fa_input_map, ha_input_map, circuit_summary, width,
-                            console=console)
+                            console=console, c42_input_map=c42_input_map,
+                            gpc_input_map=gpc_input_map)
     # Export everything as plain text (no colors)
     text_output = console.export_text(styles=True)
 
     # Save to file
-    with open("bitheap.txt", "a") as f:
+    with open(BITHEAP_FILE, "a") as f:
         f.write(text_output)
 
 def _visualize_before_after_rich(before_heap, after_heap, stage_num, target_height,
                                 fa_input_map, ha_input_map, circuit_summary,
-                                width, console):
+                                width, console, c42_input_map=(), gpc_input_map=()):
     """Pretty print before/after bit heap violetuction with aligned columns and spaces."""
     max_h = max(before_heap.max_height(), after_heap.max_height())
 
@@ -30,7 +34,12 @@ def _visualize_before_after_rich(before_heap, after_heap, stage_num, target_heig
     col_width = width * 2 - 1  # each dot + space between columns
 
     console.print(f"\n[bold]violetuction Stage {stage_num}[/bold] (target height: {target_height})")
-    console.print("[blue]●[/blue] = FA inputs (3 bits)   [violet]●[/violet] = HA inputs (2 bits)\n")
+    legend = "[blue]●[/blue] = FA inputs (3 bits)   [violet]●[/violet] = HA inputs (2 bits)"
+    if c42_input_map:
+        legend += "   [green]●[/green] = 4:2 inputs (4-5 bits)"
+    if gpc_input_map:
+        legend += "   [yellow]●[/yellow] = GPC inputs"
+    console.print(legend + "\n")
 
     # Header
     console.print(f"{'h':>3}   {'BEFORE':^{col_width}}    {'AFTER':^{col_width}}")
@@ -41,22 +50,24 @@ def _visualize_before_after_rich(before_heap, after_heap, stage_num, target_heig
         before_row = " ".join(
             "[blue]●[/blue]" if (col_idx, h) in fa_input_map else
             "[violet]●[/violet]" if (col_idx, h) in ha_input_map else
-            "●" if h < len(before_heap.heap[col_idx]) else " "
+            "[green]●[/green]" if (col_idx, h) in c42_input_map else
+            "[yellow]●[/yellow]" if (col_idx, h) in gpc_input_map else
+            "●" if h < before_heap.height(col_idx) else " "
             for col_idx in reversed(range(width))
         )
 
         # AFTER heap
         after_row = " ".join(
-            "●" if h < len(after_heap.heap[col_idx]) else " "
+            "●" if h < after_heap.height(col_idx) else " "
             for col_idx in reversed(range(width))
         )
 
         console.print(f"{h:>3}   {before_row:<{col_width}}    {after_row:<{col_width}}")
 
     # Counts row
-    before_counts = " ".join(str(len(before_heap.heap[col_idx])) for col_idx in
+    before_counts = " ".join(str(before_heap.height(col_idx)) for col_idx in
                              reversed(range(width)))
-    after_counts  = " ".join(str(len(after_heap.heap[col_idx])) for col_idx in
+    after_counts  = " ".join(str(after_heap.height(col_idx)) for col_idx in
                              reversed(range(width)))
     console.print(f"{'cnt':>3}   {before_counts:<{col_width}}    {after_counts:<{col_width}}")
 
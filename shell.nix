@@ -16,6 +16,7 @@ pkgs.mkShell {
     # Python
     pkgs.python312
     pkgs.python312Packages.rich
+    pkgs.python312Packages.numpy
   ];
   shellHook = ''
     echo "=== Multiplier Development Shell ==="
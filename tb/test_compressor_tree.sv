@@ -5,6 +5,18 @@
 `ifndef PIPE
   `define PIPE 0
 `endif
+`ifndef FINAL_HEIGHT
+  `define FINAL_HEIGHT 2
+`endif
+`ifndef RADIX
+  `define RADIX 4
+`endif
+`ifndef WB
+  `define WB `W
+`endif
+`ifndef SIGNED_MODE
+  `define SIGNED_MODE 0
+`endif
 
 /*verilator lint_off DECLFILENAME*/
 module top (
@@ -12,15 +24,19 @@ module top (
     input rst
 );
   parameter W = `W;  // Should match the width used to generate compressor_tree.sv
+  parameter WB = `WB;  // Multiplier (b) width, W unless rectangular
   parameter TESTS = `TESTS;  // Number of test cases
   parameter BOOTH = `BOOTH;  // 1 for Booth encoding, 0 for binary
   parameter UNSIGNED = `UNSIGNED;  // 1 for unsigned multiplication, 0 for signed
-  parameter PROD_W = 2 * W;  // 2*W
+  parameter SIGNED_MODE = `SIGNED_MODE;  // 1 if each test picks signed or unsigned
+  parameter PROD_W = W + WB;  // W+WB
   parameter UNSIGNED_BOOTH = (UNSIGNED == 1) & (BOOTH == 1);
-  parameter NUM_PP=UNSIGNED_BOOTH ? `NUM_PP+1 : `NUM_PP; // Number of partial products (W for binary, (W+1)/2 for Booth)
-  parameter PP_WIDTH = BOOTH ? (W + 1) : W;  // Width of each partial product
+  parameter NUM_PP=UNSIGNED_BOOTH ? `NUM_PP+1 : `NUM_PP; // Number of partial products (W for binary, ceil(W/k) for radix-2^k Booth)
+  parameter BOOTH_K = $clog2(`RADIX);  // Multiplier bits per Booth digit
+  parameter PP_WIDTH = BOOTH ? W + (UNSIGNED_BOOTH | SIGNED_MODE) + BOOTH_K - 1 : W;  // Width of each partial product
   parameter NUM_CPL = `NUM_PP;  // Number of complement bits for Booth encoding
   parameter PIPE = `PIPE;  // 1 to enable pipelining in compressor tree
+  parameter FINAL_HEIGHT = `FINAL_HEIGHT;  // 3 if the tree also outputs carry2
 
   int PIPELINE_STAGES;  // <-- runtime variable, not localparam
   generate
@@ -34,7 +50,8 @@ module top (
           .pp(pp_packed),
           .cpl(cpl_packed),
           .sum(sum),
-          .carry(carry)
+          .carry(carry),
+          .carry2(carry2)
       );
       /* verilator lint_on PINNOTFOUND */
 
@@ -43,27 +60,33 @@ module top (
 
     end else begin : gen_binary_compressor
       /* verilator lint_off PINMISSING */
+      /* verilator lint_off PINNOTFOUND */
       `TOPNAME #(
           .PIPE(PIPE)
       ) dut (
           .clk(clk),
           .rst(rst),
           .pp(pp_packed),
+          .signed_mode(mode_in),
           .sum(sum),
-          .carry(carry)
+          .carry(carry),
+          .carry2(carry2)
       );
+      /* verilator lint_on PINNOTFOUND */
       /* verilator lint_on PINMISSING */
 
       // Capture parameter at time 0
       initial PIPELINE_STAGES = PIPE ? dut.COMPRESSOR_TREE_STAGES : 0;
     end
     logic [W-1:0] a[TESTS];
-    logic [W-1:0] b[TESTS];
+    logic [WB-1:0] b[TESTS];
     logic [PROD_W-1:0] expected[TESTS];
+    logic mode[TESTS];  // 1 signed, 0 unsigned (SIGNED_MODE only)
 
     logic [W-1:0] a_in;
-    logic [W-1:0] b_in;
+    logic [WB-1:0] b_in;
     logic [PROD_W-1:0] expected_in;
+    logic mode_in;
 
     // Storage for all partial products - flattened structure
     // pp_mem[pp_index * TESTS + test_index]
@@ -74,6 +97,7 @@ module top (
     logic [PP_WIDTH-1:0] pp_packed[NUM_PP-1:0];
     logic [PROD_W-1:0] sum;
     logic [PROD_W-1:0] carry;
+    logic [PROD_W-1:0] carry2;  // Third output row, only with FINAL_HEIGHT 3
     logic [PROD_W-1:0] product;
 
     // For Booth encoding
@@ -84,6 +108,7 @@ module top (
       $readmemh({`TESTDIR, "test_a.hex"}, a);
       $readmemh({`TESTDIR, "test_b.hex"}, b);
       $readmemh({`TESTDIR, "test_expected.hex"}, expected);
+      if (SIGNED_MODE) $readmemh({`TESTDIR, "test_mode.hex"}, mode);
 
       // Load all partial products using readmemh
       for (int i = 0; i < NUM_PP; i++) begin
@@ -107,6 +132,9 @@ module top (
   endgenerate
   // Select partial products for current test
   always_comb begin
+    /* verilator lint_off WIDTHTRUNC */
+    mode_in = SIGNED_MODE ? mode[count] : !UNSIGNED;
+    /* verilator lint_on WIDTHTRUNC */
     for (int i = 0; i < NUM_PP; i++) begin
       /* verilator lint_off WIDTHEXPAND */
       /* verilator lint_off WIDTHTRUNC */
@@ -125,8 +153,8 @@ module top (
       end
     end
   end
-  // Final adder: product = sum + (carry << 1)
-  assign product = sum + (carry);
+  // Final adder: product = sum + (carry << 1), plus carry2 for a 3-row tree
+  assign product = (FINAL_HEIGHT == 3) ? sum + carry + carry2 : sum + (carry);
 
   integer errors = 0;
   integer tests_run = 0;
@@ -142,7 +170,7 @@ module top (
       /* verilator lint_off WIDTHTRUNC */
       $display("Test %0d: a=%h, b=%h", count - PIPELINE_STAGES, a[count-PIPELINE_STAGES],
                b[count-PIPELINE_STAGES]);
-      if (!UNSIGNED) begin
+      if (SIGNED_MODE ? mode[count-PIPELINE_STAGES] : !UNSIGNED) begin
         $display("  Signed a = %0d, b = %0d", $signed(a[count-PIPELINE_STAGES]),
                  $signed(b[count-PIPELINE_STAGES]));
       end else begin
@@ -152,6 +180,7 @@ module top (
       $display("  Expected   = %h", expected[count-PIPELINE_STAGES]);
       $display("  Sum        = %h", sum);
       $display("  Carry      = %h", carry);
+      if (FINAL_HEIGHT == 3) $display("  Carry2     = %h", carry2);
 
       tests_run <= tests_run + 1;
 
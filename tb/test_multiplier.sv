@@ -1,23 +1,33 @@
 `include "tb/top.h"
+`ifndef WB
+  `define WB `W
+`endif
+`ifndef SIGNED_MODE
+  `define SIGNED_MODE 0
+`endif
 /*verilator lint_off DECLFILENAME*/
 module top (
     input clk,
     input rst
 );
   parameter W = `W;
+  parameter WB = `WB;  // Width of b, W unless rectangular
   parameter TESTS = `TESTS;
   parameter M = `M;
   parameter PIPE = `PIPE;
-  parameter PROD_W = 2 * W;
+  parameter PROD_W = W + WB;
+  parameter SIGNED_MODE = `SIGNED_MODE;  // 1 if the DUT has a signed_mode input
 
   // Test vectors
   logic [W-1:0] a_vals[TESTS];
-  logic [W-1:0] b_vals[TESTS];
+  logic [WB-1:0] b_vals[TESTS];
   logic [PROD_W-1:0] expected[TESTS];
+  logic mode_vals[TESTS];  // 1 signed, 0 unsigned (SIGNED_MODE only)
 
   // DUT signals
   logic [W-1:0] dut_a;
-  logic [W-1:0] dut_b;
+  logic [WB-1:0] dut_b;
+  logic dut_mode;
   logic [PROD_W-1:0] product;
 
   // Load test data
@@ -25,20 +35,25 @@ module top (
     $readmemh({`TESTDIR, "x_vals.hex"}, a_vals);
     $readmemh({`TESTDIR, "y_vals.hex"}, b_vals);
     $readmemh({`TESTDIR, "p_vals.hex"}, expected);
+    if (SIGNED_MODE) $readmemh({`TESTDIR, "mode_vals.hex"}, mode_vals);
 
     $display("=====================================");
     $display("Multiplier Testbench Configuration:");
-    $display("  Width: %0d bits", W);
+    if (WB == W) $display("  Width: %0d bits", W);
+    else $display("  Width: %0d x %0d bits", W, WB);
     $display("  Tests: %0d", TESTS);
     $display("  Pipeline Stages (M): %0d", M);
     $display("  Pipelining Level (PIPE): %0d", PIPE);
     $display("  Encoding: %s", `ENCODING);
+    if (SIGNED_MODE) $display("  Signedness: signed_mode input (both per test)");
     $display("=====================================");
   end
 
   // Instantiate multiplier DUT
+  /* verilator lint_off PINNOTFOUND */
   `TOPNAME #(
       .W(W),
+      .WB(WB),
       .PIPE(PIPE),
       .M(M)
   ) dut (
@@ -46,8 +61,10 @@ module top (
       .rst(rst),
       .a(dut_a),
       .b(dut_b),
+      .signed_mode(dut_mode),
       .product(product)
   );
+  /* verilator lint_on PINNOTFOUND */
 
   // Test control
   logic   done;
@@ -77,12 +94,14 @@ module top (
       tests_run <= 0;
       dut_a <= '0;
       dut_b <= '0;
+      dut_mode <= 1'b0;
     end else begin
       if (!done) begin
         // Check results after pipeline delay
         if (count > pipeline_delay && count <= TESTS + pipeline_delay) begin
           integer check_idx;
-          logic [W-1:0] a_in, b_in;
+          logic [W-1:0] a_in;
+          logic [WB-1:0] b_in;
           logic [PROD_W-1:0] expected_product;
 
           check_idx = count - 1 - pipeline_delay;
@@ -92,6 +111,8 @@ module top (
 
           $display("\nTest %0d:", check_idx);
           $display("  Inputs:   a=0x%0h (%0d), b=0x%0h (%0d)", a_in, a_in, b_in, b_in);
+          if (SIGNED_MODE)
+            $display("  Mode:     %s", mode_vals[check_idx] ? "signed" : "unsigned");
           $display("  Output:   product=0x%0h (%0d)", product, product);
           $display("  Expected: product=0x%0h (%0d)", expected_product, expected_product);
 
@@ -109,6 +130,7 @@ module top (
         if (count < TESTS) begin
           dut_a <= a_vals[count];
           dut_b <= b_vals[count];
+          dut_mode <= SIGNED_MODE ? mode_vals[count] : 1'b0;
         end
 
         if (count <= TESTS + pipeline_delay) begin